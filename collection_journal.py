@@ -0,0 +1,102 @@
+import json
+import os
+import time
+from pathlib import Path
+
+
+class CollectionJournal:
+    """Append-only progress journal for a dependency collection run
+
+    Every processed package is appended as one JSON line. Lines are buffered
+    and written + fsync'd once per batch, so an interrupted run loses at most
+    one batch. A rerun reads the journal back and resumes where it stopped;
+    once a run finishes, the journal is archived and the next run starts clean.
+    """
+
+    def __init__(self, path, batch_size=25):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.entries = {}
+        self.pending = []
+        self.load()
+
+    def load(self):
+        """Read back the entries of an interrupted run"""
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash mid-write; everything before it is intact
+                    continue
+                self.entries[entry["name"]] = entry
+        if self.entries:
+            print(f"Resuming from journal {self.path} ({len(self.entries)} packages already processed)")
+
+    def is_done(self, package_name):
+        """Whether a package was already handled in this run"""
+        entry = self.entries.get(package_name)
+        return entry is not None and entry["status"] in ("success", "skipped")
+
+    def record(self, package_name, download_count, status):
+        """Append the outcome for a package, flushing once the batch is full"""
+        entry = {
+            "name": package_name,
+            "download_count": download_count,
+            "status": status,
+            "recorded_at": time.time()
+        }
+        self.entries[package_name] = entry
+        self.pending.append(entry)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered entries and fsync them to disk"""
+        if not self.pending:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in self.pending:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.pending = []
+
+    def build_summary(self, total_packages):
+        """Build the summary.json structure from the journal entries"""
+        summary = {
+            "total_packages": total_packages,
+            "processed_packages": 0,
+            "failed_packages": 0,
+            "skipped_packages": 0,
+            "packages": []
+        }
+        for entry in self.entries.values():
+            summary["packages"].append({
+                "name": entry["name"],
+                "download_count": entry["download_count"],
+                "status": entry["status"]
+            })
+            if entry["status"] == "success":
+                summary["processed_packages"] += 1
+            elif entry["status"] == "skipped":
+                summary["skipped_packages"] += 1
+            else:
+                summary["failed_packages"] += 1
+        return summary
+
+    def finish(self):
+        """Flush and archive the journal so the next run starts from scratch"""
+        self.flush()
+        self.archive(self.path)
+
+    @staticmethod
+    def archive(path):
+        """Move a completed journal aside under a timestamped name"""
+        path = Path(path)
+        if path.exists():
+            archived = path.with_name(f"{path.stem}.{int(time.time())}{path.suffix}")
+            os.replace(path, archived)
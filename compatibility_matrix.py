@@ -0,0 +1,84 @@
+import time
+
+import pandas as pd
+
+# Cell values of the dense matrix
+UNKNOWN = 0
+COMPATIBLE = 1
+INCOMPATIBLE = 2
+
+
+class CompatibilityMatrix:
+    """In-memory copy of the IS_COMPATIBLE_WITH relationships
+
+    License ids are interned to row/column numbers and verdicts live in one
+    dense bytearray of n*n cells, so a pair lookup is two dict reads and one
+    byte read. The data is small (a 200-license matrix is 40 KB) and only
+    changes when the matrix is re-imported, so it is loaded once and swapped
+    out wholesale by `LicenseCompatibilityChecker.refresh_compatibility_matrix`.
+    """
+
+    def __init__(self, license_ids=()):
+        self.ids = list(dict.fromkeys(license_ids))
+        self.index = {spdx_id: i for i, spdx_id in enumerate(self.ids)}
+        self.size = len(self.ids)
+        self.cells = bytearray(self.size * self.size)
+        self.loaded_at = time.time()
+
+    @classmethod
+    def from_edges(cls, edges):
+        """Build from (source, target, is_compatible) triples"""
+        edges = list(edges)
+        ids = [source for source, _, _ in edges] + [target for _, target, _ in edges]
+        matrix = cls(ids)
+        for source, target, is_compatible in edges:
+            matrix.set(source, target, is_compatible)
+        return matrix
+
+    @classmethod
+    def from_graph(cls, driver, database="neo4j"):
+        """Load every IS_COMPATIBLE_WITH relationship with a single query"""
+        query = """
+        MATCH (l1:License)-[r:IS_COMPATIBLE_WITH]->(l2:License)
+        RETURN l1.spdx_id AS source, l2.spdx_id AS target, r.is_compatible AS is_compatible
+        """
+        with driver.session(database=database) as session:
+            edges = [(record["source"], record["target"], record["is_compatible"]) for record in session.run(query)]
+        return cls.from_edges(edges)
+
+    @classmethod
+    def from_csv(cls, matrix_file):
+        """Load straight from the matrix CSV that LicenseCompatibilityBuilder imports"""
+        from license_compatibility import LicenseCompatibilityBuilder
+        edges = LicenseCompatibilityBuilder.matrix_edges(pd.read_csv(matrix_file))
+        return cls.from_edges(edges[["source", "target", "is_compatible"]].itertuples(index=False))
+
+    def set(self, source, target, is_compatible):
+        i, j = self.index[source], self.index[target]
+        self.cells[i * self.size + j] = COMPATIBLE if is_compatible else INCOMPATIBLE
+
+    def verdict(self, source, target):
+        """True/False from the matrix, None when the pair is not in it"""
+        i = self.index.get(source)
+        j = self.index.get(target)
+        if i is None or j is None:
+            return None
+        cell = self.cells[i * self.size + j]
+        if cell == UNKNOWN:
+            return None
+        return cell == COMPATIBLE
+
+    def is_compatible(self, source, target):
+        """Pair verdict with the graph's semantics: anything not marked compatible is not
+
+        A known license is always compatible with itself (the matrix import skips the diagonal).
+        """
+        if source == target and source in self.index:
+            return True
+        return self.verdict(source, target) is True
+
+    def __contains__(self, spdx_id):
+        return spdx_id in self.index
+
+    def __len__(self):
+        return self.size
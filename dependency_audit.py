@@ -0,0 +1,229 @@
+from collections import deque
+
+from license_normalizer import LicenseNormalizer
+from package_store import canonical_name
+from spdx_expression import ExpressionError, compile_expression, evaluate, license_ids, package_expression
+
+
+class DependencyAuditor:
+    """Transitive license audit over a dependency graph
+
+    `dependencies` maps each package to the packages it depends on,
+    `licenses` maps each package to its declared licenses and the optional
+    `expressions` to its SPDX license expression (canonical names
+    throughout); a package without a valid expression may use any one of its
+    licenses. Each package's expression is compiled once. For every package
+    the set of distinct compiled expressions found anywhere in its
+    dependency closure is computed once and memoized, so
+    shared subtrees (urllib3, six, ...) are walked once per auditor no matter
+    how many roots reach them. Cycles are collapsed with Tarjan's strongly
+    connected components: every package in a cycle shares one closure.
+
+    `is_known(spdx_id)` says whether the compatibility data covers a license;
+    a package that could only be allowed through licenses it does not cover
+    is reported as unknown rather than as a conflict.
+    """
+
+    def __init__(self, dependencies, licenses, is_compatible, is_known=None, expressions=None):
+        self.dependencies = dependencies
+        self.licenses = licenses
+        self.expressions = expressions or {}
+        self.is_compatible = is_compatible
+        self.is_known = is_known or (lambda spdx_id: True)
+        self.compiled = {}
+        self.closures = {}
+        self.verdicts = {}
+
+    @classmethod
+    def from_package_store(cls, store, is_compatible, include_optional=False, normalizer=None, is_known=None):
+        """Auditor over the local packed store's dependency edges
+
+        Licenses are resolved the way GraphBuilder does before loading the
+        graph: "Other" and ids without a license file are read from the raw
+        license string instead.
+        """
+        normalizer = normalizer or LicenseNormalizer()
+        known = normalizer.spdx_ids or None
+        licenses = {}
+        expressions = {}
+        for record in store.iter_records():
+            name = canonical_name(record["name"])
+            licenses[name] = tuple(normalizer.package_licenses(record, known))
+            expressions[name] = package_expression({**record, "normalized_licenses": list(licenses[name])})
+        return cls(store.dependency_index(include_optional), licenses, is_compatible, is_known, expressions)
+
+    def license_set(self, package):
+        return frozenset(self.licenses.get(package, ()))
+
+    def license_expression(self, package):
+        """Compiled license expression of a package (memoized), None when it declares no license"""
+        if package not in self.compiled:
+            node = None
+            expression = self.expressions.get(package)
+            if expression:
+                try:
+                    node = compile_expression(expression)
+                except ExpressionError:
+                    pass
+            if node is None and self.licenses.get(package):
+                node = compile_expression(" OR ".join(self.licenses[package]))
+            self.compiled[package] = node
+        return self.compiled[package]
+
+    def subtree_licenses(self, root):
+        """Memoized set of compiled license expressions in the closure of `root` (itself included)"""
+        if root not in self.closures:
+            self.compute_closures(root)
+        return self.closures[root]
+
+    def compute_closures(self, root):
+        """Iterative Tarjan over the not-yet-memoized part of the graph reachable from root
+
+        Components are completed in reverse topological order, so every
+        dependency outside a component already has its closure when the
+        component's own closure is assembled.
+        """
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        counter = 0
+        work = [(root, iter(self.dependencies.get(root, ())))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            package, children = work[-1]
+            advanced = False
+            for child in children:
+                if child in self.closures:
+                    continue
+                if child not in index:
+                    index[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(self.dependencies.get(child, ()))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    lowlink[package] = min(lowlink[package], index[child])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[package])
+            if lowlink[package] != index[package]:
+                continue
+
+            # package is the root of a strongly connected component
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component.append(member)
+                if member == package:
+                    break
+            members = set(component)
+            closure = set()
+            for member in component:
+                closure.add(self.license_expression(member))
+                for child in self.dependencies.get(member, ()):
+                    if child not in members:
+                        closure |= self.closures[child]
+            closure = frozenset(closure)
+            for member in component:
+                self.closures[member] = closure
+
+    def allowed(self, expression, outbound_licenses):
+        """Whether a compiled license expression may be used under any of the outbound licenses (memoized)
+
+        None when it fails on the covered licenses but would pass if the
+        licenses missing from the compatibility data turned out compatible.
+        """
+        key = (expression, outbound_licenses)
+        if key not in self.verdicts:
+            pairs = {}
+
+            def passes(spdx_id, undecided_passes):
+                for outbound in outbound_licenses:
+                    if (spdx_id, outbound) not in pairs:
+                        pairs[spdx_id, outbound] = self.is_compatible(spdx_id, outbound)
+                    if pairs[spdx_id, outbound]:
+                        return True
+                    if undecided_passes and not (self.is_known(spdx_id) and self.is_known(outbound)):
+                        return True
+                return False
+
+            if evaluate(expression, lambda spdx_id: passes(spdx_id, False)):
+                self.verdicts[key] = True
+            elif evaluate(expression, lambda spdx_id: passes(spdx_id, True)):
+                self.verdicts[key] = None
+            else:
+                self.verdicts[key] = False
+        return self.verdicts[key]
+
+    def audit(self, root, outbound_licenses=None):
+        """Audit the dependency closure of `root` against its own (or the given) licenses
+
+        Only subtrees whose memoized expressions contain an incompatible or
+        undecided one are descended into to name those packages and a path to
+        each.
+        """
+        root = canonical_name(root)
+        outbound = frozenset(outbound_licenses or self.licenses.get(root, ()))
+        report = {
+            "root": root,
+            "outbound_licenses": sorted(outbound),
+            "unlicensed": [],
+            "unknown": [],
+            "conflicts": []
+        }
+        if not outbound:
+            report["error"] = "Root package declares no license; pass outbound_licenses"
+            return report
+        closure = self.subtree_licenses(root)
+        license_sets = {frozenset(license_ids(expression)) for expression in closure if expression is not None}
+        report["license_sets"] = sorted(sorted(license_set) for license_set in license_sets)
+        verdicts = {
+            expression: self.allowed(expression, outbound)
+            for expression in closure if expression is not None
+        }
+        bad_expressions = {expression for expression, verdict in verdicts.items() if verdict is not True}
+        has_unlicensed = None in closure
+
+        # Walk breadth-first from the root, pruning subtrees with nothing to report
+        parents = {root: None}
+        queue = deque([root])
+        while queue:
+            package = queue.popleft()
+            expression = self.license_expression(package)
+            if package != root:
+                if expression is None:
+                    report["unlicensed"].append(package)
+                elif expression in bad_expressions:
+                    path = []
+                    node = package
+                    while node is not None:
+                        path.append(node)
+                        node = parents[node]
+                    report["conflicts" if verdicts[expression] is False else "unknown"].append({
+                        "package": package,
+                        "licenses": sorted(self.license_set(package)),
+                        "path": path[::-1]
+                    })
+            for child in self.dependencies.get(package, ()):
+                if child in parents:
+                    continue
+                subtree = self.subtree_licenses(child)
+                if bad_expressions.isdisjoint(subtree) and not (has_unlicensed and None in subtree):
+                    continue
+                parents[child] = package
+                queue.append(child)
+        report["visited_packages"] = len(parents)
+        report["compatible"] = not report["conflicts"]
+        return report
@@ -4,13 +4,44 @@ import json
 from pathlib import Path
 import time
 import os
+import asyncio
+import aiohttp
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from rate_limiter import TokenBucket
+from collection_journal import CollectionJournal
+from http_cache import HTTPCache
+from package_store import PackageStore, open_package_store
 
 class DependencyCollector:
-    def __init__(self):
-        self.api_key = "59bd1ecaf14a8080edbaaeb935d2288e"
+    def __init__(self, api_key=None, store_path=None, journal_path=None):
+        self.api_key = api_key or os.getenv("LIBRARIES_IO_API_KEY", "59bd1ecaf14a8080edbaaeb935d2288e")
         self.base_url = "https://libraries.io/api/Pypi"
+        # Per-project release feed used as a cheap change probe; it does not count against the libraries.io quota
+        self.pypi_feed_url = "https://pypi.org/rss/project/{name}/releases.xml"
+        self.pypi_requests_per_second = 20
+        # libraries.io allows 60 requests per minute per API key
+        self.requests_per_minute = 60
         self.dependencies_dir = Path("data/dependencies")
         self.dependencies_dir.mkdir(parents=True, exist_ok=True)
+        # Packed metadata store; the loose per-package JSON files are imported once on first use.
+        # Shard workers pass their own store_path and write to a private shard instead.
+        if store_path:
+            self.package_store = PackageStore(store_path)
+        else:
+            self.package_store = open_package_store(self.dependencies_dir)
+        
+        # Progress journal so an interrupted run can resume where it stopped
+        self.journal_path = Path(journal_path or "data/collection/progress.jsonl")
+        # Packages whose saved latest release is newer than this many days are not re-fetched
+        self.freshness_days = int(os.getenv("LIBRARIES_IO_FRESHNESS_DAYS", "0"))
+        # Refresh runs write the packages they changed here for GraphBuilder.apply_changeset
+        self.changesets_dir = Path("data/changesets")
+        
+        # Conditional-request cache so unchanged API responses come back as cheap 304s
+        self.http_cache = HTTPCache()
+        self.session = requests.Session()
         
         # Fields to extract from the API response
         self.fields_to_extract = [
@@ -44,89 +75,383 @@ class DependencyCollector:
         url = f"{self.base_url}/{package_name}/latest/dependencies"
         
         try:
-            response = requests.get(url, params={"api_key": self.api_key})
+            response = self.http_cache.get(self.session, url, params={"api_key": self.api_key})
             response.raise_for_status()
             
             data = response.json()
             
-            # Extract only the fields we want
-            extracted_data = {field: data.get(field, None) for field in self.fields_to_extract}
-            
-            return extracted_data
-        except requests.exceptions.RequestException as e:
+            return self.extract_fields(data)
+        except (requests.exceptions.RequestException, ValueError) as e:
             print(f"Error fetching data for {package_name}: {e}")
             return None
 
+    def extract_fields(self, data):
+        """Keep only the fields we want from an API response"""
+        extracted_data = {field: data.get(field, None) for field in self.fields_to_extract}
+        extracted_data["dependencies"] = self.extract_dependencies(data)
+        return extracted_data
+
+    def extract_dependencies(self, data):
+        """Compact the dependency list into [name, requirements, kind, optional] edges"""
+        edges = []
+        for dependency in data.get("dependencies") or []:
+            name = dependency.get("name") or dependency.get("project_name")
+            if not name:
+                continue
+            edges.append([
+                name,
+                dependency.get("requirements") or "*",
+                dependency.get("kind") or "runtime",
+                bool(dependency.get("optional"))
+            ])
+        return edges
+
+    async def get_dependency_info_async(self, session, package_name, rate_limiter, max_retries=3):
+        """Get dependency information for a package through a shared aiohttp session"""
+        url = f"{self.base_url}/{package_name}/latest/dependencies"
+        
+        for attempt in range(max_retries):
+            await rate_limiter.acquire_async()
+            try:
+                response = await self.http_cache.get_async(session, url, params={"api_key": self.api_key})
+                if response.status_code == 429 and attempt < max_retries - 1:
+                    # Over quota: back off for as long as the API asks before retrying
+                    retry_after = float(response.retry_after or 60 / self.requests_per_minute)
+                    print(f"Rate limited on {package_name}, retrying in {retry_after:.1f}s")
+                    await asyncio.sleep(retry_after)
+                    continue
+                response.raise_for_status()
+                return self.extract_fields(response.json())
+            except (aiohttp.ClientError, asyncio.TimeoutError, requests.HTTPError, ValueError) as e:
+                print(f"Error fetching data for {package_name}: {e}")
+                return None
+        return None
+
     def save_dependency_info(self, package_name, data):
-        """Save dependency information to a JSON file"""
+        """Save dependency information to the packed package store"""
         if not data:
             return
 
-        filename = self.dependencies_dir / f"{package_name}.json"
-        
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        self.package_store.put(package_name, data)
+
+    def load_saved_info(self, package_name):
+        """Load the previously saved dependency information for a package"""
+        return self.package_store.get(package_name)
+
+    def is_fresh(self, package_name, freshness_days):
+        """Whether the saved snapshot's latest release falls inside the freshness window"""
+        if not freshness_days:
+            return False
+        saved = self.load_saved_info(package_name)
+        published = self.parse_timestamp(saved.get("latest_release_published_at") if saved else None)
+        if not published:
+            return False
+        return published >= datetime.now(timezone.utc) - timedelta(days=freshness_days)
+
+    @staticmethod
+    def parse_timestamp(value):
+        """Parse a libraries.io ISO timestamp such as 2024-05-29T15:37:47.000Z"""
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
 
-    def process_dataset(self, csv_path):
+    def pending_packages(self, packages, journal, freshness_days):
+        """Drop packages already handled by an interrupted run or still fresh on disk"""
+        pending = []
+        for package_name, download_count in packages:
+            if journal.is_done(package_name):
+                continue
+            if self.is_fresh(package_name, freshness_days):
+                journal.record(package_name, download_count, "skipped")
+                continue
+            pending.append((package_name, download_count))
+        journal.flush()
+        skipped = len(packages) - len(pending)
+        if skipped:
+            print(f"Skipping {skipped} packages already collected or still fresh")
+        return pending
+
+    def load_packages(self, csv_path, limit=None):
+        """Read (name, download_count) pairs from the dataset CSV file"""
+        df = pd.read_csv(csv_path)
+        if limit:
+            df = df[0:limit]
+        return [(name, int(count)) for name, count in zip(df['project'], df['download_count'])]
+
+    def record_result(self, journal, package_name, download_count, dependency_info):
+        """Save a fetched package and journal the outcome"""
+        if dependency_info:
+            self.save_dependency_info(package_name, dependency_info)
+            journal.record(package_name, download_count, "success")
+        else:
+            print(f"Failed to get dependency information for {package_name}")
+            journal.record(package_name, download_count, "failed")
+
+    def save_summary(self, summary):
+        """Write the collection summary next to the package files"""
+        with open(self.dependencies_dir / "summary.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=4, ensure_ascii=False)
+        print("\nSaved summary.json with collection results")
+
+    def process_dataset(self, csv_path, freshness_days=None, limit=None):
         """Process the dataset CSV file and collect dependency information"""
+        journal = CollectionJournal(self.journal_path)
         try:
-            # Read the CSV file
-            df = pd.read_csv(csv_path)
-            df = df[0:1500]
-            # Create a summary file
-            summary = {
-                "total_packages": len(df),
-                "processed_packages": 0,
-                "failed_packages": 0,
-                "packages": []
-            }
-            
-            print(f"Found {len(df)} packages. Starting collection...")
+            packages = self.load_packages(csv_path, limit)
+            print(f"Found {len(packages)} packages. Starting collection...")
             
-            for index, row in df.iterrows():
-                package_name = row['project']
-                print(f"\nProcessing {package_name} ({index + 1}/{len(df)})...")
+            pending = self.pending_packages(packages, journal, freshness_days or self.freshness_days)
+            for index, (package_name, download_count) in enumerate(pending):
+                print(f"\nProcessing {package_name} ({index + 1}/{len(pending)})...")
                 
                 # Get dependency information
                 dependency_info = self.get_dependency_info(package_name)
-                
+                self.record_result(journal, package_name, download_count, dependency_info)
                 if dependency_info:
-                    # Save to file
-                    self.save_dependency_info(package_name, dependency_info)
-                    print(f"Saved {package_name}.json")
-                    
-                    # Add to summary
-                    summary["packages"].append({
-                        "name": package_name,
-                        "download_count": row['download_count'],
-                        "status": "success"
-                    })
-                    summary["processed_packages"] += 1
-                else:
-                    print(f"Failed to get dependency information for {package_name}")
-                    summary["packages"].append({
-                        "name": package_name,
-                        "download_count": row['download_count'],
-                        "status": "failed"
-                    })
-                    summary["failed_packages"] += 1
+                    print(f"Saved {package_name}")
                 
                 # Add a small delay to avoid rate limiting
                 time.sleep(1.5)
             
-            # Save summary file
-            with open(self.dependencies_dir / "summary.json", "w", encoding="utf-8") as f:
-                json.dump(summary, f, indent=4, ensure_ascii=False)
-            print("\nSaved summary.json with collection results")
+            # Save summary file and close out the run
+            summary = journal.build_summary(len(packages))
+            summary["http_cache"] = self.http_cache.stats()
+            print(f"HTTP cache: {summary['http_cache']}")
+            self.save_summary(summary)
+            journal.finish()
             
         except Exception as e:
             print(f"Error processing dataset: {e}")
+        finally:
+            journal.flush()
+            self.package_store.flush()
+
+    async def collect_async(self, packages, journal, concurrency=10, requests_per_minute=None):
+        """Collect (name, download_count) pairs concurrently under a shared rate limit"""
+        rate_limiter = TokenBucket.per_minute(requests_per_minute or self.requests_per_minute)
+        queue = asyncio.Queue()
+        for package in packages:
+            queue.put_nowait(package)
+        done = 0
+
+        async def worker(session):
+            nonlocal done
+            while True:
+                try:
+                    package_name, download_count = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                dependency_info = await self.get_dependency_info_async(session, package_name, rate_limiter)
+                self.record_result(journal, package_name, download_count, dependency_info)
+                done += 1
+                print(f"[{done}/{len(packages)}] {package_name}: {'ok' if dependency_info else 'failed'}")
+
+        # One pooled session for all workers; the connector caps open sockets at the concurrency level
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        timeout = aiohttp.ClientTimeout(total=60)
+        started_at = time.monotonic()
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.monotonic() - started_at
+
+        stats = {
+            "elapsed_seconds": round(elapsed, 2),
+            "requests_per_second": round(len(packages) / elapsed, 3) if elapsed else 0.0
+        }
+        print(f"\nFetched {len(packages)} packages in {elapsed:.1f}s "
+              f"({stats['requests_per_second']} requests/sec, limit {rate_limiter.rate:.3f}/sec)")
+        return stats
+
+    def process_dataset_async(self, csv_path, concurrency=10, requests_per_minute=None, freshness_days=None, limit=None):
+        """Process the dataset CSV file using the concurrent asyncio collector"""
+        journal = CollectionJournal(self.journal_path)
+        try:
+            packages = self.load_packages(csv_path, limit)
+            print(f"Found {len(packages)} packages. Starting concurrent collection...")
+            
+            pending = self.pending_packages(packages, journal, freshness_days or self.freshness_days)
+            stats = asyncio.run(self.collect_async(pending, journal, concurrency, requests_per_minute))
+            
+            summary = journal.build_summary(len(packages))
+            summary.update(stats)
+            summary["http_cache"] = self.http_cache.stats()
+            print(f"HTTP cache: {summary['http_cache']}")
+            self.save_summary(summary)
+            journal.finish()
+            
+        except Exception as e:
+            print(f"Error processing dataset: {e}")
+        finally:
+            journal.flush()
+            self.package_store.flush()
+
+    async def probe_latest_release(self, session, package_name, rate_limiter):
+        """Read the newest release from PyPI's per-project feed
+
+        Returns {"version", "published_at"}, "missing" when PyPI no longer has
+        the project, or None when the probe itself failed.
+        """
+        await rate_limiter.acquire_async()
+        try:
+            response = await self.http_cache.get_async(session, self.pypi_feed_url.format(name=package_name))
+            if response.status_code == 404:
+                return "missing"
+            response.raise_for_status()
+            item = ET.fromstring(response.content).find("channel/item")
+            if item is None:
+                return None
+            return {
+                "version": (item.findtext("title") or "").strip(),
+                "published_at": parsedate_to_datetime(item.findtext("pubDate"))
+            }
+        except (aiohttp.ClientError, asyncio.TimeoutError, requests.HTTPError, ET.ParseError, TypeError, ValueError) as e:
+            print(f"Error probing releases for {package_name}: {e}")
+            return None
+
+    def release_changed(self, saved, probe):
+        """Whether the PyPI feed shows a release newer than the stored snapshot"""
+        if probe is None:
+            # Could not tell; re-fetch to be safe
+            return True
+        if probe["version"] not in (saved.get("latest_release_number"), saved.get("latest_stable_release_number")):
+            return True
+        saved_published = self.parse_timestamp(saved.get("latest_release_published_at"))
+        return saved_published is None or probe["published_at"] > saved_published
+
+    async def find_candidates(self, packages, concurrency):
+        """Split packages into (added, likely changed, removed from PyPI) using release probes"""
+        added, candidates, removed = [], [], []
+        stored = []
+        for package in packages:
+            if package[0] in self.package_store:
+                stored.append(package)
+            else:
+                added.append(package)
+
+        rate_limiter = TokenBucket(self.pypi_requests_per_second)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def probe(session, package):
+            async with semaphore:
+                result = await self.probe_latest_release(session, package[0], rate_limiter)
+            if result == "missing":
+                removed.append(package[0])
+            elif self.release_changed(self.package_store.get(package[0]), result):
+                candidates.append(package)
+
+        timeout = aiohttp.ClientTimeout(total=60)
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency), timeout=timeout) as session:
+            await asyncio.gather(*(probe(session, package) for package in stored))
+        return added, candidates, removed
+
+    def snapshot_changed(self, before, after):
+        """Whether a re-fetched record differs from the stored one"""
+        return after is not None and before != after
+
+    def refresh(self, csv_path, concurrency=10, requests_per_minute=None, limit=None):
+        """Re-fetch only packages whose releases moved and write a changeset for GraphBuilder
+
+        The planned changeset is saved before anything is fetched. Packages an
+        interrupted refresh already re-fetched match the release probe on the
+        next run, so they are only reported because that plan lists them.
+        Packages gone from PyPI are deleted from the store.
+        """
+        journal = CollectionJournal(self.journal_path)
+        try:
+            packages = self.load_packages(csv_path, limit)
+            print(f"Probing {len(packages)} packages for new releases...")
+            added, candidates, removed = asyncio.run(self.find_candidates(packages, concurrency))
+            print(f"{len(added)} new, {len(candidates)} with newer releases, {len(removed)} gone from PyPI")
+            
+            added, candidates, removed = self.merge_pending_changeset(added, candidates, removed)
+            self.save_pending_changeset(added, candidates, removed)
+            to_fetch = [p for p in added + candidates if not journal.is_done(p[0])]
+            # Packages fetched by an interrupted refresh already hold their new snapshot
+            before = {name: self.package_store.get(name) for name, _ in candidates if not journal.is_done(name)}
+            asyncio.run(self.collect_async(to_fetch, journal, concurrency, requests_per_minute))
+            for name in removed:
+                self.package_store.delete(name)
+            
+            changeset = {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "added": [name for name, _ in added if name in self.package_store],
+                "updated": [name for name, _ in candidates
+                            if name not in before or self.snapshot_changed(before[name], self.package_store.get(name))],
+                "removed": removed
+            }
+            changeset["unchanged"] = len(packages) - len(changeset["added"]) - len(changeset["updated"]) - len(removed)
+            changeset_path = self.save_changeset(changeset)
+            print(f"Changeset: {len(changeset['added'])} added, {len(changeset['updated'])} updated, "
+                  f"{len(removed)} removed -> {changeset_path}")
+            journal.finish()
+            self.pending_changeset_path.unlink(missing_ok=True)
+            return changeset_path
+            
+        except Exception as e:
+            print(f"Error refreshing dataset: {e}")
+            return None
+        finally:
+            journal.flush()
+            self.package_store.flush()
+
+    @property
+    def pending_changeset_path(self):
+        return self.changesets_dir / "pending.json"
+
+    def save_pending_changeset(self, added, candidates, removed):
+        """Record what this refresh is about to fetch, so a rerun can still report it"""
+        self.changesets_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.pending_changeset_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"added": added, "updated": candidates, "removed": removed}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.pending_changeset_path)
+
+    def merge_pending_changeset(self, added, candidates, removed):
+        """Fold the plan of an interrupted refresh into this run's probe results"""
+        if not self.pending_changeset_path.exists():
+            return added, candidates, removed
+        with open(self.pending_changeset_path, "r", encoding="utf-8") as f:
+            pending = json.load(f)
+        print(f"Resuming refresh planned in {self.pending_changeset_path}")
+        added = self.merge_packages(pending["added"], added)
+        added_names = {name for name, _ in added}
+        candidates = [p for p in self.merge_packages(pending["updated"], candidates) if p[0] not in added_names]
+        removed = list(dict.fromkeys(pending["removed"] + removed))
+        return added, candidates, removed
+
+    @staticmethod
+    def merge_packages(*lists):
+        """Concatenate (name, download_count) lists, keeping the first entry per name"""
+        merged = {}
+        for packages in lists:
+            for name, download_count in packages:
+                merged.setdefault(name, download_count)
+        return list(merged.items())
+
+    def save_changeset(self, changeset):
+        """Write a changeset file named after its creation time"""
+        self.changesets_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        changeset_path = self.changesets_dir / f"changeset-{stamp}.json"
+        with open(changeset_path, "w", encoding="utf-8") as f:
+            json.dump(changeset, f, indent=4, ensure_ascii=False)
+        return changeset_path
 
 def main():
     collector = DependencyCollector()
     # Replace with your CSV file path
     csv_path = r"C:\Users\Ilyesbk\Work\PFE_Licenseer\src\top-pypi-packages.csv"
-    collector.process_dataset(csv_path)
+    # LIBRARIES_IO_REFRESH=1 only re-fetches packages with new releases and writes a changeset
+    if os.getenv("LIBRARIES_IO_REFRESH", "0") == "1":
+        collector.refresh(csv_path)
+    # Set LIBRARIES_IO_ASYNC=0 to fall back to the sequential collector
+    elif os.getenv("LIBRARIES_IO_ASYNC", "1") == "1":
+        collector.process_dataset_async(csv_path)
+    else:
+        collector.process_dataset(csv_path)
     print("\nDependency collection complete!")
 
 if __name__ == "__main__":
@@ -1,4 +1,7 @@
 import os
+import csv
+import hashlib
+import zlib
 from pathlib import Path
 import json
 from neo4j import GraphDatabase
@@ -6,8 +9,52 @@ import pandas as pd
 import time
 from neo4j.exceptions import ServiceUnavailable
 import ssl
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 import certifi
 from dotenv import load_dotenv
+from package_store import canonical_name, open_package_store
+from license_text import iter_license_files, license_hash
+from license_blob_store import LicenseBlobStore
+from license_terms import TERM_RELATIONSHIPS, refold_terms
+from spdx_expression import package_expression
+from license_normalizer import LicenseNormalizer
+
+# neo4j-admin import headers: property name -> header field (typed where not a string)
+PACKAGE_HEADER = {
+    "name": "name:ID(Package)",
+    "description": "description",
+    "homepage": "homepage",
+    "language": "language",
+    "latest_release": "latest_release",
+    "latest_release_date": "latest_release_date",
+    "dependent_repos": "dependent_repos:long",
+    "dependents_count": "dependents_count:long",
+    "keywords": "keywords:string[]",
+    "repository_url": "repository_url",
+    "package_manager_url": "package_manager_url",
+    "license_expression": "license_expression",
+    "fingerprint": "fingerprint"
+}
+LICENSE_HEADER = {
+    "spdx_id": "spdx_id:ID(License)",
+    "name": "name",
+    "category": "category",
+    "version": "version",
+    "submitter": "submitter",
+    "steward": "steward",
+    "steward_url": "steward_url",
+    "content_sha256": "content_sha256",
+    "content_length": "content_length:long",
+    "content_hash": "content_hash",
+    "fingerprint": "fingerprint"
+}
+
+
+def fingerprint(value):
+    """Stable hash of a JSON-serializable value, used to detect changed nodes and edge sets"""
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
 
 class GraphBuilder:
     def __init__(self):
@@ -20,31 +67,53 @@ class GraphBuilder:
         self.password = os.getenv("NEO4J_PASSWORD")
         self.database = os.getenv("NEO4J_DATABASE", "neo4j")
         
-        if not self.uri or not self.password:
-            raise ValueError("NEO4J_URI and NEO4J_PASSWORD must be set in environment variables")
-        
-        # SSL configuration
-        self.ssl_context = ssl.create_default_context(cafile=certifi.where())
-        
-        # Initialize Neo4j driver with connection timeout
-        self.driver = GraphDatabase.driver(
-            self.uri,
-            auth=(self.user, self.password),
-            max_connection_lifetime=30,
-            max_connection_pool_size=50,
-            connection_timeout=30,
-            ssl_context=self.ssl_context
-        )
+        # The driver is created on first use, so the CSV export runs without Neo4j credentials
+        self._driver = None
         
         # Data directories
         self.dependencies_dir = Path("data/dependencies")
         self.licenses_dir = Path("data/licenses")
+        self.terms_path = Path("data/license_terms.json")
+        
+        # Full license texts live outside the graph, addressed by their SHA-256
+        self.license_blobs = LicenseBlobStore()
+        
+        # Resolves libraries.io "Other" and empty license lists from the raw license strings
+        self.license_normalizer = LicenseNormalizer(self.licenses_dir)
+        
+        # Rows per UNWIND transaction in bulk writes
+        self.batch_size = int(os.getenv("NEO4J_BATCH_SIZE", "1000"))
+        # Parallel write sessions for bulk writes (1 = single session)
+        self.ingest_workers = int(os.getenv("NEO4J_INGEST_WORKERS", "4"))
+
+    @property
+    def driver(self):
+        """Neo4j driver, connected on first use"""
+        if self._driver is None:
+            if not self.uri or not self.password:
+                raise ValueError("NEO4J_URI and NEO4J_PASSWORD must be set in environment variables")
+            
+            # SSL configuration
+            self.ssl_context = ssl.create_default_context(cafile=certifi.where())
+            
+            # Initialize Neo4j driver with connection timeout
+            self._driver = GraphDatabase.driver(
+                self.uri,
+                auth=(self.user, self.password),
+                max_connection_lifetime=30,
+                max_connection_pool_size=50,
+                connection_timeout=30,
+                ssl_context=self.ssl_context
+            )
+        return self._driver
 
     def test_connection(self, max_retries=3):
         """Test the Neo4j connection with retry logic"""
+        # Missing credentials are not worth retrying
+        driver = self.driver
         for attempt in range(max_retries):
             try:
-                with self.driver.session(database=self.database) as session:
+                with driver.session(database=self.database) as session:
                     result = session.run("RETURN 1 as test")
                     if result.single()["test"] == 1:
                         return True
@@ -60,8 +129,9 @@ class GraphBuilder:
 
     def close(self):
         """Close the Neo4j driver connection"""
-        if self.driver:
-            self.driver.close()
+        if self._driver:
+            self._driver.close()
+            self._driver = None
 
     def create_constraints(self):
         """Create unique constraints for nodes"""
@@ -71,6 +141,8 @@ class GraphBuilder:
                 session.run("CREATE CONSTRAINT package_name IF NOT EXISTS FOR (p:Package) REQUIRE p.name IS UNIQUE")
                 # Create constraints for License nodes
                 session.run("CREATE CONSTRAINT license_spdx IF NOT EXISTS FOR (l:License) REQUIRE l.spdx_id IS UNIQUE")
+                # Create constraints for Term nodes
+                session.run("CREATE CONSTRAINT term_name IF NOT EXISTS FOR (t:Term) REQUIRE t.name IS UNIQUE")
                 print("Constraints created successfully")
                 print(f"Connected to Neo4j: {self.uri}")
                 print(f"Database: {self.database}")
@@ -78,6 +150,132 @@ class GraphBuilder:
             print(f"Error creating constraints: {e}")
             raise
 
+    @staticmethod
+    def package_row(package_data):
+        """Node properties of a package record, with a fingerprint over all of them"""
+        row = {
+            "name": package_data["name"],
+            "description": package_data.get("description"),
+            "homepage": package_data.get("homepage"),
+            "language": package_data.get("language"),
+            "latest_release": package_data.get("latest_release_number"),
+            "latest_release_date": package_data.get("latest_release_published_at"),
+            "dependent_repos": package_data.get("dependent_repos_count"),
+            "dependents_count": package_data.get("dependents_count"),
+            "keywords": package_data.get("keywords", []),
+            "repository_url": package_data.get("repository_url"),
+            "package_manager_url": package_data.get("package_manager_url"),
+            "license_expression": package_expression(package_data)
+        }
+        row["fingerprint"] = fingerprint(row)
+        return row
+
+    @staticmethod
+    def edges_fingerprint(package_data):
+        """Fingerprint of a package's outgoing USES_LICENSE and DEPENDS_ON edges"""
+        return fingerprint([
+            sorted(package_data.get("normalized_licenses") or []),
+            sorted(package_data.get("dependencies") or [], key=json.dumps)
+        ])
+
+    def license_row(self, license_data):
+        """Node properties of a license record, with a fingerprint over all of them
+        
+        The node only gets the text's hash and length; building the row does not
+        touch the blob store, the loaders store the text (see license_rows()).
+        """
+        row = {
+            "spdx_id": license_data["basic_info"]["spdx_id"],
+            "name": license_data["basic_info"]["name"],
+            "category": license_data["basic_info"]["category"],
+            "version": license_data["metadata"].get("version"),
+            "submitter": license_data["metadata"].get("submitter"),
+            "steward": license_data["metadata"].get("steward"),
+            "steward_url": license_data["metadata"].get("steward_url"),
+            "content_sha256": LicenseBlobStore.key(license_data["content"]),
+            "content_length": len(license_data["content"]),
+            "content_hash": license_hash(license_data)
+        }
+        row["fingerprint"] = fingerprint(row)
+        return row
+
+    def license_rows(self):
+        """license_row() of every license file, storing each text in the blob store on the way"""
+        for _, license_data in iter_license_files(self.licenses_dir):
+            self.license_blobs.put(license_data["content"])
+            yield self.license_row(license_data)
+
+    @staticmethod
+    def iter_batches(rows, batch_size):
+        """Group an iterable of rows into lists of at most batch_size"""
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    @staticmethod
+    def run_batch(tx, query, rows):
+        """Transaction function for one UNWIND batch"""
+        tx.run(query, rows=rows).consume()
+
+    def write_batches(self, query, rows, batch_size=None):
+        """Stream rows through an UNWIND query, one managed write transaction per batch"""
+        written = 0
+        with self.driver.session(database=self.database) as session:
+            for batch in self.iter_batches(rows, batch_size or self.batch_size):
+                session.execute_write(self.run_batch, query, batch)
+                written += len(batch)
+        return written
+
+    @staticmethod
+    def partition(rows, key, partitions, order=None):
+        """Split rows into disjoint partitions by a stable hash of key(row)
+        
+        Rows sharing a key (the node a transaction MERGEs or hangs edges off)
+        always land in the same partition, so no two sessions write the same
+        key node. Edge rows still lock their other endpoint, and a license or
+        dependency target is shared across partitions, so sessions can contend
+        there. Each partition is sorted by order(row) so every session takes
+        those shared locks in the same order; that keeps lock waits short and
+        deadlocks rare, and the managed transactions retry the ones that happen.
+        """
+        buckets = [[] for _ in range(partitions)]
+        for row in rows:
+            buckets[zlib.crc32(str(key(row)).encode("utf-8")) % partitions].append(row)
+        for bucket in buckets:
+            bucket.sort(key=order or key)
+        return [bucket for bucket in buckets if bucket]
+
+    def write_rows(self, query, rows, key, order=None, batch_size=None):
+        """Write rows with one session, or partitioned across ingest_workers sessions in parallel
+        
+        Every batch is a managed execute_write transaction, so transient errors
+        (including a deadlock detected on a shared end node) are retried by the driver.
+        """
+        if self.ingest_workers <= 1:
+            return self.write_batches(query, rows, batch_size)
+        partitions = self.partition(rows, key, self.ingest_workers, order)
+        if not partitions:
+            return 0
+        with ThreadPoolExecutor(max_workers=len(partitions)) as executor:
+            return sum(executor.map(lambda part: self.write_batches(query, part, batch_size), partitions))
+
+    def normalize_record(self, package_data):
+        """Package record with "Other" or empty normalized_licenses resolved to SPDX ids where possible"""
+        normalized = package_data.get("normalized_licenses") or []
+        if normalized and "Other" not in normalized:
+            return package_data
+        resolved = self.license_normalizer.package_licenses(package_data)
+        if not resolved:
+            return package_data
+        return {**package_data, "normalized_licenses": resolved}
+
+    def iter_package_records(self, package_store):
+        for package_data in package_store.iter_records():
+            yield self.normalize_record(package_data)
+
     def create_package_node(self, package_data):
         """Create a Package node with its properties"""
         query = """
@@ -91,24 +289,14 @@ class GraphBuilder:
             p.dependents_count = $dependents_count,
             p.keywords = $keywords,
             p.repository_url = $repository_url,
-            p.package_manager_url = $package_manager_url
+            p.package_manager_url = $package_manager_url,
+            p.license_expression = $license_expression,
+            p.fingerprint = $fingerprint
         """
         
         try:
             with self.driver.session(database=self.database) as session:
-                session.run(query, {
-                    "name": package_data["name"],
-                    "description": package_data.get("description"),
-                    "homepage": package_data.get("homepage"),
-                    "language": package_data.get("language"),
-                    "latest_release": package_data.get("latest_release_number"),
-                    "latest_release_date": package_data.get("latest_release_published_at"),
-                    "dependent_repos": package_data.get("dependent_repos_count"),
-                    "dependents_count": package_data.get("dependents_count"),
-                    "keywords": package_data.get("keywords", []),
-                    "repository_url": package_data.get("repository_url"),
-                    "package_manager_url": package_data.get("package_manager_url")
-                })
+                session.run(query, self.package_row(package_data))
         except Exception as e:
             print(f"Error creating package node for {package_data['name']}: {e}")
             raise
@@ -123,25 +311,44 @@ class GraphBuilder:
             l.submitter = $submitter,
             l.steward = $steward,
             l.steward_url = $steward_url,
-            l.content = $content
+            l.content_sha256 = $content_sha256,
+            l.content_length = $content_length,
+            l.content_hash = $content_hash,
+            l.fingerprint = $fingerprint
+        REMOVE l.content
         """
         
         try:
+            self.license_blobs.put(license_data["content"])
             with self.driver.session(database=self.database) as session:
-                session.run(query, {
-                    "spdx_id": license_data["basic_info"]["spdx_id"],
-                    "name": license_data["basic_info"]["name"],
-                    "category": license_data["basic_info"]["category"],
-                    "version": license_data["metadata"].get("version"),
-                    "submitter": license_data["metadata"].get("submitter"),
-                    "steward": license_data["metadata"].get("steward"),
-                    "steward_url": license_data["metadata"].get("steward_url"),
-                    "content": license_data["content"]
-                })
+                session.run(query, self.license_row(license_data))
         except Exception as e:
             print(f"Error creating license node for {license_data['basic_info']['spdx_id']}: {e}")
             raise
 
+    def get_license_fingerprints(self):
+        """Fetch the property fingerprint of every License node in one query"""
+        try:
+            with self.driver.session(database=self.database) as session:
+                result = session.run("MATCH (l:License) RETURN l.spdx_id AS spdx_id, l.fingerprint AS fingerprint")
+                return {record["spdx_id"]: record["fingerprint"] for record in result}
+        except Exception as e:
+            print(f"Error fetching license fingerprints: {e}")
+            raise
+
+    def get_license_content(self, spdx_id):
+        """Full text of a license, read from the blob store by the hash on its node"""
+        try:
+            with self.driver.session(database=self.database) as session:
+                record = session.run(
+                    "MATCH (l:License {spdx_id: $spdx_id}) RETURN l.content_sha256 AS content_sha256",
+                    {"spdx_id": spdx_id}
+                ).single()
+        except Exception as e:
+            print(f"Error fetching license {spdx_id}: {e}")
+            raise
+        return self.license_blobs.get(record["content_sha256"]) if record else None
+
     def create_license_relationship(self, package_name, license_spdx):
         """Create a relationship between a Package and its License"""
         query = """
@@ -160,6 +367,518 @@ class GraphBuilder:
             print(f"Error creating relationship between {package_name} and {license_spdx}: {e}")
             raise
 
+    def create_license_nodes(self, rows, batch_size=None):
+        """Bulk-create License nodes from license_row() dicts"""
+        query = """
+        UNWIND $rows AS row
+        MERGE (l:License {spdx_id: row.spdx_id})
+        SET l.name = row.name,
+            l.category = row.category,
+            l.version = row.version,
+            l.submitter = row.submitter,
+            l.steward = row.steward,
+            l.steward_url = row.steward_url,
+            l.content_sha256 = row.content_sha256,
+            l.content_length = row.content_length,
+            l.content_hash = row.content_hash,
+            l.fingerprint = row.fingerprint
+        REMOVE l.content
+        """
+        
+        try:
+            return self.write_rows(query, rows, lambda row: row["spdx_id"], batch_size=batch_size)
+        except Exception as e:
+            print(f"Error creating license nodes: {e}")
+            raise
+
+    def create_package_nodes(self, rows, batch_size=None):
+        """Bulk-create Package nodes from package_row() dicts"""
+        query = """
+        UNWIND $rows AS row
+        MERGE (p:Package {name: row.name})
+        SET p.description = row.description,
+            p.homepage = row.homepage,
+            p.language = row.language,
+            p.latest_release = row.latest_release,
+            p.latest_release_date = row.latest_release_date,
+            p.dependent_repos = row.dependent_repos,
+            p.dependents_count = row.dependents_count,
+            p.keywords = row.keywords,
+            p.repository_url = row.repository_url,
+            p.package_manager_url = row.package_manager_url,
+            p.license_expression = row.license_expression,
+            p.fingerprint = row.fingerprint
+        """
+        
+        try:
+            return self.write_rows(query, rows, lambda row: row["name"], batch_size=batch_size)
+        except Exception as e:
+            print(f"Error creating package nodes: {e}")
+            raise
+
+    def create_license_relationships(self, rows, batch_size=None):
+        """Bulk-create USES_LICENSE edges from {package_name, license_spdx} rows"""
+        query = """
+        UNWIND $rows AS row
+        MATCH (p:Package {name: row.package_name})
+        MATCH (l:License {spdx_id: row.license_spdx})
+        MERGE (p)-[:USES_LICENSE]->(l)
+        """
+        
+        try:
+            return self.write_rows(
+                query, rows, lambda row: row["package_name"],
+                order=lambda row: (row["license_spdx"], row["package_name"]), batch_size=batch_size
+            )
+        except Exception as e:
+            print(f"Error creating license relationships: {e}")
+            raise
+
+    def create_dependency_relationships(self, rows, batch_size=None):
+        """Bulk-create DEPENDS_ON edges between packages, one UNWIND per batch"""
+        query = """
+        UNWIND $rows AS row
+        MATCH (p:Package {name: row.source})
+        MERGE (d:Package {name: row.target})
+        MERGE (p)-[r:DEPENDS_ON]->(d)
+        SET r.requirements = row.requirements,
+            r.kind = row.kind,
+            r.optional = row.optional
+        """
+        
+        try:
+            return self.write_rows(
+                query, rows, lambda row: row["source"],
+                order=lambda row: (row["target"], row["source"]), batch_size=batch_size
+            )
+        except Exception as e:
+            print(f"Error creating dependency relationships: {e}")
+            raise
+
+    def delete_package_edges(self, package_name):
+        """Remove a package's outgoing license and dependency edges before re-creating them"""
+        query = """
+        MATCH (p:Package {name: $package_name})-[r:USES_LICENSE|DEPENDS_ON]->()
+        DELETE r
+        """
+        
+        try:
+            with self.driver.session(database=self.database) as session:
+                session.run(query, {"package_name": package_name})
+        except Exception as e:
+            print(f"Error deleting edges of {package_name}: {e}")
+            raise
+
+    def delete_package(self, package_name):
+        """Remove a Package node and all of its relationships"""
+        try:
+            with self.driver.session(database=self.database) as session:
+                session.run("MATCH (p:Package {name: $package_name}) DETACH DELETE p", {"package_name": package_name})
+        except Exception as e:
+            print(f"Error deleting package {package_name}: {e}")
+            raise
+
+    def apply_changeset(self, changeset_path):
+        """Apply a DependencyCollector.refresh changeset instead of rebuilding the graph"""
+        try:
+            with open(changeset_path, "r", encoding="utf-8") as f:
+                changeset = json.load(f)
+            
+            package_store = open_package_store(self.dependencies_dir)
+            dependency_rows = []
+            for package_name in changeset["added"] + changeset["updated"]:
+                package_data = package_store.get(package_name)
+                if not package_data:
+                    print(f"Skipping {package_name}: not in the package store")
+                    continue
+                package_data = self.normalize_record(package_data)
+                
+                self.create_package_node(package_data)
+                self.delete_package_edges(package_data["name"])
+                for license_spdx in package_data.get("normalized_licenses") or []:
+                    self.create_license_relationship(package_data["name"], license_spdx)
+                dependency_rows.extend({
+                    "source": source,
+                    "target": target,
+                    "requirements": requirements,
+                    "kind": kind,
+                    "optional": optional
+                } for source, target, requirements, kind, optional in package_store.record_edges(package_data))
+            self.create_dependency_relationships(dependency_rows)
+            
+            for package_name in changeset["removed"]:
+                self.delete_package(package_name)
+            
+            print(f"Applied {changeset_path}: {len(changeset['added'])} added, "
+                  f"{len(changeset['updated'])} updated, {len(changeset['removed'])} removed")
+        except Exception as e:
+            print(f"Error applying changeset {changeset_path}: {e}")
+            raise
+
+    @staticmethod
+    def load_term_results(terms_path):
+        """Read the LicenseTermPipeline output, empty if it was never run"""
+        if not Path(terms_path).exists():
+            return {}
+        with open(terms_path, "r", encoding="utf-8") as f:
+            return refold_terms(json.load(f))
+
+    @staticmethod
+    def term_rows(spdx_id, terms):
+        """{spdx_id, term, relationship} rows for one license's parsed terms"""
+        return [
+            {"spdx_id": spdx_id, "term": term, "relationship": relationship}
+            for relationship, names in terms.items()
+            for term in names
+        ]
+
+    def load_license_terms(self, terms_path=None):
+        """Bulk-load parsed license terms as Term nodes and PERMITS/REQUIRES/PROHIBITS edges
+        
+        Each License node keeps a terms_fingerprint; licenses whose parsed terms
+        are unchanged since the last load are skipped entirely.
+        """
+        results = self.load_term_results(terms_path or self.terms_path)
+        try:
+            with self.driver.session(database=self.database) as session:
+                existing = {
+                    record["spdx_id"]: record["terms_fingerprint"]
+                    for record in session.run(
+                        "MATCH (l:License) RETURN l.spdx_id AS spdx_id, l.terms_fingerprint AS terms_fingerprint"
+                    )
+                }
+        except Exception as e:
+            print(f"Error fetching license term fingerprints: {e}")
+            raise
+        
+        changed = {
+            spdx_id: result["terms"] for spdx_id, result in results.items()
+            if spdx_id in existing and existing[spdx_id] != fingerprint(result["terms"])
+        }
+        if not changed:
+            print(f"License terms up to date ({len(results)} parsed licenses)")
+            return {"licenses": 0, "terms": 0, "relationships": 0}
+        
+        reset_query = """
+        UNWIND $rows AS row
+        MATCH (l:License {spdx_id: row.spdx_id})
+        OPTIONAL MATCH (l)-[r:PERMITS|REQUIRES|PROHIBITS]->(:Term)
+        DELETE r
+        WITH DISTINCT l, row
+        SET l.terms_fingerprint = row.terms_fingerprint
+        """
+        term_query = "UNWIND $rows AS row MERGE (:Term {name: row.name})"
+        try:
+            self.write_rows(reset_query, [
+                {"spdx_id": spdx_id, "terms_fingerprint": fingerprint(terms)} for spdx_id, terms in changed.items()
+            ], lambda row: row["spdx_id"])
+            rows = [row for spdx_id, terms in changed.items() for row in self.term_rows(spdx_id, terms)]
+            term_names = sorted({row["term"] for row in rows})
+            self.write_rows(term_query, [{"name": name} for name in term_names], lambda row: row["name"])
+            relationships = 0
+            # Relationship types cannot be parameters, so each type gets its own statement
+            for relationship in TERM_RELATIONSHIPS.values():
+                relationships += self.write_rows(f"""
+                    UNWIND $rows AS row
+                    MATCH (l:License {{spdx_id: row.spdx_id}})
+                    MATCH (t:Term {{name: row.term}})
+                    MERGE (l)-[:{relationship}]->(t)
+                """, [row for row in rows if row["relationship"] == relationship],
+                    lambda row: row["spdx_id"], order=lambda row: (row["term"], row["spdx_id"]))
+        except Exception as e:
+            print(f"Error loading license terms: {e}")
+            raise
+        
+        print(f"Loaded terms of {len(changed)} licenses: {len(term_names)} terms, {relationships} relationships")
+        return {"licenses": len(changed), "terms": len(term_names), "relationships": relationships}
+
+    def get_fingerprints(self):
+        """Fetch the fingerprints of every License and Package node in one query each"""
+        try:
+            with self.driver.session(database=self.database) as session:
+                packages = {
+                    record["name"]: (record["fingerprint"], record["edges_fingerprint"])
+                    for record in session.run("""
+                        MATCH (p:Package)
+                        RETURN p.name AS name, p.fingerprint AS fingerprint, p.edges_fingerprint AS edges_fingerprint
+                    """)
+                }
+            return self.get_license_fingerprints(), packages
+        except Exception as e:
+            print(f"Error fetching fingerprints: {e}")
+            raise
+
+    def delete_nodes(self, label, key, values):
+        """Bulk DETACH DELETE nodes of one label by key"""
+        query = f"UNWIND $rows AS value MATCH (n:{label} {{{key}: value}}) DETACH DELETE n"
+        try:
+            return self.write_rows(query, values, lambda value: value)
+        except Exception as e:
+            print(f"Error deleting {label} nodes: {e}")
+            raise
+
+    def reset_package_edges(self, rows):
+        """Bulk-remove outgoing edges of {name, edges_fingerprint} rows and stamp the new edge fingerprint"""
+        query = """
+        UNWIND $rows AS row
+        MATCH (p:Package {name: row.name})
+        OPTIONAL MATCH (p)-[r:USES_LICENSE|DEPENDS_ON]->()
+        DELETE r
+        WITH DISTINCT p, row
+        SET p.edges_fingerprint = row.edges_fingerprint
+        """
+        try:
+            return self.write_rows(query, rows, lambda row: row["name"])
+        except Exception as e:
+            print(f"Error resetting package edges: {e}")
+            raise
+
+    def sync_graph(self):
+        """Bring the graph in line with the local data, writing only what differs
+        
+        Node fingerprints are fetched once and compared locally. Only created or
+        changed nodes are written and only stale ones deleted; a package's
+        outgoing edges are rebuilt when its edge fingerprint changed, when one of
+        its dependencies appeared or disappeared as a collected package, or when
+        one of its licenses gained a node. Returns per-category counts.
+        """
+        existing_licenses, existing_packages = self.get_fingerprints()
+        stats = {
+            "licenses": {"created": 0, "changed": 0, "deleted": 0, "unchanged": 0},
+            "packages": {"created": 0, "changed": 0, "deleted": 0, "unchanged": 0},
+            "edges": {"packages_resynced": 0, "uses_license": 0, "depends_on": 0}
+        }
+        
+        # Licenses
+        local_licenses = set()
+        created_licenses = set()
+        license_rows = []
+        for row in self.license_rows():
+            local_licenses.add(row["spdx_id"])
+            if row["spdx_id"] not in existing_licenses:
+                stats["licenses"]["created"] += 1
+                created_licenses.add(row["spdx_id"])
+            elif existing_licenses[row["spdx_id"]] != row["fingerprint"]:
+                stats["licenses"]["changed"] += 1
+            else:
+                stats["licenses"]["unchanged"] += 1
+                continue
+            license_rows.append(row)
+        self.create_license_nodes(license_rows)
+        # Only nodes this sync wrote carry a fingerprint; hand-made licenses are left alone
+        deleted_licenses = [spdx_id for spdx_id, fp in existing_licenses.items()
+                            if fp is not None and spdx_id not in local_licenses]
+        stats["licenses"]["deleted"] = self.delete_nodes("License", "spdx_id", deleted_licenses)
+        
+        # Package nodes, streamed in batches
+        package_store = open_package_store(self.dependencies_dir)
+        names = {}
+        # Canonical names that became, or stopped being, collected packages
+        touched = set()
+        resync = set()
+        for batch in self.iter_batches(self.iter_package_records(package_store), self.batch_size):
+            package_rows = []
+            for package_data in batch:
+                row = self.package_row(package_data)
+                names[canonical_name(row["name"])] = row["name"]
+                node_fingerprint, edges_fingerprint = existing_packages.get(row["name"], (None, None))
+                if node_fingerprint is None:
+                    # New, or so far only a bare dependency target
+                    stats["packages"]["created"] += 1
+                    touched.add(canonical_name(row["name"]))
+                    package_rows.append(row)
+                elif node_fingerprint != row["fingerprint"]:
+                    stats["packages"]["changed"] += 1
+                    package_rows.append(row)
+                else:
+                    stats["packages"]["unchanged"] += 1
+                if edges_fingerprint != self.edges_fingerprint(package_data):
+                    resync.add(row["name"])
+            self.create_package_nodes(package_rows)
+        deleted_packages = [name for name, (fp, _) in existing_packages.items()
+                            if fp is not None and canonical_name(name) not in names]
+        touched.update(canonical_name(name) for name in deleted_packages)
+        stats["packages"]["deleted"] = self.delete_nodes("Package", "name", deleted_packages)
+        
+        # Edges of packages whose edge set, or the nodes it resolves to, changed
+        for batch in self.iter_batches(self.iter_package_records(package_store), self.batch_size):
+            stale = [
+                package_data for package_data in batch
+                if package_data["name"] in resync
+                or created_licenses.intersection(package_data.get("normalized_licenses") or [])
+                or any(canonical_name(target) in touched for target, _, _, _ in package_data.get("dependencies") or [])
+            ]
+            if not stale:
+                continue
+            self.reset_package_edges([
+                {"name": package_data["name"], "edges_fingerprint": self.edges_fingerprint(package_data)}
+                for package_data in stale
+            ])
+            stats["edges"]["packages_resynced"] += len(stale)
+            stats["edges"]["uses_license"] += self.create_license_relationships([
+                {"package_name": package_data["name"], "license_spdx": license_spdx}
+                for package_data in stale
+                for license_spdx in package_data.get("normalized_licenses") or []
+                if license_spdx in local_licenses
+            ])
+            stats["edges"]["depends_on"] += self.create_dependency_relationships([{
+                "source": source,
+                "target": target,
+                "requirements": requirements,
+                "kind": kind,
+                "optional": optional
+            } for package_data in stale
+                for source, target, requirements, kind, optional in package_store.record_edges(package_data, names)])
+        
+        if self.terms_path.exists():
+            stats["terms"] = self.load_license_terms()
+        
+        print(f"Sync complete: licenses {stats['licenses']}, packages {stats['packages']}, edges {stats['edges']}")
+        return stats
+
+    @staticmethod
+    def csv_value(value):
+        """Render a property value the way neo4j-admin import parses it"""
+        if value is None:
+            return ""
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, (list, tuple)):
+            # ';' is the default array delimiter, so it cannot appear inside an element
+            return ";".join(str(item).replace(";", ",") for item in value)
+        return value
+
+    def write_csv_row(self, writer, header, row, label=None):
+        values = [self.csv_value(row.get(key)) for key in header]
+        writer.writerow(values + [label] if label else values)
+
+    def export_admin_import(self, output_dir="data/neo4j_import", matrix_file=None):
+        """Export the graph as header-typed CSVs for `neo4j-admin database import full`
+        
+        Records are streamed from the package store and the license files straight
+        to disk; only the set of package names is kept in memory, to emit stub
+        Package nodes for dependency targets that were never collected and to drop
+        USES_LICENSE edges to licenses with no node (as the Bolt build does).
+        Nothing outside output_dir is written: the license texts go to the blob
+        store on the next build_graph() or sync_graph() run.
+        Returns the neo4j-admin command line for the written files.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        files = {}
+        
+        def open_csv(name, header):
+            path = output_dir / f"{name}.csv"
+            files[name] = path
+            f = open(path, "w", encoding="utf-8", newline="")
+            writer = csv.writer(f)
+            writer.writerow(header)
+            return f, writer
+        
+        # License nodes
+        license_ids = set()
+        f, writer = open_csv("licenses", list(LICENSE_HEADER.values()) + [":LABEL"])
+        with f:
+            for _, license_data in iter_license_files(self.licenses_dir):
+                row = self.license_row(license_data)
+                license_ids.add(row["spdx_id"])
+                self.write_csv_row(writer, LICENSE_HEADER, row, "License")
+        
+        # Package nodes and USES_LICENSE edges in one pass over the store
+        package_store = open_package_store(self.dependencies_dir)
+        names = {}
+        counts = {"packages": 0, "licenses": len(license_ids), "uses_license": 0, "depends_on": 0,
+                  "stub_packages": 0, "is_compatible_with": 0}
+        f, writer = open_csv("packages", list(PACKAGE_HEADER.values()) + [":LABEL"])
+        uses_f, uses_writer = open_csv("uses_license", [":START_ID(Package)", ":END_ID(License)", ":TYPE"])
+        with f, uses_f:
+            for package_data in self.iter_package_records(package_store):
+                row = self.package_row(package_data)
+                if canonical_name(row["name"]) in names:
+                    continue
+                names[canonical_name(row["name"])] = row["name"]
+                self.write_csv_row(writer, PACKAGE_HEADER, row, "Package")
+                counts["packages"] += 1
+                # A relationship file row is a relationship, so listing a license twice must not double it
+                for license_spdx in dict.fromkeys(package_data.get("normalized_licenses") or []):
+                    if license_spdx in license_ids:
+                        uses_writer.writerow([row["name"], license_spdx, "USES_LICENSE"])
+                        counts["uses_license"] += 1
+        
+        # DEPENDS_ON edges in a second streaming pass; unknown targets become stub Package nodes
+        stubs = set()
+        sources = set()
+        f, writer = open_csv("depends_on", [":START_ID(Package)", ":END_ID(Package)", "requirements",
+                                            "kind", "optional:boolean", ":TYPE"])
+        with f:
+            for package_data in package_store.iter_records():
+                if canonical_name(package_data["name"]) in sources:
+                    continue
+                sources.add(canonical_name(package_data["name"]))
+                # One edge per target, as MERGE gives the Bolt build
+                targets = set()
+                for source, target, requirements, kind, optional in package_store.record_edges(package_data, names):
+                    if canonical_name(target) in targets:
+                        continue
+                    targets.add(canonical_name(target))
+                    if canonical_name(target) not in names:
+                        stubs.add(target)
+                    writer.writerow([source, target, self.csv_value(requirements), self.csv_value(kind),
+                                     self.csv_value(bool(optional)), "DEPENDS_ON"])
+                    counts["depends_on"] += 1
+        f, writer = open_csv("stub_packages", ["name:ID(Package)", ":LABEL"])
+        with f:
+            for name in sorted(stubs):
+                writer.writerow([name, "Package"])
+        counts["stub_packages"] = len(stubs)
+        
+        # Term nodes and PERMITS/REQUIRES/PROHIBITS edges from the parsed license terms
+        term_results = self.load_term_results(self.terms_path)
+        if term_results:
+            term_names = set()
+            counts["license_terms"] = 0
+            f, writer = open_csv("license_terms", [":START_ID(License)", ":END_ID(Term)", ":TYPE"])
+            with f:
+                for spdx_id, result in sorted(term_results.items()):
+                    if spdx_id not in license_ids:
+                        continue
+                    for row in self.term_rows(spdx_id, result["terms"]):
+                        term_names.add(row["term"])
+                        writer.writerow([spdx_id, row["term"], row["relationship"]])
+                        counts["license_terms"] += 1
+            f, writer = open_csv("terms", ["name:ID(Term)", ":LABEL"])
+            with f:
+                for name in sorted(term_names):
+                    writer.writerow([name, "Term"])
+            counts["terms"] = len(term_names)
+        
+        # License compatibility edges from the matrix CSV, when one is given
+        if matrix_file:
+            from license_compatibility import LicenseCompatibilityBuilder
+            edges = LicenseCompatibilityBuilder.matrix_edges(pd.read_csv(matrix_file))
+            edges = edges[edges["source"].isin(license_ids) & edges["target"].isin(license_ids)]
+            f, writer = open_csv("is_compatible_with", [":START_ID(License)", ":END_ID(License)", "id",
+                                                        "is_compatible:boolean", ":TYPE"])
+            with f:
+                for source, target, relationship_id, is_compatible in edges.itertuples(index=False):
+                    writer.writerow([source, target, relationship_id, self.csv_value(bool(is_compatible)),
+                                     "IS_COMPATIBLE_WITH"])
+            counts["is_compatible_with"] = len(edges)
+        
+        node_names = ("licenses", "packages", "stub_packages", "terms")
+        node_files = [path for name, path in files.items() if name in node_names]
+        relationship_files = [path for name, path in files.items() if name not in node_names]
+        command = " ".join(
+            ["neo4j-admin database import full", self.database, "--multiline-fields=true"]
+            + [f"--nodes={path}" for path in node_files]
+            + [f"--relationships={path}" for path in relationship_files]
+        )
+        print(f"Exported {counts} to {output_dir}")
+        print(f"Import into a stopped, empty database with:\n  {command}")
+        print("Then run build_graph's create_constraints() once the database is started, "
+              "and sync_graph() to store the license texts.")
+        return command
+
     def build_graph(self):
         """Build the complete graph from the collected data"""
         try:
@@ -174,37 +893,47 @@ class GraphBuilder:
             # Create constraints
             self.create_constraints()
             
-            # Process license files
+            # Process license files, skipping those whose node fingerprint already matches.
+            # The fingerprint covers every property (metadata as well as the content hash),
+            # and nodes from before fingerprints, or still carrying their text inline, have none.
             print("\nProcessing license files...")
-            for license_file in self.licenses_dir.glob("*.json"):
-                if license_file.name == "summary.json":
-                    continue
-                    
-                with open(license_file, "r", encoding="utf-8") as f:
-                    license_data = json.load(f)
-                    self.create_license_node(license_data)
-                    print(f"Processed license: {license_data['basic_info']['spdx_id']}")
-                    time.sleep(0.1)  # Small delay to avoid overwhelming the database
+            existing_fingerprints = self.get_license_fingerprints()
+            license_rows = (
+                row for row in self.license_rows()
+                if existing_fingerprints.get(row["spdx_id"]) != row["fingerprint"]
+            )
+            written = self.create_license_nodes(license_rows)
+            print(f"Processed {written} licenses ({len(existing_fingerprints)} already in the graph)")
             
-            # Process dependency files
-            print("\nProcessing dependency files...")
-            for dep_file in self.dependencies_dir.glob("*.json"):
-                if dep_file.name == "summary.json":
-                    continue
-                    
-                with open(dep_file, "r", encoding="utf-8") as f:
-                    package_data = json.load(f)
-                    
-                    # Create package node
-                    self.create_package_node(package_data)
-                    
-                    # Create license relationships
-                    if package_data.get("normalized_licenses"):
-                        for license_spdx in package_data["normalized_licenses"]:
-                            self.create_license_relationship(package_data["name"], license_spdx)
-                    
-                    print(f"Processed package: {package_data['name']}")
-                    time.sleep(0.1)  # Small delay to avoid overwhelming the database
+            # Process package records from the packed store: all nodes first, then their license edges
+            print(f"\nProcessing package records with {self.ingest_workers} write sessions...")
+            package_store = open_package_store(self.dependencies_dir)
+            packages = self.create_package_nodes(
+                self.package_row(package_data) for package_data in self.iter_package_records(package_store)
+            )
+            uses_license = self.create_license_relationships(
+                {"package_name": package_data["name"], "license_spdx": license_spdx}
+                for package_data in self.iter_package_records(package_store)
+                for license_spdx in package_data.get("normalized_licenses") or []
+            )
+            print(f"Processed {packages} packages and {uses_license} license relationships")
+            
+            # Create dependency edges; targets that were never collected become bare Package nodes
+            print("\nProcessing dependency edges...")
+            dependency_rows = ({
+                "source": source,
+                "target": target,
+                "requirements": requirements,
+                "kind": kind,
+                "optional": optional
+            } for source, target, requirements, kind, optional in package_store.iter_edges())
+            edges = self.create_dependency_relationships(dependency_rows)
+            print(f"Processed {edges} dependency edges")
+            
+            # Parsed license terms, when license_terms.py has been run
+            if self.terms_path.exists():
+                print("\nProcessing license terms...")
+                self.load_license_terms()
             
             print("\nGraph construction complete!")
             
@@ -215,7 +944,30 @@ class GraphBuilder:
 
 def main():
     builder = GraphBuilder()
-    builder.build_graph()
+    # GRAPH_CHANGESET=data/changesets/<file>.json applies one refresh instead of a full build
+    changeset_path = os.getenv("GRAPH_CHANGESET")
+    # GRAPH_EXPORT_DIR=<dir> writes neo4j-admin import CSVs instead of loading over Bolt
+    export_dir = os.getenv("GRAPH_EXPORT_DIR")
+    # GRAPH_SYNC=1 writes only the nodes and edges that differ from the graph
+    sync = os.getenv("GRAPH_SYNC", "0") == "1"
+    if export_dir:
+        try:
+            builder.export_admin_import(export_dir, os.getenv("GRAPH_MATRIX_FILE"))
+        finally:
+            builder.close()
+    elif changeset_path:
+        try:
+            builder.apply_changeset(changeset_path)
+        finally:
+            builder.close()
+    elif sync:
+        try:
+            builder.create_constraints()
+            builder.sync_graph()
+        finally:
+            builder.close()
+    else:
+        builder.build_graph()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
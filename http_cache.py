@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+import requests
+
+
+class CachedResponse:
+    """Minimal response object returned by HTTPCache for both sync and async fetches"""
+
+    def __init__(self, url, status_code, content, from_cache=False, retry_after=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.from_cache = from_cache
+        self.retry_after = retry_after
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+class HTTPCache:
+    """On-disk HTTP response cache driven by conditional requests
+
+    Responses carrying an ETag or Last-Modified validator are stored under
+    `cache_dir`, keyed by URL and query parameters (secrets such as api_key are
+    left out of the key). Later fetches send If-None-Match / If-Modified-Since
+    and a 304 is served from disk as a cache hit. The cache is bounded to
+    `max_bytes` of bodies and evicts the least recently used entries first.
+
+    Several processes may share one cache directory (the sharded collector's
+    workers do): files are written to a temporary name and renamed into
+    place, so a reader sees either the old or the new file, never a torn one.
+    """
+
+    # Query parameters that never take part in the cache key
+    ignored_params = ("api_key",)
+
+    def __init__(self, cache_dir="data/http_cache", max_bytes=256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        self.load_index()
+
+    def load_index(self):
+        """Scan the cache directory and rebuild the in-memory entry index"""
+        for meta_file in self.cache_dir.glob("*.json"):
+            body_file = meta_file.with_suffix(".body")
+            try:
+                with open(meta_file, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                # The body's mtime is touched on every hit and doubles as the LRU timestamp
+                meta["last_access"] = body_file.stat().st_mtime
+            except (OSError, json.JSONDecodeError):
+                continue
+            self.entries[meta_file.stem] = meta
+            self.total_bytes += meta["size"]
+
+    def cache_key(self, url, params=None):
+        """Hash of the URL and its non-secret query parameters"""
+        kept = sorted((k, v) for k, v in (params or {}).items() if k not in self.ignored_params)
+        return hashlib.sha256(f"{url}?{urlencode(kept)}".encode("utf-8")).hexdigest()
+
+    def conditional_headers(self, key):
+        """Validator headers for a cached entry, if we have one"""
+        meta = self.entries.get(key)
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def read_body(self, key):
+        """Serve a cached body and mark the entry as recently used, or None if it is gone"""
+        body_file = self.cache_dir / f"{key}.body"
+        try:
+            content = body_file.read_bytes()
+        except OSError:
+            # Evicted by another process sharing the cache directory
+            with self.lock:
+                meta = self.entries.pop(key, None)
+                if meta:
+                    self.total_bytes -= meta["size"]
+            return None
+        now = time.time()
+        os.utime(body_file, (now, now))
+        with self.lock:
+            self.entries[key]["last_access"] = now
+            self.hits += 1
+            self.bytes_saved += len(content)
+        return content
+
+    def store(self, key, url, content, headers):
+        """Persist a 200 response when it carries a validator we can revalidate with"""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        if len(content) > self.max_bytes:
+            return
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "size": len(content),
+            "stored_at": time.time()
+        }
+        with self.lock:
+            previous = self.entries.get(key)
+            if previous:
+                self.total_bytes -= previous["size"]
+            # Write the body before the metadata so a crash never leaves metadata without a body
+            self.write_atomic(self.cache_dir / f"{key}.body", content)
+            self.write_atomic(self.cache_dir / f"{key}.json", json.dumps(meta).encode("utf-8"))
+            meta["last_access"] = time.time()
+            self.entries[key] = meta
+            self.total_bytes += meta["size"]
+            self.evict()
+
+    @staticmethod
+    def write_atomic(path, data):
+        """Replace a file in one rename; the temporary name is per process and matches no cache glob"""
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key in sorted(self.entries, key=lambda k: self.entries[k]["last_access"]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            meta = self.entries.pop(key)
+            self.total_bytes -= meta["size"]
+            self.evictions += 1
+            for suffix in (".json", ".body"):
+                try:
+                    os.remove(self.cache_dir / f"{key}{suffix}")
+                except OSError:
+                    pass
+
+    def get(self, session, url, params=None, headers=None, timeout=30):
+        """Conditional GET through a requests session"""
+        key = self.cache_key(url, params)
+        request_headers = dict(headers or {})
+        request_headers.update(self.conditional_headers(key))
+        response = session.get(url, params=params, headers=request_headers, timeout=timeout)
+        if response.status_code == 304 and key in self.entries:
+            content = self.read_body(key)
+            if content is not None:
+                return CachedResponse(url, 200, content, from_cache=True)
+            return self.get(session, url, params, headers, timeout)
+        with self.lock:
+            self.misses += 1
+        if response.status_code == 200:
+            self.store(key, url, response.content, response.headers)
+        return CachedResponse(url, response.status_code, response.content,
+                              retry_after=response.headers.get("Retry-After"))
+
+    async def get_async(self, session, url, params=None, headers=None):
+        """Conditional GET through an aiohttp session"""
+        key = self.cache_key(url, params)
+        request_headers = dict(headers or {})
+        request_headers.update(self.conditional_headers(key))
+        async with session.get(url, params=params, headers=request_headers) as response:
+            if response.status == 304 and key in self.entries:
+                content = self.read_body(key)
+                if content is not None:
+                    return CachedResponse(url, 200, content, from_cache=True)
+                stale = True
+            else:
+                stale = False
+                content = await response.read()
+        if stale:
+            return await self.get_async(session, url, params, headers)
+        with self.lock:
+            self.misses += 1
+        if response.status == 200:
+            self.store(key, url, content, response.headers)
+        return CachedResponse(url, response.status, content,
+                              retry_after=response.headers.get("Retry-After"))
+
+    def stats(self):
+        """Hit/miss counters for reporting at the end of a run"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "bytes_saved": self.bytes_saved,
+            "entries": len(self.entries),
+            "cached_bytes": self.total_bytes
+        }
@@ -0,0 +1,49 @@
+import hashlib
+import os
+from pathlib import Path
+
+
+class LicenseBlobStore:
+    """Content-addressed store for full license texts
+
+    Each text is written once to `<root>/<sha[:2]>/<sha>.txt`, keyed by the
+    SHA-256 of its exact UTF-8 bytes. The graph only keeps that hash and the
+    text length on License nodes; callers that actually need the text (RAG,
+    the UI) read it back from here on demand.
+    """
+
+    def __init__(self, root="data/license_blobs"):
+        self.root = Path(root)
+
+    @staticmethod
+    def key(text):
+        """SHA-256 of the exact license text"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def path(self, sha256):
+        return self.root / sha256[:2] / f"{sha256}.txt"
+
+    def __contains__(self, sha256):
+        return self.path(sha256).exists()
+
+    def put(self, text):
+        """Store a text if it is not there yet and return its hash"""
+        sha256 = self.key(text)
+        path = self.path(sha256)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        return sha256
+
+    def get(self, sha256):
+        """Read a text back by hash, None if it is not stored"""
+        if not sha256:
+            return None
+        path = self.path(sha256)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return f.read()
@@ -1,6 +1,5 @@
 import pandas as pd
 from neo4j import GraphDatabase
-import time
 import ssl
 import os
 import certifi
@@ -27,6 +26,9 @@ class LicenseCompatibilityBuilder:
             connection_timeout=30,
             ssl_context=self.ssl_context
         )
+        
+        # Rows per UNWIND write transaction
+        self.batch_size = int(os.getenv("NEO4J_BATCH_SIZE", "1000"))
 
     def close(self):
         """Close the Neo4j driver connection"""
@@ -68,49 +70,62 @@ class LicenseCompatibilityBuilder:
             print(f"Error creating compatibility relationship between {source_license} and {target_license}: {e}")
             raise
 
+    @staticmethod
+    def matrix_edges(df):
+        """Flatten the square matrix into one row per (source, target) pair, self-pairs excluded
+        
+        The first column holds the license ids and column j+1 holds the verdicts
+        against license j, so the columns are relabelled by position before stacking.
+        """
+        matrix = df.set_index(df.columns[0])
+        matrix.columns = matrix.index[:len(matrix.columns)]
+        matrix.index.name = "source"
+        matrix.columns.name = "target"
+        # Empty cells count as "Unknown" like before; stack() would otherwise drop them
+        edges = matrix.fillna("Unknown").stack().rename("value").reset_index()
+        edges = edges[edges["source"] != edges["target"]]
+        # Anything other than "Yes" (including "Unknown") is treated as incompatible
+        edges["is_compatible"] = edges["value"] == "Yes"
+        edges["id"] = edges["source"] + "_" + edges["target"]
+        return edges[["source", "target", "id", "is_compatible"]]
+
+    @staticmethod
+    def run_batch(tx, query, rows):
+        """Transaction function for one UNWIND batch"""
+        tx.run(query, rows=rows).consume()
+
+    def create_compatibility_relationships(self, rows, batch_size=None):
+        """Bulk-create compatibility relationships, one write transaction per batch"""
+        query = """
+        UNWIND $rows AS row
+        MATCH (l1:License {spdx_id: row.source})
+        MATCH (l2:License {spdx_id: row.target})
+        MERGE (l1)-[r:IS_COMPATIBLE_WITH {id: row.id}]->(l2)
+        SET r.is_compatible = row.is_compatible
+        """
+        batch_size = batch_size or self.batch_size
+        
+        try:
+            with self.driver.session() as session:
+                for start in range(0, len(rows), batch_size):
+                    session.execute_write(self.run_batch, query, rows[start:start + batch_size])
+                    print(f"Processed {min(start + batch_size, len(rows))}/{len(rows)} relationships")
+        except Exception as e:
+            print(f"Error creating compatibility relationships: {e}")
+            raise
+
     def process_compatibility_matrix(self, matrix_file):
         """Process the compatibility matrix and create relationships"""
         try:
-            # Read the matrix CSV file
+            # Read the matrix CSV file and flatten it into an edge list in one pass
             df = pd.read_csv(matrix_file)
-            
-            # Get the license IDs (first column)
-            license_ids = df.iloc[:, 0].tolist()
+            edges = self.matrix_edges(df)
             
             # Create compatibility constraint
             self.create_compatibility_constraint()
             
-            # Process each row in the matrix
-            total_relationships = len(license_ids) * len(license_ids)
-            processed = 0
-            
-            print(f"Processing {total_relationships} potential compatibility relationships...")
-            
-            for i, source_license in enumerate(license_ids):
-                for j, target_license in enumerate(license_ids):
-                    # Skip self-compatibility
-                    if i == j:
-                        continue
-                    
-                    # Get compatibility value
-                    compatibility_value = df.iloc[i, j+1]
-                    
-                    # Convert compatibility value to boolean
-                    is_compatible = False
-                    if compatibility_value == "Yes":
-                        is_compatible = True
-                    elif compatibility_value == "Unknown":
-                        is_compatible = False  # Set unknown to False as requested
-                    
-                    # Create the relationship
-                    self.create_compatibility_relationship(source_license, target_license, is_compatible)
-                    
-                    processed += 1
-                    if processed % 100 == 0:
-                        print(f"Processed {processed}/{total_relationships} relationships")
-                    
-                    # Small delay to avoid overwhelming the database
-                    time.sleep(0.01)
+            print(f"Processing {len(edges)} compatibility relationships...")
+            self.create_compatibility_relationships(edges.to_dict("records"))
             
             print("\nCompatibility relationships creation complete!")
             
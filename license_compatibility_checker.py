@@ -5,8 +5,16 @@ import ssl
 import certifi
 import json
 import os
+import sys
 from dotenv import load_dotenv
-from typing import Dict, List, Tuple
+from pathlib import Path
+from typing import Dict, List, Tuple, Optional
+from license_blob_store import LicenseBlobStore
+from compatibility_matrix import CompatibilityMatrix
+from package_store import PackageStore, canonical_name
+from project_manifest import read_dependencies
+from dependency_audit import DependencyAuditor
+from spdx_expression import ExpressionError, compile_expression, evaluate
 
 class LicenseCompatibilityChecker:
     def __init__(self):
@@ -38,77 +46,168 @@ class LicenseCompatibilityChecker:
 
         self.driver = GraphDatabase.driver(self.uri, **driver_kwargs)
 
+        # License full texts are kept out of the graph and only read when asked for
+        self.license_blobs = LicenseBlobStore()
+
+        # IS_COMPATIBLE_WITH is small and static: load it once, on first use
+        self.matrix_file = os.getenv("COMPATIBILITY_MATRIX_CSV")
+        self._matrix = None
+        self._verdicts = {}
+
+        # Local package store, used to match requirement names to graph spellings
+        self.package_store_path = Path("data/packages.jsonl")
+
+        # Local dependency auditor, kept so its memoized subtree results are reused
+        self._auditor = None
+        self._auditor_key = None
+
     def close(self):
         """Close the Neo4j driver connection"""
         if self.driver:
             self.driver.close()
 
-    def get_package_info(self, package_name: str) -> Dict:
-        """Get package information and its licenses"""
+    @staticmethod
+    def package_info(package, licenses) -> Dict:
+        """Shape a Package node and its License nodes into the checker's result dict"""
+        license_ids = [l["spdx_id"] for l in licenses]
+        return {
+            "name": package["name"],
+            "description": package.get("description"),
+            "homepage": package.get("homepage"),
+            "language": package.get("language"),
+            "latest_release": package.get("latest_release"),
+            "latest_release_date": package.get("latest_release_date"),
+            "dependent_repos": package.get("dependent_repos"),
+            "dependents_count": package.get("dependents_count"),
+            "keywords": package.get("keywords", []),
+            "repository_url": package.get("repository_url"),
+            "package_manager_url": package.get("package_manager_url"),
+            # Nodes loaded before expressions were stored read as a choice between their licenses
+            "license_expression": package.get("license_expression") or " OR ".join(license_ids) or None,
+            "licenses": [{
+                "spdx_id": l["spdx_id"],
+                "name": l["name"],
+                "category": l["category"],
+                "version": l.get("version"),
+                "submitter": l.get("submitter"),
+                "steward": l.get("steward"),
+                "steward_url": l.get("steward_url"),
+                "content_sha256": l.get("content_sha256")
+            } for l in licenses]
+        }
+
+    def get_packages_info(self, package_names: List[str]) -> Dict[str, Dict]:
+        """Get several packages and their licenses in a single query, keyed by the requested name"""
         query = """
-        MATCH (p:Package {name: $package_name})
+        UNWIND $package_names AS package_name
+        MATCH (p:Package {name: package_name})
         OPTIONAL MATCH (p)-[:USES_LICENSE]->(l:License)
-        RETURN p, collect(l) as licenses
+        RETURN package_name, p, collect(l) as licenses
         """
         
         try:
             with self.driver.session(database=self.database) as session:
-                result = session.run(query, {"package_name": package_name})
-                record = result.single()
-                if record:
-                    package = record["p"]
-                    licenses = record["licenses"]
-                    return {
-                        "name": package["name"],
-                        "description": package.get("description"),
-                        "homepage": package.get("homepage"),
-                        "language": package.get("language"),
-                        "latest_release": package.get("latest_release"),
-                        "latest_release_date": package.get("latest_release_date"),
-                        "dependent_repos": package.get("dependent_repos"),
-                        "dependents_count": package.get("dependents_count"),
-                        "keywords": package.get("keywords", []),
-                        "repository_url": package.get("repository_url"),
-                        "package_manager_url": package.get("package_manager_url"),
-                        "licenses": [{
-                            "spdx_id": l["spdx_id"],
-                            "name": l["name"],
-                            "category": l["category"],
-                            "version": l.get("version"),
-                            "submitter": l.get("submitter"),
-                            "steward": l.get("steward"),
-                            "steward_url": l.get("steward_url")
-                        } for l in licenses]
-                    }
-                return None
+                result = session.run(query, {"package_names": list(dict.fromkeys(package_names))})
+                return {
+                    record["package_name"]: self.package_info(record["p"], record["licenses"])
+                    for record in result
+                }
         except Exception as e:
-            print(f"Error getting package info for {package_name}: {e}")
-            return None
+            print(f"Error getting package info for {', '.join(package_names)}: {e}")
+            return {}
 
-    def check_license_compatibility(self, license1: str, license2: str) -> bool:
-        """Check if two licenses are compatible"""
-        query = """
-        MATCH (l1:License {spdx_id: $license1})-[r:IS_COMPATIBLE_WITH]->(l2:License {spdx_id: $license2})
-        RETURN r.is_compatible as is_compatible
+    def get_package_info(self, package_name: str) -> Dict:
+        """Get package information and its licenses"""
+        return self.get_packages_info([package_name]).get(package_name)
+
+    def get_license_text(self, license_spdx: str = None, content_sha256: str = None) -> Optional[str]:
+        """Lazily load a license's full text from the blob store
+        
+        Pass the content_sha256 from get_package_info to skip the graph lookup.
         """
+        if content_sha256 is None:
+            query = "MATCH (l:License {spdx_id: $license_spdx}) RETURN l.content_sha256 AS content_sha256"
+            try:
+                with self.driver.session(database=self.database) as session:
+                    record = session.run(query, {"license_spdx": license_spdx}).single()
+                    content_sha256 = record["content_sha256"] if record else None
+            except Exception as e:
+                print(f"Error getting license text for {license_spdx}: {e}")
+                return None
+        return self.license_blobs.get(content_sha256)
+
+    @property
+    def matrix(self) -> CompatibilityMatrix:
+        """The in-memory compatibility matrix, loaded on first access"""
+        if self._matrix is None:
+            return self.refresh_compatibility_matrix()
+        return self._matrix
+
+    def refresh_compatibility_matrix(self) -> CompatibilityMatrix:
+        """(Re)load the compatibility matrix; call after the IS_COMPATIBLE_WITH data changes
         
+        Reads COMPATIBILITY_MATRIX_CSV when set, otherwise the graph in one query.
+        The new matrix replaces the old one in a single assignment, so concurrent
+        readers see either the old or the new data, never a mix. A failed load
+        keeps the previous matrix; with none loaded yet, it answers from an empty
+        matrix that is not cached, so the next lookup tries again.
+        """
         try:
-            with self.driver.session(database=self.database) as session:
-                result = session.run(query, {
-                    "license1": license1,
-                    "license2": license2
-                })
-                record = result.single()
-                return record["is_compatible"] if record else False
+            if self.matrix_file:
+                matrix = CompatibilityMatrix.from_csv(self.matrix_file)
+            else:
+                matrix = CompatibilityMatrix.from_graph(self.driver, self.database)
         except Exception as e:
-            print(f"Error checking compatibility between {license1} and {license2}: {e}")
-            return False
+            print(f"Error loading compatibility matrix: {e}")
+            return self._matrix if self._matrix is not None else CompatibilityMatrix()
+        self._matrix = matrix
+        self._verdicts = {}
+        print(f"Loaded compatibility matrix for {len(matrix)} licenses")
+        return matrix
+
+    def check_license_compatibility(self, license1: str, license2: str) -> bool:
+        """Check if two licenses are compatible (an O(1) lookup in the in-memory matrix)"""
+        return self.matrix.is_compatible(license1, license2)
+
+    def is_known_license(self, spdx_id: str) -> bool:
+        """Whether the compatibility matrix has any verdicts for a license"""
+        return spdx_id in self.matrix
+
+    @staticmethod
+    def compiled_expression(info: Dict):
+        """Compiled license expression of a package, None when it declares no license"""
+        expression = info.get("license_expression")
+        if expression:
+            try:
+                return compile_expression(expression)
+            except ExpressionError:
+                pass
+        license_ids = [l["spdx_id"] for l in info["licenses"]]
+        return compile_expression(" OR ".join(license_ids)) if license_ids else None
+
+    def expression_compatible(self, expression: str, outbound_license: str) -> bool:
+        """Whether code under an SPDX expression may be used under the outbound license (memoized)"""
+        key = (expression, outbound_license)
+        verdict = self._verdicts.get(key)
+        if verdict is None:
+            verdict = evaluate(
+                compile_expression(expression),
+                lambda spdx_id: self.check_license_compatibility(spdx_id, outbound_license)
+            )
+            self._verdicts[key] = verdict
+        return verdict
 
     def check_packages_compatibility(self, package1: str, package2: str) -> Dict:
-        """Check compatibility between two packages based on their licenses"""
+        """Check compatibility between two packages based on their licenses
+        
+        Both packages come back from one query; every license pair is then
+        judged against the in-memory matrix, so the check costs a single round
+        trip however many licenses each package declares.
+        """
         # Get package information
-        p1_info = self.get_package_info(package1)
-        p2_info = self.get_package_info(package2)
+        packages = self.get_packages_info([package1, package2])
+        p1_info = packages.get(package1)
+        p2_info = packages.get(package2)
         
         if not p1_info or not p2_info:
             return {
@@ -128,8 +227,14 @@ class LicenseCompatibilityChecker:
                     "is_compatible": is_compatible
                 })
         
-        # Determine overall compatibility
-        overall_compatible = any(r["is_compatible"] for r in compatibility_results)
+        # Determine overall compatibility from the license expressions: OR lets each side
+        # pick one license, AND requires every license on that side to be compatible
+        expression1 = self.compiled_expression(p1_info)
+        expression2 = self.compiled_expression(p2_info)
+        overall_compatible = bool(expression1 and expression2) and evaluate(
+            expression1,
+            lambda spdx1: evaluate(expression2, lambda spdx2: self.check_license_compatibility(spdx1, spdx2))
+        )
         
         return {
             "package1": p1_info,
@@ -138,7 +243,135 @@ class LicenseCompatibilityChecker:
             "overall_compatible": overall_compatible
         }
 
+    def resolve_package_names(self, package_names: List[str]) -> Dict[str, str]:
+        """Map requested names to the spelling stored in the graph, using the local package store
+        
+        Requirement files use any casing/separators (pyyaml, PyYAML, py_yaml); graph
+        nodes use the libraries.io spelling. Names the store does not know are kept as-is.
+        """
+        # Opening a PackageStore creates its data file; without one there is nothing to match against
+        if not self.package_store_path.exists():
+            return {name: name for name in package_names}
+        store = PackageStore(self.package_store_path)
+        resolved = {}
+        for name in package_names:
+            record = store.get(name) if name in store else None
+            resolved[name] = record["name"] if record else name
+        return resolved
+
+    def scan_project(self, dependencies, outbound_license: str, include_dev: bool = False) -> Dict:
+        """Check every dependency of a project against the license the project ships under
+        
+        `dependencies` is a requirements.txt, poetry.lock or Pipfile.lock path, or a
+        list of package names. All packages are fetched in one batched query and each
+        dependency's license expression is evaluated against the outbound license in
+        the in-memory matrix, once per distinct expression.
+        """
+        if isinstance(dependencies, (str, Path)):
+            dependencies = read_dependencies(dependencies, include_dev)
+        names = self.resolve_package_names(dependencies)
+        packages = self.get_packages_info(list(names.values()))
+        
+        report = {
+            "outbound_license": outbound_license,
+            "dependencies": len(names),
+            "checked": 0,
+            "not_found": [],
+            "unlicensed": [],
+            "conflicts": []
+        }
+        for requested, name in names.items():
+            info = packages.get(name)
+            if info is None:
+                report["not_found"].append(requested)
+                continue
+            licenses = [l["spdx_id"] for l in info["licenses"]]
+            if not licenses:
+                report["unlicensed"].append(requested)
+                continue
+            report["checked"] += 1
+            expression = info["license_expression"]
+            try:
+                compatible = self.expression_compatible(expression, outbound_license)
+            except ExpressionError:
+                expression = " OR ".join(licenses)
+                compatible = self.expression_compatible(expression, outbound_license)
+            if not compatible:
+                report["conflicts"].append({"package": requested, "licenses": licenses, "expression": expression})
+        report["compatible"] = not report["conflicts"]
+        return report
+
+    def load_dependency_closure(self, root: str, include_optional: bool = False) -> Tuple[Dict, Dict, Dict]:
+        """Fetch the dependency closure of a package, its licenses and license expressions in one query"""
+        query = """
+        MATCH (:Package {name: $root})-[:DEPENDS_ON*0..]->(p:Package)
+        WITH DISTINCT p
+        OPTIONAL MATCH (p)-[d:DEPENDS_ON]->(q:Package)
+        WHERE $include_optional OR NOT coalesce(d.optional, false)
+        WITH p, collect(DISTINCT q.name) AS dependencies
+        OPTIONAL MATCH (p)-[:USES_LICENSE]->(l:License)
+        RETURN p.name AS name, p.license_expression AS license_expression, dependencies,
+               collect(DISTINCT l.spdx_id) AS licenses
+        """
+        dependencies = {}
+        licenses = {}
+        expressions = {}
+        try:
+            with self.driver.session(database=self.database) as session:
+                for record in session.run(query, {"root": root, "include_optional": include_optional}):
+                    name = canonical_name(record["name"])
+                    dependencies[name] = [canonical_name(dependency) for dependency in record["dependencies"]]
+                    licenses[name] = tuple(record["licenses"])
+                    expressions[name] = record["license_expression"]
+        except Exception as e:
+            print(f"Error loading dependency closure of {root}: {e}")
+        return dependencies, licenses, expressions
+
+    def dependency_auditor(self, source: str = "local", root: str = None,
+                           include_optional: bool = False) -> DependencyAuditor:
+        """Auditor over the local package store's edge index, or over the closure of `root` in the graph
+        
+        A local auditor is built once and kept, so its memoized subtree results
+        are shared by every audit the checker runs.
+        """
+        if source == "graph":
+            dependencies, licenses, expressions = self.load_dependency_closure(root, include_optional)
+            return DependencyAuditor(dependencies, licenses, self.check_license_compatibility, self.is_known_license,
+                                     expressions)
+        key = ("local", include_optional)
+        if self._auditor_key != key:
+            self._auditor = DependencyAuditor.from_package_store(
+                PackageStore(self.package_store_path), self.check_license_compatibility, include_optional,
+                is_known=self.is_known_license
+            )
+            self._auditor_key = key
+        return self._auditor
+
+    def audit_dependencies(self, root: str, outbound_licenses: List[str] = None, source: str = "local",
+                           include_optional: bool = False) -> Dict:
+        """Audit every license in a package's transitive dependency closure against the package's own"""
+        root_name = self.resolve_package_names([root])[root] if source == "graph" else root
+        auditor = self.dependency_auditor(source, root_name, include_optional)
+        return auditor.audit(root_name, outbound_licenses)
+
 def main():
+    # python license_compatibility_checker.py <requirements.txt|poetry.lock|Pipfile.lock> <outbound SPDX id>
+    if len(sys.argv) == 3:
+        try:
+            dependencies = read_dependencies(sys.argv[1])
+        except (OSError, ValueError) as e:
+            # Missing file, undecodable text or a malformed lock file
+            print(f"Error reading {sys.argv[1]}: {e}", file=sys.stderr)
+            sys.exit(2)
+        checker = LicenseCompatibilityChecker()
+        try:
+            report = checker.scan_project(dependencies, sys.argv[2])
+        finally:
+            checker.close()
+        print(json.dumps(report, indent=2))
+        # Non-zero exit so CI fails on a license conflict
+        sys.exit(0 if report["compatible"] else 1)
+    
     checker = LicenseCompatibilityChecker()
     
     # Example usage
@@ -2,17 +2,29 @@ import requests
 from bs4 import BeautifulSoup
 import os
 from pathlib import Path
-import time
 import json
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+import threading
+from concurrent.futures import ThreadPoolExecutor
+# Selenium is only needed for the browser fallback
+try:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+except ImportError:
+    webdriver = None
+from urllib.parse import urljoin
+from http_cache import HTTPCache
+from rate_limiter import TokenBucket
+from license_text import build_manifest, content_hash, save_manifest
+
+# Elements whose text starts on a new line, mirroring what the browser renders
+BLOCK_TAGS = ["p", "div", "li", "pre", "blockquote", "section", "tr", "h1", "h2", "h3", "h4", "h5", "h6"]
 
 class LicenseDownloader:
-    def __init__(self):
+    def __init__(self, backend="http", requests_per_second=2, workers=1):
         self.base_url = "https://opensource.org/licenses"
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
@@ -21,16 +33,114 @@ class LicenseDownloader:
         self.licenses_dir = Path("data/licenses")
         self.licenses_dir.mkdir(parents=True, exist_ok=True)
         
-        # Initialize Selenium WebDriver
-        chrome_options = Options()
-        #chrome_options.add_argument("--headless")  # Run in headless mode
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        self.driver = webdriver.Chrome(options=chrome_options)
+        # Conditional-request cache used to detect license pages that have not changed
+        self.http_cache = HTTPCache()
+        
+        # "http" parses the server-rendered pages directly; "selenium" always drives a browser.
+        # Either way Chrome is only started if a page actually needs the Selenium fallback.
+        self.backend = backend
+        # Each worker thread gets its own HTTP session and, if needed, its own browser
+        self.workers = workers
+        self._local = threading.local()
+        self._drivers = []
+        self._drivers_lock = threading.Lock()
+        # Politeness limit shared by every request any worker sends to opensource.org
+        self.rate_limiter = TokenBucket(requests_per_second, capacity=1)
+
+    @property
+    def session(self):
+        """HTTP session of the calling worker thread"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            self._local.session = session
+        return session
+
+    @property
+    def driver(self):
+        """Start the calling worker thread's Selenium WebDriver on first use"""
+        driver = getattr(self._local, "driver", None)
+        if driver is None:
+            if webdriver is None:
+                raise RuntimeError("Selenium is not installed; the browser fallback is unavailable")
+            chrome_options = Options()
+            #chrome_options.add_argument("--headless")  # Run in headless mode
+            chrome_options.add_argument("--no-sandbox")
+            chrome_options.add_argument("--disable-dev-shm-usage")
+            driver = webdriver.Chrome(options=chrome_options)
+            self._local.driver = driver
+            with self._drivers_lock:
+                self._drivers.append(driver)
+        return driver
+
+    def close(self):
+        """Shut down every browser the workers started"""
+        with self._drivers_lock:
+            for driver in self._drivers:
+                driver.quit()
+            self._drivers = []
+        self._local = threading.local()
+
+    def fetch_page(self, url):
+        """GET a page through the politeness limiter and the conditional-request cache"""
+        self.rate_limiter.acquire()
+        response = self.http_cache.get(self.session, url)
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def element_text(element):
+        """Visible text of an HTML element, one line per block like Selenium's .text"""
+        if element is None:
+            return None
+        # Mark real line breaks, then collapse source whitespace the way a browser does
+        line_break = "\x00"
+        for br in element.find_all("br"):
+            br.replace_with(line_break)
+        for block in element.find_all(BLOCK_TAGS):
+            block.insert_after(line_break)
+        lines = (" ".join(line.split()) for line in element.get_text().split(line_break))
+        return "\n".join(line for line in lines if line)
 
     def get_all_licenses(self):
+        """Fetch all available licenses, falling back to Selenium if the HTML parse finds none"""
+        if self.backend == "http":
+            licenses = self.get_all_licenses_http()
+            if licenses:
+                return licenses
+            print("No licenses found in the HTML listing, falling back to Selenium")
+        return self.get_all_licenses_selenium()
+
+    def get_all_licenses_http(self):
+        """Fetch all available licenses from the server-rendered OSI listing"""
+        try:
+            soup = BeautifulSoup(self.fetch_page(self.base_url).content, "html.parser")
+            
+            licenses = []
+            for row in soup.select("#content-scroll tbody tr"):
+                try:
+                    name_element = row.select_one(".license-table--title a")
+                    category_element = row.select_one(".license-table--category .term-item")
+                    licenses.append({
+                        'name': name_element.get_text(strip=True),
+                        'url': urljoin(self.base_url, name_element["href"]),
+                        'spdx': row.select_one(".license-table--spdx").get_text(strip=True),
+                        'category': category_element.get_text(strip=True)
+                    })
+                except (AttributeError, KeyError, TypeError) as e:
+                    print(f"Error processing row: {e}")
+                    continue
+            
+            return licenses
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching licenses: {e}")
+            return []
+
+    def get_all_licenses_selenium(self):
         """Fetch all available licenses from OSI website using Selenium"""
         try:
+            self.rate_limiter.acquire()
             self.driver.get(self.base_url)
             # Wait for the table to be present
             WebDriverWait(self.driver, 10).until(
@@ -73,9 +183,56 @@ class LicenseDownloader:
         finally:
             print("Closing driver")
 
-    def scrape_license_content(self, url):
+    def scrape_license_content(self, url, page=None):
+        """Scrape a license page over HTTP, falling back to Selenium when the parse comes up empty
+        
+        `page` is a response already fetched for this URL (by the revalidation in
+        process_license), which is parsed instead of fetching the page again.
+        """
+        if self.backend == "http":
+            content_data = self.scrape_license_content_http(url, page)
+            if content_data:
+                return content_data
+            print(f"Falling back to Selenium for {url}")
+        return self.scrape_license_content_selenium(url)
+
+    def scrape_license_content_http(self, url, page=None):
+        """Extract the license content and metadata from the server-rendered page"""
+        try:
+            soup = BeautifulSoup((page or self.fetch_page(url)).content, "html.parser")
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching license page {url}: {e}")
+            return None
+        
+        content_element = soup.select_one(".entry-content")
+        if content_element is None:
+            return None
+        
+        def text_of(selector, default="N/A"):
+            element = soup.select_one(selector)
+            return self.element_text(element) if element is not None else default
+        
+        metadata = {
+            'category': text_of(".pill-taxonomy .term-item"),
+            'version': text_of(".license-meta .license-version"),
+            'submitted': text_of(".license-meta .license-release"),
+            'submitter': text_of(".license-meta .license-submitter"),
+            'approved': text_of(".license-meta .license-approved"),
+            'spdx': text_of(".license-meta .license-spdx"),
+            'steward': text_of(".license-steward-meta .license-steward .term-item")
+        }
+        steward_link = soup.select_one(".license-steward-meta .license-steward-url a")
+        metadata['steward_url'] = steward_link.get("href", "N/A") if steward_link is not None else "N/A"
+        
+        return {
+            'metadata': metadata,
+            'content': self.element_text(content_element)
+        }
+
+    def scrape_license_content_selenium(self, url):
         """Scrape the license content and metadata from the OSI website"""
         try:
+            self.rate_limiter.acquire()
             self.driver.get(url)
             # Wait for the content to be present
             WebDriverWait(self.driver, 10).until(
@@ -150,10 +307,18 @@ class LicenseDownloader:
             print(f"Error scraping license content from {url}: {e}")
             return None
 
+    def revalidate(self, license_info):
+        """Conditional GET of a license page; the response is reused for scraping, None on error"""
+        try:
+            return self.fetch_page(license_info['url'])
+        except requests.exceptions.RequestException as e:
+            print(f"Error revalidating {license_info['url']}: {e}")
+            return None
+
     def save_license_to_file(self, license_data, content_data):
-        """Save license information to a JSON file"""
+        """Save license information to a JSON file; returns False when nothing changed"""
         if not license_data or not content_data:
-            return
+            return False
 
         # Use SPDX ID as filename
         filename = self.licenses_dir / f"{license_data['spdx']}.json"
@@ -167,63 +332,104 @@ class LicenseDownloader:
                 "url": license_data['url']
             },
             "metadata": content_data['metadata'],
-            "content": content_data['content']
+            "content": content_data['content'],
+            "content_hash": content_hash(content_data['content'])
         }
         
+        # Leave untouched licenses alone so their mtime and downstream consumers stay quiet
+        if filename.exists():
+            with open(filename, "r", encoding="utf-8") as f:
+                existing = json.load(f)
+            if existing.get("content_hash") == license_info["content_hash"] and \
+                    {k: v for k, v in existing.items() if k != "content"} == \
+                    {k: v for k, v in license_info.items() if k != "content"}:
+                return False
+        
         # Save as JSON
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(license_info, f, indent=4, ensure_ascii=False)
+        return True
+
+    def process_license(self, license_info):
+        """Download one license; returns (summary entry or None on failure, whether it changed)"""
+        try:
+            print(f"\nProcessing {license_info['name']} ({license_info['spdx']})...")
+            summary_entry = {
+                "name": license_info['name'],
+                "spdx_id": license_info['spdx'],
+                "category": license_info['category'],
+                "url": license_info['url']
+            }
+            
+            # One conditional GET per license: a 304 with a saved file means nothing to do,
+            # otherwise the same response is parsed, so a changed page costs a single request
+            saved = (self.licenses_dir / f"{license_info['spdx']}.json").exists()
+            page = self.revalidate(license_info) if saved or self.backend == "http" else None
+            if saved and page is not None and page.from_cache:
+                print(f"{license_info['spdx']} unchanged since last download, skipping")
+                return summary_entry, False
+            
+            # Scrape the license content
+            print(f"Scraping content from {license_info['url']}")
+            content_data = self.scrape_license_content(license_info['url'], page)
+            if not content_data:
+                print(f"Failed to scrape content for {license_info['spdx']}")
+                return None, False
+            
+            changed = self.save_license_to_file(license_info, content_data)
+            print(f"Saved {license_info['spdx']}.json" if changed else f"{license_info['spdx']} content unchanged")
+            return summary_entry, changed
+            
+        except Exception as e:
+            print(f"Error processing {license_info['spdx']}: {e}")
+            return None, False
 
-    def download_all_licenses(self):
-        """Download all available licenses"""
+    def save_summary(self, summary):
+        """Replace summary.json atomically so readers never see a half-written file"""
+        summary_path = self.licenses_dir / "summary.json"
+        tmp_path = summary_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, summary_path)
+
+    def download_all_licenses(self, workers=None):
+        """Download all available licenses, sharded across a pool of workers"""
+        workers = workers or self.workers
         print("Fetching list of available licenses...")
         licenses = self.get_all_licenses()
         
+        print(f"Found {len(licenses)} licenses. Starting download with {workers} workers...")
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # map() keeps results in listing order whatever order the workers finish in
+                results = list(executor.map(self.process_license, licenses))
+        else:
+            results = [self.process_license(license_info) for license_info in licenses]
+        
         # Create a summary file with all licenses
         summary = {
             "total_licenses": len(licenses),
-            "licenses": []
+            "licenses": [entry for entry, _ in results if entry]
         }
-        
-        print(f"Found {len(licenses)} licenses. Starting download...")
-        for license_info in licenses:
-            try:
-                print(f"\nProcessing {license_info['name']} ({license_info['spdx']})...")
-                
-                # Scrape the license content
-                print(f"Scraping content from {license_info['url']}")
-                content_data = self.scrape_license_content(license_info['url'])
-                time.sleep(2)
-                if content_data:
-                    # Save to file
-                    self.save_license_to_file(license_info, content_data)
-                    print(f"Saved {license_info['spdx']}.json")
-                    
-                    # Add to summary
-                    summary["licenses"].append({
-                        "name": license_info['name'],
-                        "spdx_id": license_info['spdx'],
-                        "category": license_info['category'],
-                        "url": license_info['url']
-                    })
-                else:
-                    print(f"Failed to scrape content for {license_info['spdx']}")
-                
-                # Add a small delay to avoid rate limiting
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"Error processing {license_info['spdx']}: {e}")
-                continue
-        
-        # Save summary file
-        with open(self.licenses_dir / "summary.json", "w", encoding="utf-8") as f:
-            json.dump(summary, f, indent=4, ensure_ascii=False)
+        self.save_summary(summary)
         print("\nSaved summary.json with all license information")
+        
+        # The manifest lets the graph builder and RAG index skip licenses whose text did not change
+        save_manifest(build_manifest(self.licenses_dir), self.licenses_dir / "manifest.json")
+        print(f"{sum(1 for _, changed in results if changed)} of {len(licenses)} licenses changed")
+        print(f"HTTP cache: {self.http_cache.stats()}")
 
 def main():
-    downloader = LicenseDownloader()
-    downloader.download_all_licenses()
+    # LICENSE_SCRAPER_BACKEND=selenium forces the browser for every page
+    downloader = LicenseDownloader(
+        backend=os.getenv("LICENSE_SCRAPER_BACKEND", "http"),
+        workers=int(os.getenv("LICENSE_SCRAPER_WORKERS", "4")),
+        requests_per_second=float(os.getenv("LICENSE_SCRAPER_RPS", "2"))
+    )
+    try:
+        downloader.download_all_licenses()
+    finally:
+        downloader.close()
     print("\nLicense download complete!")
 
 if __name__ == "__main__":
@@ -0,0 +1,160 @@
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from license_text import iter_license_files, normalize_license_text
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 128
+BANDS = 32
+# A text often bundles several licenses (numpy ships BSD-3-Clause followed by the GPL texts
+# of vendored code). A reference only matches when it covers most of the text's opening
+# shingles, and it is scored against the best leading section of at most this many times
+# its own length
+MAX_LENGTH_RATIO = 1.5
+HEAD_SHINGLES = 200
+HEAD_COVERAGE = 0.5
+MIN_SECTION = 128
+# Top two scores closer than this are too close to call
+AMBIGUITY_MARGIN = 0.02
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+# Copyright lines differ in every copy of a license and say nothing about which one it is
+# (short lines only: a text flattened onto one line keeps its notice rather than losing everything)
+COPYRIGHT_LINE = re.compile(r"^[^\S\n]*(copyright|\(c\)|©)[^\n]{0,120}$", re.IGNORECASE | re.MULTILINE)
+
+
+def license_words(text):
+    """Normalized word tokens of a license text, copyright lines left out"""
+    text = COPYRIGHT_LINE.sub(" ", text or "")
+    return re.findall(r"[a-z0-9]+", normalize_license_text(text))
+
+
+def shingle_sequence(words, size=SHINGLE_SIZE):
+    """32-bit hashes of a word list's shingles, in text order"""
+    if len(words) < size:
+        words = words + [""] * (size - len(words)) if words else []
+    hashes = [
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    ]
+    return np.array(hashes, dtype=np.uint64)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Sorted unique 32-bit hashes of the text's word shingles"""
+    return np.unique(shingle_sequence(license_words(text), size))
+
+
+def section_lengths(length):
+    """Leading-section lengths probed for candidates: doubling from MIN_SECTION, then the whole text"""
+    lengths = []
+    section = MIN_SECTION
+    while section < length:
+        lengths.append(section)
+        section *= 2
+    lengths.append(length)
+    return lengths
+
+
+class LicenseFingerprintIndex:
+    """MinHash/LSH index over the reference license texts in data/licenses
+
+    Each text becomes a set of word shingles and a MinHash signature. The
+    signatures are cut into bands and hashed into buckets, so a query only
+    compares against licenses sharing at least one band (likely above ~0.4
+    Jaccard similarity); those candidates are ranked by exact shingle Jaccard.
+    Identifying a text costs a few signatures and a handful of set
+    intersections instead of an LLM call.
+
+    Texts that bundle several licenses are identified by the one they open
+    with: leading sections are probed for candidates as well as the whole
+    text, a candidate must cover most of the text's opening shingles, and it
+    is scored against the leading section it matches best.
+    """
+
+    def __init__(self, licenses_dir="data/licenses", threshold=0.6, seed=1):
+        self.threshold = threshold
+        self.rows = NUM_PERMUTATIONS // BANDS
+        generator = np.random.default_rng(seed)
+        # Universal hash functions (a * x + b) mod p; a, b < 2^31 keep a * x + b inside uint64
+        self.a = generator.integers(1, 1 << 31, NUM_PERMUTATIONS, dtype=np.uint64)
+        self.b = generator.integers(0, 1 << 31, NUM_PERMUTATIONS, dtype=np.uint64)
+        self.spdx_ids = []
+        self.names = []
+        self.shingle_sets = []
+        self.lengths = []
+        self.buckets = defaultdict(list)
+        for _, license_data in iter_license_files(licenses_dir):
+            spdx_id = license_data["basic_info"]["spdx_id"]
+            sequence = shingle_sequence(license_words(license_data.get("content")))
+            if not spdx_id or not len(sequence):
+                continue
+            grams = np.unique(sequence)
+            position = len(self.spdx_ids)
+            self.spdx_ids.append(spdx_id)
+            self.names.append(license_data["basic_info"]["name"])
+            self.shingle_sets.append(grams)
+            self.lengths.append(len(sequence))
+            for key in self.band_keys(self.signature(grams)):
+                self.buckets[key].append(position)
+
+    def signature(self, grams):
+        """MinHash signature of a shingle set"""
+        hashed = (np.outer(grams, self.a) + self.b) % MERSENNE_PRIME & MAX_HASH
+        return hashed.min(axis=0)
+
+    def band_keys(self, signature):
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(BANDS)
+        ]
+
+    def matches(self, text, limit=5):
+        """Closest reference licenses as [(position, jaccard)], best first"""
+        sequence = shingle_sequence(license_words(text))
+        if not len(sequence):
+            return []
+        candidates = set()
+        for length in section_lengths(len(sequence)):
+            for key in self.band_keys(self.signature(np.unique(sequence[:length]))):
+                candidates.update(self.buckets.get(key, ()))
+        scored = []
+        for position in candidates:
+            score = self.leading_jaccard(sequence, position)
+            if score is not None:
+                scored.append((position, score))
+        scored.sort(key=lambda match: match[1], reverse=True)
+        return scored[:limit]
+
+    def leading_jaccard(self, sequence, position):
+        """Best Jaccard between a reference and a leading section of the text; None unless the text opens with it
+
+        Each prefix of the section is scored from running counts of its new
+        shingles and of those also in the reference, so trailing licenses are
+        cut off wherever that maximizes the score.
+        """
+        reference = self.shingle_sets[position]
+        length = self.lengths[position]
+        section = sequence[:int(length * MAX_LENGTH_RATIO)]
+        in_reference = np.isin(section, reference)
+        head = min(HEAD_SHINGLES, length, len(section))
+        if in_reference[:head].sum() < HEAD_COVERAGE * head:
+            return None
+        first = np.zeros(len(section), dtype=bool)
+        first[np.unique(section, return_index=True)[1]] = True
+        distinct = np.cumsum(first)
+        shared = np.cumsum(first & in_reference)
+        return float((shared / (distinct + len(reference) - shared)).max())
+
+    def identify(self, text):
+        """Best match as {"spdx_id", "name", "score"}; None below the threshold or when two licenses tie"""
+        matches = self.matches(text, limit=2)
+        if not matches or matches[0][1] < self.threshold:
+            return None
+        position, score = matches[0]
+        if len(matches) > 1 and score - matches[1][1] < AMBIGUITY_MARGIN:
+            return None
+        return {"spdx_id": self.spdx_ids[position], "name": self.names[position], "score": round(score, 4)}
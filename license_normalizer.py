@@ -0,0 +1,252 @@
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from license_fingerprint import LicenseFingerprintIndex
+from license_text import iter_license_files, normalize_license_text
+
+# Free-text spellings seen in package metadata that neither the SPDX id nor the OSI name covers
+ALIASES = {
+    "mit": "MIT",
+    "mit license": "MIT",
+    "the mit license mit": "MIT",
+    "expat": "MIT",
+    "apache": "Apache-2.0",
+    "apache 2": "Apache-2.0",
+    "apache 2 0": "Apache-2.0",
+    "apache license": "Apache-2.0",
+    "apache license 2 0": "Apache-2.0",
+    "apache license version 2 0": "Apache-2.0",
+    "apache software license": "Apache-2.0",
+    "apache 2 0 license": "Apache-2.0",
+    "asl 2 0": "Apache-2.0",
+    "https www apache org licenses license 2 0": "Apache-2.0",
+    "http www apache org licenses license 2 0": "Apache-2.0",
+    "bsd": "BSD-3-Clause",
+    "bsd license": "BSD-3-Clause",
+    "new bsd": "BSD-3-Clause",
+    "new bsd license": "BSD-3-Clause",
+    "modified bsd": "BSD-3-Clause",
+    "bsd 3 clause": "BSD-3-Clause",
+    "bsd 3 clause license": "BSD-3-Clause",
+    "3 clause bsd": "BSD-3-Clause",
+    "license bsd3": "BSD-3-Clause",
+    "simplified bsd": "BSD-2-Clause",
+    "bsd 2 clause": "BSD-2-Clause",
+    "bsd 2 clause license": "BSD-2-Clause",
+    "isc": "ISC",
+    "isc license iscl": "ISC",
+    "psf": "PSF-2.0",
+    "psf license": "PSF-2.0",
+    "python software foundation license": "PSF-2.0",
+    "mpl 2 0": "MPL-2.0",
+    "mozilla public license 2 0 mpl 2 0": "MPL-2.0",
+    "lgpl": "LGPL-3.0-only",
+    "lgplv3": "LGPL-3.0-only",
+    "lgplv3+": "LGPL-3.0-only",
+    "lgplv2": "LGPL-2.1",
+    "gplv2": "GPL-2.0",
+    "gplv3": "GPL-3.0-only",
+    "gpl": "GPL-3.0-only",
+    "gpl v2": "GPL-2.0",
+    "gpl v2 or later": "GPL-2.0",
+    "gpl v3": "GPL-3.0-only",
+    "gpl v3 or later": "GPL-3.0-only",
+    "gnu gpl v2": "GPL-2.0",
+    "gnu gpl v3": "GPL-3.0-only",
+    "agplv3": "AGPL-3.0-only",
+    "unlicense": "Unlicense",
+    "zpl 2 1": "ZPL-2.1",
+    "zope public license": "ZPL-2.1",
+    "boost": "BSL-1.0",
+    "eclipse public license 2 0": "EPL-2.0"
+}
+
+# Trove classifiers (the part after "License :: OSI Approved :: ") that need more than the alias table
+CLASSIFIERS = {
+    "gnu general public license v2 gplv2": "GPL-2.0",
+    "gnu general public license v2 or later gplv2+": "GPL-2.0",
+    "gnu general public license v3 gplv3": "GPL-3.0-only",
+    "gnu general public license v3 or later gplv3+": "GPL-3.0-only",
+    "gnu lesser general public license v2 lgplv2": "LGPL-2.0-only",
+    "gnu lesser general public license v2 or later lgplv2+": "LGPL-2.1",
+    "gnu lesser general public license v3 lgplv3": "LGPL-3.0-only",
+    "gnu lesser general public license v3 or later lgplv3+": "LGPL-3.0-only",
+    "gnu affero general public license v3": "AGPL-3.0-only",
+    "gnu affero general public license v3 or later agplv3+": "AGPL-3.0-only",
+    "mozilla public license 2 0 mpl 2 0": "MPL-2.0",
+    "mozilla public license 1 1 mpl 1 1": "MPL-1.1",
+    "eclipse public license 2 0 epl 2 0": "EPL-2.0",
+    "eclipse public license 1 0 epl 1 0": "EPL-1.0",
+    "european union public licence 1 2 eupl 1 2": "EUPL-1.2",
+    "zope public license": "ZPL-2.1",
+    "python software foundation license": "PSF-2.0",
+    "the unlicense unlicense": "Unlicense",
+    "boost software license 1 0 bsl 1 0": "BSL-1.0",
+    "universal permissive license upl": "UPL-1.0",
+    "isc license iscl": "ISC"
+}
+
+CLASSIFIER_PREFIX = re.compile(r"^license\s*::\s*(osi approved\s*::\s*)?", re.IGNORECASE)
+# Strings that often hold several licenses at once
+SEPARATORS = re.compile(r"\s*(?:,|;|/|\||\s+or\s+(?!later)|\s+and\s+)\s*", re.IGNORECASE)
+# A pasted license text: only its title, before the copyright line, names the license
+TITLE_END = re.compile(r"\b(copyright|\(c\)|©|permission is hereby|redistribution and use|terms and conditions)", re.IGNORECASE)
+MAX_TITLE_WORDS = 8
+
+
+def license_key(text):
+    """Lower-case alphanumeric words separated by single spaces ('+' kept, as in GPLv2+)"""
+    text = normalize_license_text(text)
+    return re.sub(r"[^a-z0-9+]+", " ", text).strip()
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def major_version(key):
+    match = re.search(r"\d+", key)
+    return match.group(0) if match else None
+
+
+class LicenseNormalizer:
+    """Map free-text license strings and Trove classifiers to SPDX ids
+
+    Lookup goes exact table first (SPDX ids, OSI names, aliases, classifiers),
+    then a character-trigram index: candidates sharing trigrams with the query
+    are scored by Dice similarity, and candidates not naming the query's major
+    version are rejected so "Apache 1.1" never lands on Apache-2.0. Results are
+    memoized per distinct string, so a batch of 100k package strings costs
+    one lookup per distinct spelling. Whole license texts pasted into the
+    license field are identified by their fingerprint when the title alone
+    does not name the license.
+    """
+
+    def __init__(self, licenses_dir="data/licenses", threshold=0.6):
+        self.licenses_dir = licenses_dir
+        self.threshold = threshold
+        self._fingerprints = None
+        self.exact = {}
+        # Ids of the license files, i.e. the licenses that have License nodes
+        self.spdx_ids = set()
+        self.load_tables(licenses_dir)
+        # Trigram inverted index over every exact-table key
+        self.keys = list(self.exact)
+        self.key_trigrams = [trigrams(key) for key in self.keys]
+        self.postings = defaultdict(list)
+        for position, grams in enumerate(self.key_trigrams):
+            for gram in grams:
+                self.postings[gram].append(position)
+        self.lookup = lru_cache(maxsize=None)(self.lookup_key)
+
+    def load_tables(self, licenses_dir):
+        for _, license_data in iter_license_files(licenses_dir):
+            spdx_id = license_data["basic_info"]["spdx_id"]
+            if not spdx_id:
+                continue
+            self.spdx_ids.add(spdx_id)
+            self.exact.setdefault(license_key(spdx_id), spdx_id)
+            self.exact.setdefault(license_key(license_data["basic_info"]["name"]), spdx_id)
+            # "The MIT License" is also written "MIT License"
+            name = license_key(license_data["basic_info"]["name"])
+            if name.startswith("the "):
+                self.exact.setdefault(name[4:], spdx_id)
+        for table in (ALIASES, CLASSIFIERS):
+            for key, spdx_id in table.items():
+                self.exact.setdefault(key, spdx_id)
+
+    def lookup_key(self, key):
+        """SPDX id and score for one normalized key, (None, score) below the threshold"""
+        if key in self.exact:
+            return self.exact[key], 1.0
+        grams = trigrams(key)
+        overlap = Counter()
+        for gram in grams:
+            for position in self.postings.get(gram, ()):
+                overlap[position] += 1
+        version = major_version(key)
+        best, best_score = None, 0.0
+        for position, shared in overlap.items():
+            score = 2 * shared / (len(grams) + len(self.key_trigrams[position]))
+            if score <= best_score:
+                continue
+            candidate_version = major_version(self.keys[position])
+            if version and version != candidate_version:
+                continue
+            best, best_score = position, score
+        if best is None or best_score < self.threshold:
+            return None, best_score
+        return self.exact[self.keys[best]], best_score
+
+    @property
+    def fingerprints(self):
+        """Fingerprint index over the license texts, built on first use"""
+        if self._fingerprints is None:
+            self._fingerprints = LicenseFingerprintIndex(self.licenses_dir)
+        return self._fingerprints
+
+    def title_key(self, text):
+        """Normalized key of a license string, cut down to its title when a whole text was pasted"""
+        text = CLASSIFIER_PREFIX.sub("", text.strip())
+        match = TITLE_END.search(text)
+        if match:
+            text = text[:match.start()]
+        words = license_key(text).split()
+        return " ".join(words[:MAX_TITLE_WORDS])
+
+    def normalize(self, text, fuzzy=True):
+        """Best SPDX id for a single license string, or None"""
+        if not text or not text.strip():
+            return None
+        key = self.title_key(text)
+        if not key:
+            return None
+        if not fuzzy:
+            return self.exact.get(key)
+        return self.lookup(key)[0]
+
+    def resolve(self, text):
+        """SPDX ids named in a string, splitting lists such as 'Apache Software License,BSD License'"""
+        if not text or not text.strip():
+            return []
+        spdx_id = self.normalize(text, fuzzy=False)
+        if spdx_id:
+            return [spdx_id]
+        # A pasted license text is one license; only short strings are treated as lists
+        if TITLE_END.search(text):
+            match = self.fingerprints.identify(text)
+            if match:
+                return [match["spdx_id"]]
+        else:
+            parts = [part for part in SEPARATORS.split(text) if part.strip()]
+            if len(parts) > 1:
+                resolved = [self.normalize(part) for part in parts]
+                resolved = list(dict.fromkeys(spdx_id for spdx_id in resolved if spdx_id))
+                if resolved:
+                    return resolved
+        spdx_id = self.normalize(text)
+        return [spdx_id] if spdx_id else []
+
+    def normalize_many(self, texts):
+        """Resolve a batch of strings; each distinct string is looked up once"""
+        resolved = {}
+        for text in texts:
+            if text not in resolved:
+                resolved[text] = self.resolve(text)
+        return resolved
+
+    def package_licenses(self, package_data, known=None):
+        """SPDX ids for a libraries.io record, resolving 'Other' and empty normalized lists
+
+        Ids libraries.io already normalized are kept unless `known` (the SPDX ids
+        that have License nodes) says they do not exist.
+        """
+        normalized = [
+            spdx_id for spdx_id in package_data.get("normalized_licenses") or []
+            if spdx_id != "Other" and (known is None or spdx_id in known)
+        ]
+        if normalized:
+            return normalized
+        return self.resolve(package_data.get("licenses") or "")
@@ -9,22 +9,33 @@ import json
 import openai
 from typing import Dict, List, Any, Optional
 import logging
+from license_fingerprint import LicenseFingerprintIndex
+from parse_cache import ParseCache, default_cache, parse_key
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class LicenseParser:
-    def __init__(self, api_key: str, model: str = "gpt-4o"):
+    # Bump whenever create_parsing_prompt changes so cached parses of the old prompt miss
+    PROMPT_VERSION = "1"
+
+    def __init__(self, api_key: str, model: str = "gpt-4o", licenses_dir: str = "data/licenses",
+                 cache: Optional[ParseCache] = None):
         """
         Initialize the License Parser with OpenAI API
         
         Args:
             api_key: OpenAI API key
             model: OpenAI model to use (default: gpt-4o)
+            licenses_dir: Reference license texts used to identify licenses without the LLM
+            cache: Parse result cache (default: the shared cache configured by LICENSE_PARSE_CACHE)
         """
         self.client = openai.OpenAI(api_key=api_key)
         self.model = model
+        self.cache = cache or default_cache()
+        self.licenses_dir = licenses_dir
+        self._fingerprints: Optional[LicenseFingerprintIndex] = None
         
     def create_parsing_prompt(self, license_text: str) -> str:
         """
@@ -217,6 +228,11 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
         Returns:
             Dictionary containing parsed license information
         """
+        key = parse_key(license_text, self.model, self.PROMPT_VERSION)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
             prompt = self.create_parsing_prompt(license_text)
             
@@ -235,6 +251,7 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
             result = json.loads(response.choices[0].message.content)
             
             logger.info(f"Successfully parsed license: {result.get('license_name', 'Unknown')}")
+            self.cache.put(key, result)
             return result
             
         except json.JSONDecodeError as e:
@@ -245,6 +262,38 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
             logger.error(f"Error parsing license: {e}")
             return {"error": str(e)}
 
+    @property
+    def fingerprints(self) -> LicenseFingerprintIndex:
+        """Fingerprint index over the reference license texts, built on first use"""
+        if self._fingerprints is None:
+            self._fingerprints = LicenseFingerprintIndex(self.licenses_dir)
+        return self._fingerprints
+
+    def identify_license(self, license_text: str) -> Dict[str, Any]:
+        """
+        Identify which license a text is, calling the LLM only when no reference text matches
+        
+        Args:
+            license_text: The license text to identify
+            
+        Returns:
+            Dictionary with license_name, spdx_identifier and identified_by
+            ("fingerprint", with a similarity score, or "llm" with the full parse)
+        """
+        match = self.fingerprints.identify(license_text)
+        if match:
+            logger.info(f"Identified license by fingerprint: {match['spdx_id']} ({match['score']:.2f})")
+            return {
+                "license_name": match["name"],
+                "spdx_identifier": match["spdx_id"],
+                "similarity": match["score"],
+                "identified_by": "fingerprint"
+            }
+        
+        result = self.parse_license(license_text)
+        result["identified_by"] = "llm"
+        return result
+
     def parse_multiple_licenses(self, license_texts: List[str]) -> List[Dict[str, Any]]:
         """
         Parse multiple license texts
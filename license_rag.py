@@ -1,5 +1,6 @@
 import os
 import json
+import hashlib
 import glob
 from pathlib import Path
 from typing import List, Dict, Any
@@ -14,6 +15,8 @@ from langchain.retrievers.document_compressors import EmbeddingsFilter
 from langchain_openai import ChatOpenAI
 from langchain.chains import RetrievalQA
 
+from license_text import license_hash, load_manifest, save_manifest
+
 class LicenseRAG:
     def __init__(self):
         # Load environment variables
@@ -40,6 +43,9 @@ class LicenseRAG:
         
         # Initialize vector database
         self.vector_db = None
+        
+        # Content hash and chunk count of every license currently embedded, keyed by SPDX id
+        self.embedded = {}
     
     def load_license_files(self) -> List[Dict[str, Any]]:
         """Load all license JSON files from the licenses directory"""
@@ -47,8 +53,8 @@ class LicenseRAG:
         license_files = glob.glob(os.path.join(self.licenses_path, "*.json"))
         
         for file_path in license_files:
-            if os.path.basename(file_path) == "summary.json":
-                continue  # Skip the summary file
+            if os.path.basename(file_path) in ("summary.json", "manifest.json"):
+                continue  # Skip the summary and manifest files
                 
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
@@ -69,15 +75,7 @@ class LicenseRAG:
             content = license_data.get("content", "")
             
             # Create metadata
-            metadata = {
-                "name": license_data.get("basic_info", {}).get("name", "Unknown"),
-                "spdx_id": license_data.get("basic_info", {}).get("spdx_id", "Unknown"),
-                "category": license_data.get("basic_info", {}).get("category", "Unknown"),
-                "url": license_data.get("basic_info", {}).get("url", ""),
-                "version": license_data.get("metadata", {}).get("version", ""),
-                "submitted": license_data.get("metadata", {}).get("submitted", ""),
-                "approved": license_data.get("metadata", {}).get("approved", "")
-            }
+            metadata = self.document_metadata(license_data)
             
             # Split content into chunks
             text_chunks = self.text_splitter.split_text(content)
@@ -93,6 +91,35 @@ class LicenseRAG:
         print(f"Created {len(documents)} document chunks")
         return documents
     
+    @staticmethod
+    def document_metadata(license_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Metadata attached to every chunk of a license"""
+        return {
+            "name": license_data.get("basic_info", {}).get("name", "Unknown"),
+            "spdx_id": license_data.get("basic_info", {}).get("spdx_id", "Unknown"),
+            "category": license_data.get("basic_info", {}).get("category", "Unknown"),
+            "url": license_data.get("basic_info", {}).get("url", ""),
+            "version": license_data.get("metadata", {}).get("version", ""),
+            "submitted": license_data.get("metadata", {}).get("submitted", ""),
+            "approved": license_data.get("metadata", {}).get("approved", "")
+        }
+    
+    @classmethod
+    def embedded_hash(cls, license_data: Dict[str, Any]) -> str:
+        """Hash of everything a license's chunks are built from: its text and the chunk metadata"""
+        state = {"content_hash": license_hash(license_data), "metadata": cls.document_metadata(license_data)}
+        return hashlib.sha256(json.dumps(state, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def document_ids(documents: List[Document]) -> List[str]:
+        """Deterministic per-chunk ids, so a license's chunks can be replaced in place"""
+        return [f"{doc.metadata['spdx_id']}#{doc.metadata['chunk_id']}" for doc in documents]
+    
+    @classmethod
+    def manifest_entry(cls, license_data: Dict[str, Any], documents: List[Document]) -> Dict[str, Any]:
+        """Embedded-state entry for one license"""
+        return {"hash": cls.embedded_hash(license_data), "chunks": len(documents)}
+    
     def build_vector_database(self) -> None:
         """Build the vector database from license documents"""
         # Load license data
@@ -105,26 +132,85 @@ class LicenseRAG:
         documents = self.create_documents(licenses)
         
         # Create vector store
-        self.vector_db = FAISS.from_documents(documents, self.embeddings)
+        self.vector_db = FAISS.from_documents(documents, self.embeddings, ids=self.document_ids(documents))
+        self.embedded = {}
+        for license_data in licenses:
+            spdx_id = license_data.get("basic_info", {}).get("spdx_id", "Unknown")
+            chunks = [doc for doc in documents if doc.metadata["spdx_id"] == spdx_id]
+            self.embedded[spdx_id] = self.manifest_entry(license_data, chunks)
         print("Vector database created successfully")
     
+    def update_vector_database(self) -> Dict[str, int]:
+        """Re-embed only the licenses whose text or chunk metadata changed since the last build
+        
+        Manifests written before metadata was hashed never match, so their
+        licenses are re-embedded once. Falls back to a full build when there is
+        no index yet or it predates the embedded-hash manifest.
+        """
+        if not self.vector_db or not self.embedded:
+            self.build_vector_database()
+            return {"added": len(self.embedded), "updated": 0, "removed": 0, "unchanged": 0}
+        
+        licenses = {
+            license_data.get("basic_info", {}).get("spdx_id", "Unknown"): license_data
+            for license_data in self.load_license_files()
+        }
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        
+        stale_ids = []
+        changed = []
+        seen = set(self.embedded)
+        for spdx_id, entry in list(self.embedded.items()):
+            license_data = licenses.get(spdx_id)
+            if license_data is not None and self.embedded_hash(license_data) == entry["hash"]:
+                stats["unchanged"] += 1
+                continue
+            stale_ids.extend(f"{spdx_id}#{i}" for i in range(entry["chunks"]))
+            del self.embedded[spdx_id]
+            if license_data is None:
+                stats["removed"] += 1
+            else:
+                stats["updated"] += 1
+                changed.append(license_data)
+        for spdx_id, license_data in licenses.items():
+            if spdx_id not in seen:
+                stats["added"] += 1
+                changed.append(license_data)
+        
+        if stale_ids:
+            self.vector_db.delete(stale_ids)
+        if changed:
+            documents = self.create_documents(changed)
+            if documents:
+                self.vector_db.add_documents(documents, ids=self.document_ids(documents))
+            for license_data in changed:
+                spdx_id = license_data.get("basic_info", {}).get("spdx_id", "Unknown")
+                chunks = [doc for doc in documents if doc.metadata["spdx_id"] == spdx_id]
+                self.embedded[spdx_id] = self.manifest_entry(license_data, chunks)
+        
+        print(f"Vector database updated: {stats['added']} added, {stats['updated']} updated, "
+              f"{stats['removed']} removed, {stats['unchanged']} unchanged")
+        return stats
+    
     def save_vector_database(self, path: str = None) -> None:
-        """Save the vector database to disk"""
+        """Save the vector database and its embedded-hash manifest to disk"""
         if path is None:
             path = str(self.base_dir / "data" / "vector_db")
         if self.vector_db:
             os.makedirs(os.path.dirname(path), exist_ok=True)
             self.vector_db.save_local(path)
+            save_manifest(self.embedded, Path(path) / "license_manifest.json")
             print(f"Vector database saved to {path}")
         else:
             print("No vector database to save")
     
     def load_vector_database(self, path: str = None) -> None:
-        """Load the vector database from disk"""
+        """Load the vector database and its embedded-hash manifest from disk"""
         if path is None:
             path = str(self.base_dir / "data" / "vector_db")
         if os.path.exists(path):
             self.vector_db = FAISS.load_local(path, self.embeddings, allow_dangerous_deserialization=True)
+            self.embedded = load_manifest(Path(path) / "license_manifest.json")
             print(f"Vector database loaded from {path}")
         else:
             print(f"No vector database found at {path}")
@@ -213,6 +299,10 @@ def main():
     vector_db_path = "data/vector_db"
     if os.path.exists(vector_db_path):
         rag.load_vector_database(vector_db_path)
+        # Re-embed only licenses whose text changed since the index was saved
+        stats = rag.update_vector_database()
+        if stats["added"] or stats["updated"] or stats["removed"]:
+            rag.save_vector_database(vector_db_path)
     else:
         rag.build_vector_database()
         rag.save_vector_database(vector_db_path)
@@ -0,0 +1,197 @@
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from license_text import iter_license_files, license_hash, save_manifest
+
+# LicenseParser output field -> relationship from the License to each Term
+TERM_RELATIONSHIPS = {
+    "rights": "PERMITS",
+    "obligations": "REQUIRES",
+    "restrictions": "PROHIBITS"
+}
+
+# Spellings the parser uses interchangeably, folded onto one vocabulary entry
+TERM_SYNONYMS = {
+    "copy": "reproduce",
+    "reproduction": "reproduce",
+    "merge": "modify",
+    "modification": "modify",
+    "distribution": "distribute",
+    "redistribute": "distribute",
+    "publish": "distribute",
+    "sell": "commercial_use",
+    "commercial": "commercial_use",
+    "private": "private_use",
+    "patent": "patent_use",
+    "patent_grant": "patent_use",
+    "include_copyright": "include_copyright_notice",
+    "retain_copyright_notice": "include_copyright_notice",
+    "copyright_notice": "include_copyright_notice",
+    "copyright_notice_required": "include_copyright_notice",
+    "include_license": "include_license_text",
+    "include_license_copy": "include_license_text",
+    "license_text_required": "include_license_text",
+    "provide_license_text": "include_license_text",
+    "disclose_source": "disclose_source_code",
+    "source_code_disclosure": "disclose_source_code",
+    "make_source_available": "disclose_source_code",
+    "state_changes": "document_changes",
+    "modification_notice": "document_changes",
+    "same_license": "preserve_license_terms",
+    "license_preservation": "preserve_license_terms",
+    "sublicensing": "sublicense",
+    "trademark": "trademark_use"
+}
+
+# The parser sometimes spells a term as its negation ("no_sublicensing", "no_endorsement");
+# that always means the license rules the positive term out, whichever field it came in
+NEGATION = re.compile(r"^(no|not|without)_(?=.)")
+
+
+def term_key(term):
+    """Lower snake_case spelling of a parsed term, None for anything empty or not a string"""
+    if not isinstance(term, str):
+        return None
+    return re.sub(r"[^a-z0-9]+", "_", term.lower()).strip("_") or None
+
+
+def is_negated(term):
+    key = term_key(term)
+    return bool(key and NEGATION.match(key))
+
+
+def normalize_term(term):
+    """Fold a parsed term onto the shared vocabulary (lower snake_case, negation dropped, synonyms merged)"""
+    key = term_key(term)
+    if not key:
+        return None
+    name = NEGATION.sub("", key)
+    return TERM_SYNONYMS.get(name, name)
+
+
+def license_terms(parsed):
+    """Map a LicenseParser result to {relationship: sorted vocabulary terms}
+
+    Negated terms become PROHIBITS of the positive term: an obligation
+    "no_endorsement" forbids endorsement rather than requiring it, and a
+    right "no_warranty" never grants one.
+    """
+    terms = {relationship: set() for relationship in TERM_RELATIONSHIPS.values()}
+    for field, relationship in TERM_RELATIONSHIPS.items():
+        for term in parsed.get(field) or []:
+            name = normalize_term(term)
+            if name:
+                terms["PROHIBITS" if is_negated(term) else relationship].add(name)
+    return {relationship: sorted(names) for relationship, names in terms.items()}
+
+
+def refold_terms(results):
+    """Recompute stored terms from the saved parses, so vocabulary changes apply without re-parsing"""
+    for result in results.values():
+        if "parsed" in result:
+            result["terms"] = license_terms(result["parsed"])
+    return results
+
+
+class LicenseTermPipeline:
+    """Parse every downloaded license with LicenseParser and keep the normalized terms
+
+    Results are stored per SPDX id together with the content hash of the text
+    they were parsed from, so a rerun only sends new or changed licenses to the
+    LLM. Failed parses are not stored and are retried on the next run.
+    """
+
+    def __init__(self, parser, licenses_dir="data/licenses", output_path="data/license_terms.json"):
+        self.parser = parser
+        self.licenses_dir = Path(licenses_dir)
+        self.output_path = Path(output_path)
+        self.results = self.load()
+
+    def load(self):
+        if not self.output_path.exists():
+            return {}
+        with open(self.output_path, "r", encoding="utf-8") as f:
+            return refold_terms(json.load(f))
+
+    def save(self):
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        save_manifest(self.results, self.output_path)
+
+    def pending(self):
+        """License records that were never parsed or whose text changed since, plus the unchanged count"""
+        pending = []
+        unchanged = 0
+        for _, license_data in iter_license_files(self.licenses_dir):
+            saved = self.results.get(license_data["basic_info"]["spdx_id"])
+            if saved is None or saved["content_hash"] != license_hash(license_data):
+                pending.append(license_data)
+            else:
+                unchanged += 1
+        return pending, unchanged
+
+    def parse_one(self, license_data):
+        return license_data, self.parser.parse_license(license_data["content"])
+
+    def run(self, workers=4):
+        """Parse pending licenses on a small thread pool; returns {parsed, failed, unchanged}"""
+        pending, unchanged = self.pending()
+        stats = {"parsed": 0, "failed": 0, "unchanged": unchanged}
+        print(f"Parsing {len(pending)} new or changed licenses with {workers} workers...")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for license_data, parsed in executor.map(self.parse_one, pending):
+                spdx_id = license_data["basic_info"]["spdx_id"]
+                if "error" in parsed:
+                    print(f"Failed to parse {spdx_id}: {parsed['error']}")
+                    stats["failed"] += 1
+                    continue
+                self.results[spdx_id] = {
+                    "content_hash": license_hash(license_data),
+                    "terms": license_terms(parsed),
+                    "parsed": parsed
+                }
+                stats["parsed"] += 1
+                # Checkpoint regularly so an interrupted run keeps what it paid for
+                if stats["parsed"] % 10 == 0:
+                    self.save()
+        self.save()
+        print(f"Parsed {stats['parsed']} licenses ({stats['failed']} failed, {stats['unchanged']} unchanged)")
+        return stats
+
+    def vocabulary(self):
+        """Every term used by at least one license"""
+        return sorted({
+            term
+            for result in self.results.values()
+            for terms in result["terms"].values()
+            for term in terms
+        })
+
+
+def main():
+    from license_parser_openai import LicenseParser
+    from graph_builder import GraphBuilder
+
+    load_dotenv(override=True)
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
+
+    pipeline = LicenseTermPipeline(LicenseParser(api_key=api_key))
+    pipeline.run(workers=int(os.getenv("LICENSE_PARSER_WORKERS", "4")))
+    print(f"{len(pipeline.vocabulary())} distinct terms across {len(pipeline.results)} licenses")
+
+    builder = GraphBuilder()
+    try:
+        builder.create_constraints()
+        builder.load_license_terms(pipeline.output_path)
+    finally:
+        builder.close()
+
+
+if __name__ == "__main__":
+    main()
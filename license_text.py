@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+# Typographic variants that differ between scrapes of the same text
+PUNCTUATION_MAP = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"',
+    "\u2013": "-", "\u2014": "-", "\u00a0": " "
+})
+
+
+def normalize_license_text(text):
+    """Normalize license text so cosmetic differences do not count as changes
+
+    Case, typographic quotes/dashes and all whitespace (including line
+    wrapping) are folded, which keeps the hash stable across scraper backends
+    while any change to the wording still produces a new hash.
+    """
+    if not text:
+        return ""
+    text = text.translate(PUNCTUATION_MAP).lower()
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def content_hash(text):
+    """SHA-256 of the normalized license text"""
+    return hashlib.sha256(normalize_license_text(text).encode("utf-8")).hexdigest()
+
+
+def license_hash(license_data):
+    """Content hash stored on a license record, computed for records saved before hashes existed"""
+    return license_data.get("content_hash") or content_hash(license_data.get("content", ""))
+
+
+def iter_license_files(licenses_dir="data/licenses"):
+    """Yield (path, license record) for every license JSON file"""
+    for path in sorted(Path(licenses_dir).glob("*.json")):
+        if path.name in ("summary.json", "manifest.json"):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            yield path, json.load(f)
+
+
+def build_manifest(licenses_dir="data/licenses"):
+    """Map each license SPDX id to its content hash"""
+    return {
+        license_data["basic_info"]["spdx_id"]: license_hash(license_data)
+        for _, license_data in iter_license_files(licenses_dir)
+    }
+
+
+def load_manifest(path):
+    """Read a {spdx_id: content_hash} manifest, empty if it does not exist"""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    """Write a manifest through a temp file so readers never see a partial one"""
+    path = Path(path)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True, ensure_ascii=False)
+    os.replace(tmp_path, path)
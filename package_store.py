@@ -0,0 +1,233 @@
+import json
+import mmap
+import os
+import re
+from pathlib import Path
+
+# Marks a data line that deletes its package rather than storing a record
+TOMBSTONE = "_deleted"
+
+
+def canonical_name(name):
+    """PEP 503 normalized package name used as the store key"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+class PackageStore:
+    """Packed package-metadata store: one JSONL data file plus a byte-offset index
+
+    Records are appended to `data_path` as compact JSON lines; `index_path`
+    maps each package name to the (offset, length) of its latest line, so a
+    lookup is one dict access and one slice of a memory-mapped file. A full
+    scan is a single mmap'd read of the data file. Rewriting a package
+    appends a new line and moves the index entry, and deleting one appends a
+    tombstone line; `compact()` drops the superseded lines and tombstones.
+    Keys are PEP 503 normalized names, so `PyYAML` and `pyyaml` address the
+    same record.
+
+    The index file records how many bytes of the data file it covers; lines
+    appended after the last `flush()` (for example before a crash) are picked
+    up by scanning only that tail on open.
+    """
+
+    def __init__(self, data_path="data/packages.jsonl", index_path=None):
+        self.data_path = Path(data_path)
+        self.index_path = Path(index_path) if index_path else self.data_path.with_suffix(".idx.json")
+        self.data_path.parent.mkdir(parents=True, exist_ok=True)
+        self.data_path.touch(exist_ok=True)
+        self.index = {}
+        self.indexed_bytes = 0
+        self.dirty = False
+        self.load_index()
+
+    def load_index(self):
+        """Load the offset index and catch up on lines appended since it was written"""
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            self.index = {name: tuple(entry) for name, entry in saved["packages"].items()}
+            self.indexed_bytes = saved["data_bytes"]
+        data_bytes = self.data_path.stat().st_size
+        if data_bytes < self.indexed_bytes:
+            # The data file was replaced behind our back; rebuild from scratch
+            self.index = {}
+            self.indexed_bytes = 0
+        if data_bytes > self.indexed_bytes:
+            self.scan_tail()
+
+    def scan_tail(self):
+        """Index complete lines past `indexed_bytes`"""
+        torn = False
+        with open(self.data_path, "rb") as f:
+            f.seek(self.indexed_bytes)
+            offset = self.indexed_bytes
+            for line in f:
+                if not line.endswith(b"\n"):
+                    torn = True
+                    break
+                try:
+                    record = json.loads(line)
+                    name = canonical_name(record["name"])
+                except (ValueError, KeyError, TypeError):
+                    offset += len(line)
+                    continue
+                if record.get(TOMBSTONE):
+                    self.index.pop(name, None)
+                else:
+                    self.index[name] = (offset, len(line) - 1)
+                offset += len(line)
+        if torn:
+            # Drop the partial line left by an interrupted append so new records start on a clean line
+            with open(self.data_path, "r+b") as f:
+                f.truncate(offset)
+        self.indexed_bytes = offset
+        self.dirty = True
+
+    def flush(self):
+        """Persist the offset index"""
+        if not self.dirty:
+            return
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"data_bytes": self.indexed_bytes, "packages": self.index}, f)
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+
+    def put(self, name, record):
+        """Append a record for a package, superseding any earlier one"""
+        if not record.get("name"):
+            record = dict(record, name=name)
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with open(self.data_path, "ab") as f:
+            offset = f.tell()
+            f.write(line + b"\n")
+        self.index[canonical_name(record["name"])] = (offset, len(line))
+        self.indexed_bytes = offset + len(line) + 1
+        self.dirty = True
+
+    def delete(self, name):
+        """Drop a package by appending a tombstone line; returns False when it was not stored
+
+        The tombstone keeps the deletion across a crash before the next
+        `flush()`, since reopening replays the data file past the index.
+        `compact()` drops both the tombstone and the superseded record.
+        """
+        key = canonical_name(name)
+        if key not in self.index:
+            return False
+        line = json.dumps({"name": name, TOMBSTONE: True}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with open(self.data_path, "ab") as f:
+            offset = f.tell()
+            f.write(line + b"\n")
+        del self.index[key]
+        self.indexed_bytes = offset + len(line) + 1
+        self.dirty = True
+        return True
+
+    def get(self, name):
+        """O(1) lookup of a package record by name"""
+        entry = self.index.get(canonical_name(name))
+        if entry is None:
+            return None
+        offset, length = entry
+        with open(self.data_path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def __contains__(self, name):
+        return canonical_name(name) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def names(self):
+        return list(self.index)
+
+    def iter_records(self):
+        """Scan every live record with a single mmap of the data file"""
+        if not self.index:
+            return
+        with open(self.data_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for offset, length in sorted(self.index.values()):
+                    yield json.loads(data[offset:offset + length])
+
+    def record_edges(self, record, names=None):
+        """Yield (source, target, requirements, kind, optional) edges of one record
+
+        Targets are resolved to the spelling of the stored record when the
+        dependency is itself in the store, so edges line up with package names.
+        `names` maps canonical names to stored spellings when the caller has it.
+        """
+        for target, requirements, kind, optional in record.get("dependencies") or []:
+            if names is not None:
+                resolved = names.get(canonical_name(target), target)
+            else:
+                stored = self.get(target)
+                resolved = stored["name"] if stored else target
+            yield record["name"], resolved, requirements, kind, optional
+
+    def iter_edges(self):
+        """Yield the dependency edges of every record in the store"""
+        records = list(self.iter_records())
+        names = {canonical_name(record["name"]): record["name"] for record in records}
+        for record in records:
+            yield from self.record_edges(record, names)
+
+    def dependency_index(self, include_optional=False):
+        """Adjacency list of canonical package names for local traversals"""
+        index = {}
+        for source, target, _, _, optional in self.iter_edges():
+            targets = index.setdefault(canonical_name(source), [])
+            if include_optional or not optional:
+                targets.append(canonical_name(target))
+        return index
+
+    def compact(self):
+        """Rewrite the data file keeping only the latest record of each package"""
+        tmp_path = self.data_path.with_suffix(".compact")
+        index = {}
+        with open(tmp_path, "wb") as out:
+            for record in self.iter_records():
+                line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                index[canonical_name(record["name"])] = (out.tell(), len(line))
+                out.write(line + b"\n")
+            data_bytes = out.tell()
+        os.replace(tmp_path, self.data_path)
+        self.index = index
+        self.indexed_bytes = data_bytes
+        self.dirty = True
+        self.flush()
+
+    def import_directory(self, directory):
+        """Pack loose data/dependencies/<name>.json files into the store"""
+        imported = 0
+        for path in sorted(Path(directory).glob("*.json")):
+            if path.name == "summary.json":
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+            self.put(record.get("name") or path.stem, record)
+            imported += 1
+        self.flush()
+        return imported
+
+
+def open_package_store(dependencies_dir="data/dependencies", data_path="data/packages.jsonl"):
+    """Open the packed store, migrating the legacy loose JSON files on first use"""
+    store = PackageStore(data_path)
+    if not len(store) and Path(dependencies_dir).exists():
+        imported = store.import_directory(dependencies_dir)
+        if imported:
+            print(f"Packed {imported} files from {dependencies_dir} into {store.data_path}")
+    return store
+
+
+def main():
+    store = open_package_store()
+    store.compact()
+    print(f"{len(store)} packages in {store.data_path} ({store.data_path.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
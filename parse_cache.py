@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from license_fingerprint import license_words
+
+YEAR = re.compile(r"^(19|20)\d\d$")
+
+
+def cache_text(license_text):
+    """License text reduced to what the parse depends on: no copyright lines, years, case or layout"""
+    return " ".join(word for word in license_words(license_text) if not YEAR.match(word))
+
+
+def parse_key(license_text, model, prompt_version):
+    """Hash of the normalized text, the model and the prompt version"""
+    payload = f"{prompt_version}\0{model}\0{cache_text(license_text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ParseCache:
+    """SQLite cache of LLM license parses
+
+    Entries are keyed by `parse_key`, so two copies of a license that differ
+    only in their copyright line share one parse, while a new model or prompt
+    version misses. Entries expire after `ttl` seconds, and past `max_entries`
+    the least recently used ones are evicted. Results read once are also kept
+    in memory, so a repeat hit costs a dict lookup. Access times are buffered
+    in memory too and written in one batch before eviction reads them (on
+    `put`) and on `close`.
+    """
+
+    def __init__(self, path="data/parse_cache.sqlite", ttl=30 * 24 * 3600, max_entries=10000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.memory = {}
+        # key -> last access time not yet written to the table
+        self.accessed = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # One connection shared by LicenseTermPipeline's worker threads, serialized by the lock
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS parses ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS parses_last_access ON parses (last_access)")
+        self.connection.commit()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            os.getenv("LICENSE_PARSE_CACHE", "data/parse_cache.sqlite"),
+            ttl=float(os.getenv("LICENSE_PARSE_CACHE_TTL_DAYS", "30")) * 24 * 3600,
+            max_entries=int(os.getenv("LICENSE_PARSE_CACHE_MAX_ENTRIES", "10000"))
+        )
+
+    def get(self, key):
+        """Cached parse for a key, or None when missing or expired"""
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is None:
+                row = self.connection.execute(
+                    "SELECT result, created_at FROM parses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = self.memory[key] = (row[0], row[1])
+            if entry is None or now - entry[1] > self.ttl:
+                if entry is not None:
+                    self.memory.pop(key, None)
+                    self.accessed.pop(key, None)
+                    self.connection.execute("DELETE FROM parses WHERE key = ?", (key,))
+                    self.connection.commit()
+                self.misses += 1
+                return None
+            self.accessed[key] = now
+            self.hits += 1
+        # A fresh copy per hit, so callers may annotate the result
+        return json.loads(entry[0])
+
+    def put(self, key, result):
+        """Store a successful parse and evict past max_entries"""
+        if "error" in result:
+            return
+        now = time.time()
+        encoded = json.dumps(result, ensure_ascii=False)
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO parses (key, result, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, encoded, now, now)
+            )
+            self.memory[key] = (encoded, now)
+            self.accessed.pop(key, None)
+            self.evict(now)
+            self.connection.commit()
+
+    def write_access_times(self):
+        """Write the buffered access times in one statement; the caller holds the lock and commits"""
+        if self.accessed:
+            self.connection.executemany(
+                "UPDATE parses SET last_access = ? WHERE key = ?",
+                [(last_access, key) for key, last_access in self.accessed.items()]
+            )
+            self.accessed.clear()
+
+    def evict(self, now):
+        """Drop expired entries, then least recently used ones until max_entries remain"""
+        self.write_access_times()
+        expired = self.connection.execute("DELETE FROM parses WHERE created_at < ?", (now - self.ttl,)).rowcount
+        excess = self.connection.execute("SELECT COUNT(*) FROM parses").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.connection.execute(
+                "DELETE FROM parses WHERE key IN (SELECT key FROM parses ORDER BY last_access LIMIT ?)",
+                (excess,)
+            )
+        if expired or excess > 0:
+            self.evictions += expired + max(excess, 0)
+            # Rebuilt lazily from the table
+            self.memory.clear()
+
+    def close(self):
+        with self.lock:
+            self.write_access_times()
+            self.connection.commit()
+            self.connection.close()
+
+    def stats(self):
+        """Hit/miss counters for reporting at the end of a run"""
+        lookups = self.hits + self.misses
+        with self.lock:
+            entries = self.connection.execute("SELECT COUNT(*) FROM parses").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries
+        }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """Process-wide cache configured from the environment, opened on first use"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ParseCache.from_env()
+        return _default_cache
@@ -0,0 +1,82 @@
+import codecs
+import json
+import re
+from pathlib import Path
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+# Project name at the start of a PEP 508 requirement (before extras, specifiers, markers or "@ url")
+REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)")
+
+
+def text_encoding(path):
+    """Encoding of a text file from its byte-order mark: Windows tools often write UTF-16 or UTF-8 with a BOM"""
+    with open(path, "rb") as f:
+        head = f.read(4)
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    return "utf-8"
+
+
+def parse_requirements(path, seen=None):
+    """Package names from a requirements.txt, following -r/--requirement includes"""
+    path = Path(path)
+    seen = seen if seen is not None else set()
+    if path.resolve() in seen:
+        return []
+    seen.add(path.resolve())
+    names = []
+    with open(path, "r", encoding=text_encoding(path)) as f:
+        for line in f:
+            line = line.split(" #", 1)[0].strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith(("-r", "--requirement")):
+                include = re.sub(r"^(-r|--requirement)[ =]?", "", line).strip()
+                names.extend(parse_requirements(path.parent / include, seen))
+                continue
+            if line.startswith("-"):
+                # -e/--editable, --index-url, -c constraints and other pip options name no package here
+                continue
+            match = REQUIREMENT_NAME.match(line)
+            if match:
+                names.append(match.group(1))
+    return names
+
+
+def parse_poetry_lock(path, include_dev=False):
+    """Package names from a poetry.lock"""
+    with open(path, "rb") as f:
+        lock = tomllib.load(f)
+    names = []
+    for package in lock.get("package", []):
+        # Poetry < 1.2 marks dev-only packages with category = "dev"
+        if not include_dev and package.get("category") == "dev":
+            continue
+        names.append(package["name"])
+    return names
+
+
+def parse_pipfile_lock(path, include_dev=False):
+    """Package names from a Pipfile.lock"""
+    with open(path, "r", encoding="utf-8") as f:
+        lock = json.load(f)
+    sections = ["default", "develop"] if include_dev else ["default"]
+    return [name for section in sections for name in lock.get(section, {})]
+
+
+def read_dependencies(path, include_dev=False):
+    """Dependency names of a project from requirements.txt, poetry.lock or Pipfile.lock, deduplicated"""
+    path = Path(path)
+    if path.name == "poetry.lock":
+        names = parse_poetry_lock(path, include_dev)
+    elif path.name == "Pipfile.lock":
+        names = parse_pipfile_lock(path, include_dev)
+    else:
+        names = parse_requirements(path)
+    return list(dict.fromkeys(names))
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by concurrent workers
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Every
+    request takes one token, so a burst of up to `capacity` requests can go
+    out immediately, after which callers are paced at exactly `rate`.
+    The bucket is safe to share between threads and between asyncio tasks
+    running on the same event loop.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, capacity: float = None):
+        """Create a bucket from a requests-per-minute quota"""
+        return cls(requests_per_minute / 60.0, capacity)
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            # The token is borrowed from the future; wait until it has been refilled
+            return -self.tokens / self.rate
+
+    def acquire(self) -> None:
+        """Block the calling thread until a token is available"""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait on the event loop until a token is available"""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
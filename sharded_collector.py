@@ -0,0 +1,145 @@
+import asyncio
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from collection_journal import CollectionJournal
+from dependency_collector import DependencyCollector
+from package_store import PackageStore
+
+
+def collect_shard(shard_index, packages, api_key, requests_per_minute, concurrency, shard_dir):
+    """Worker process entry point: collect one shard into its own store and journal"""
+    shard_dir = Path(shard_dir)
+    collector = DependencyCollector(
+        api_key=api_key,
+        store_path=shard_dir / f"shard-{shard_index}.jsonl",
+        journal_path=shard_dir / f"progress-{shard_index}.jsonl"
+    )
+    journal = CollectionJournal(collector.journal_path)
+    try:
+        pending = [package for package in packages if not journal.is_done(package[0])]
+        print(f"Shard {shard_index}: {len(pending)}/{len(packages)} packages to fetch "
+              f"at {requests_per_minute:.0f} requests/min")
+        stats = asyncio.run(collector.collect_async(pending, journal, concurrency, requests_per_minute))
+        summary = journal.build_summary(len(packages))
+        summary.update(stats)
+        summary["http_cache"] = collector.http_cache.stats()
+        return summary
+    finally:
+        journal.flush()
+        collector.package_store.flush()
+
+
+class ShardedCollectionRunner:
+    """Collect a package list with N worker processes, then merge their shards
+
+    Packages are assigned to shards by a stable hash of their name, so a rerun
+    with the same worker count resumes each shard from its own journal. Every
+    worker has its own rate budget: with one API key per worker (from
+    LIBRARIES_IO_API_KEYS) throughput grows linearly with the worker count;
+    workers that share a key split that key's quota between them.
+    """
+
+    def __init__(self, csv_path, workers=4, api_keys=None, requests_per_minute=60,
+                 concurrency=10, limit=None, freshness_days=None):
+        self.csv_path = csv_path
+        self.workers = workers
+        keys = api_keys or [k.strip() for k in os.getenv("LIBRARIES_IO_API_KEYS", "").split(",") if k.strip()]
+        self.collector = DependencyCollector()
+        self.api_keys = keys or [self.collector.api_key]
+        self.requests_per_minute = requests_per_minute
+        self.concurrency = concurrency
+        self.limit = limit
+        self.freshness_days = freshness_days if freshness_days is not None else self.collector.freshness_days
+        self.shard_dir = Path("data/collection/shards")
+
+    def shard_of(self, package_name):
+        """Stable shard assignment (unlike hash(), crc32 does not change between processes)"""
+        return zlib.crc32(package_name.encode("utf-8")) % self.workers
+
+    def worker_budget(self, shard_index):
+        """API key and requests-per-minute budget for one worker"""
+        key_index = shard_index % len(self.api_keys)
+        sharing = len(range(key_index, self.workers, len(self.api_keys)))
+        return self.api_keys[key_index], self.requests_per_minute / sharing
+
+    def split(self, packages):
+        """Partition (name, download_count) pairs into per-worker shards"""
+        shards = [[] for _ in range(self.workers)]
+        for package in packages:
+            shards[self.shard_of(package[0])].append(package)
+        return shards
+
+    def merge_shards(self):
+        """Fold every shard store into the canonical package store"""
+        merged = 0
+        for shard_path in sorted(self.shard_dir.glob("shard-*.jsonl")):
+            shard = PackageStore(shard_path)
+            for record in shard.iter_records():
+                self.collector.package_store.put(record["name"], record)
+                merged += 1
+        self.collector.package_store.flush()
+        # Only clear the shards once the canonical store holds their records
+        for shard_path in self.shard_dir.glob("shard-*"):
+            os.remove(shard_path)
+        for journal_path in self.shard_dir.glob("progress-*.jsonl"):
+            CollectionJournal.archive(journal_path)
+        print(f"Merged {merged} records into {self.collector.package_store.data_path}")
+        return merged
+
+    def run(self):
+        """Collect all shards in parallel, merge them and write summary.json"""
+        packages = self.collector.load_packages(self.csv_path, self.limit)
+        fresh = [p for p in packages if self.collector.is_fresh(p[0], self.freshness_days)]
+        fresh_names = {name for name, _ in fresh}
+        pending = [p for p in packages if p[0] not in fresh_names]
+        print(f"Found {len(packages)} packages ({len(fresh)} still fresh). "
+              f"Collecting {len(pending)} with {self.workers} workers and {len(self.api_keys)} API keys...")
+
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        started_at = time.monotonic()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = []
+            for shard_index, shard in enumerate(self.split(pending)):
+                api_key, requests_per_minute = self.worker_budget(shard_index)
+                futures.append(executor.submit(
+                    collect_shard, shard_index, shard, api_key, requests_per_minute,
+                    self.concurrency, str(self.shard_dir)
+                ))
+            shard_summaries = [future.result() for future in futures]
+        elapsed = time.monotonic() - started_at
+
+        self.merge_shards()
+
+        summary = {
+            "total_packages": len(packages),
+            "processed_packages": sum(s["processed_packages"] for s in shard_summaries),
+            "failed_packages": sum(s["failed_packages"] for s in shard_summaries),
+            "skipped_packages": len(fresh),
+            "workers": self.workers,
+            "elapsed_seconds": round(elapsed, 2),
+            "requests_per_second": round(len(pending) / elapsed, 3) if elapsed else 0.0,
+            "packages": [{"name": name, "download_count": count, "status": "skipped"} for name, count in fresh]
+        }
+        for shard_summary in shard_summaries:
+            summary["packages"].extend(shard_summary["packages"])
+        print(f"\nCollected {len(pending)} packages in {elapsed:.1f}s "
+              f"({summary['requests_per_second']} requests/sec across {self.workers} workers)")
+        self.collector.save_summary(summary)
+        return summary
+
+
+def main():
+    # Replace with your CSV file path
+    csv_path = r"C:\Users\Ilyesbk\Work\PFE_Licenseer\src\top-pypi-packages.csv"
+    workers = int(os.getenv("LIBRARIES_IO_WORKERS", "4"))
+    runner = ShardedCollectionRunner(csv_path, workers)
+    runner.run()
+    print("\nDependency collection complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,19 +7,30 @@ Extracts license terms and attributes from text and returns JSON
 import json
 import openai
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from parse_cache import ParseCache, default_cache, parse_key
 
-def parse_license_with_openai(license_text: str, api_key: str) -> Dict[str, Any]:
+MODEL = "gpt-4o"
+# Bump whenever the prompt below changes so cached parses of the old prompt miss
+PROMPT_VERSION = "simple-1"
+
+def parse_license_with_openai(license_text: str, api_key: str, cache: Optional[ParseCache] = None) -> Dict[str, Any]:
     """
     Parse license text using OpenAI LLM with few-shot examples
     
     Args:
         license_text: The license text to parse
         api_key: OpenAI API key
+        cache: Parse result cache (default: the shared cache configured by LICENSE_PARSE_CACHE)
         
     Returns:
         Dictionary containing parsed license information
     """
+    cache = cache or default_cache()
+    key = parse_key(license_text, MODEL, PROMPT_VERSION)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
     
     # Few-shot examples in the prompt
     prompt = f"""
@@ -63,7 +74,7 @@ Return only valid JSON, no other text:
         client = openai.OpenAI(api_key=api_key)
         
         response = client.chat.completions.create(
-            model="gpt-4o",
+            model=MODEL,
             messages=[
                 {"role": "system", "content": "You are a legal expert. Always respond with valid JSON only."},
                 {"role": "user", "content": prompt}
@@ -74,10 +85,11 @@ Return only valid JSON, no other text:
         )
         
         result = json.loads(response.choices[0].message.content)
+        cache.put(key, result)
         return result
         
     except Exception as e:
-        return {{"error": str(e)}}
+        return {"error": str(e)}
 
 def main():
     """Example usage"""
@@ -0,0 +1,138 @@
+import re
+from functools import lru_cache
+
+# Tokens of an SPDX license expression: parentheses, or a run of id characters
+TOKEN = re.compile(r"\s*(\(|\)|[A-Za-z0-9.:+-]+)")
+LICENSE_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9.-]*\+?$")
+OPERATORS = {"AND", "OR", "WITH"}
+
+
+class ExpressionError(ValueError):
+    """Raised for strings that are not valid SPDX license expressions"""
+
+
+def tokenize(expression):
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = TOKEN.match(expression, position)
+        if not match:
+            raise ExpressionError(f"Unexpected character at {position} in {expression!r}")
+        token = match.group(1)
+        # Operators are upper case in the spec, but lower case ones show up in package metadata
+        tokens.append(token.upper() if token.upper() in OPERATORS else token)
+        position = match.end()
+    return tokens
+
+
+class Parser:
+    """Recursive-descent parser; WITH binds tighter than AND, which binds tighter than OR
+
+    Compiled nodes are plain tuples, so they are hashable and cheap to cache:
+    ("license", id, or_later, exception), ("and", children), ("or", children).
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise ExpressionError(f"Unexpected token {self.peek()!r}")
+        return node
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else ("or", tuple(children))
+
+    def parse_and(self):
+        children = [self.parse_with()]
+        while self.peek() == "AND":
+            self.take()
+            children.append(self.parse_with())
+        return children[0] if len(children) == 1 else ("and", tuple(children))
+
+    def parse_with(self):
+        token = self.take()
+        if token == "(":
+            node = self.parse_or()
+            if self.take() != ")":
+                raise ExpressionError("Missing closing parenthesis")
+            return node
+        if token is None or token in OPERATORS or token == ")" or not LICENSE_ID.match(token):
+            raise ExpressionError(f"Expected a license id, got {token!r}")
+        or_later = token.endswith("+")
+        license_id = token[:-1] if or_later else token
+        exception = None
+        if self.peek() == "WITH":
+            self.take()
+            exception = self.take()
+            if exception is None or exception in OPERATORS or exception in ("(", ")"):
+                raise ExpressionError(f"Expected an exception id, got {exception!r}")
+        return ("license", license_id, or_later, exception)
+
+
+@lru_cache(maxsize=65536)
+def compile_expression(expression):
+    """Parse an SPDX expression once; repeated expressions come from the cache"""
+    return Parser(tokenize(expression)).parse()
+
+
+def license_ids(node):
+    """Every license id referenced by a compiled expression, in order"""
+    if node[0] == "license":
+        return [node[1]]
+    return [license_id for child in node[1] for license_id in license_ids(child)]
+
+
+def candidates(node):
+    """Ids a leaf may be looked up under: GPL-2.0+ also matches GPL-2.0-or-later"""
+    if node[2]:
+        return (f"{node[1]}-or-later", node[1])
+    return (node[1],)
+
+
+def evaluate(node, allowed):
+    """Evaluate a compiled expression with short-circuiting
+
+    `allowed(license_id)` decides a single license; OR needs one branch to pass
+    (the licensee may choose it), AND needs every branch to pass.
+    """
+    kind = node[0]
+    if kind == "license":
+        return any(allowed(license_id) for license_id in candidates(node))
+    if kind == "or":
+        return any(evaluate(child, allowed) for child in node[1])
+    return all(evaluate(child, allowed) for child in node[1])
+
+
+def package_expression(package_data):
+    """SPDX expression for a libraries.io package record
+
+    The raw `licenses` string is used when it is a valid expression over the
+    normalized license ids; otherwise the normalized ids are joined with OR,
+    matching how a list of licenses has been read so far.
+    """
+    normalized = package_data.get("normalized_licenses") or []
+    raw = (package_data.get("licenses") or "").strip()
+    if raw:
+        try:
+            node = compile_expression(raw)
+        except ExpressionError:
+            node = None
+        if node is not None and normalized and set(license_ids(node)) <= set(normalized):
+            return raw
+    return " OR ".join(normalized) or None
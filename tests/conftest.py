@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+
+
+class StubResult:
+    def __init__(self, records=()):
+        self.records = list(records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def single(self):
+        return self.records[0] if self.records else None
+
+    def consume(self):
+        return None
+
+
+class StubTransaction:
+    def __init__(self, session):
+        self.session = session
+
+    def run(self, query, parameters=None, **kwargs):
+        return self.session.run(query, parameters, **kwargs)
+
+
+class StubSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, parameters=None, **kwargs):
+        params = dict(parameters or {}, **kwargs)
+        with self.driver.lock:
+            self.driver.calls.append({"session": id(self), "query": query, "params": params})
+        return StubResult(self.driver.respond(query, params))
+
+    def execute_write(self, work, *args):
+        return work(StubTransaction(self), *args)
+
+    def execute_read(self, work, *args):
+        return work(StubTransaction(self), *args)
+
+
+class StubDriver:
+    """Records every query run through it; `responses` maps a query substring to the records it returns"""
+
+    def __init__(self, responses=None):
+        self.responses = responses or {}
+        self.calls = []
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def session(self, database=None):
+        return StubSession(self)
+
+    def respond(self, query, params):
+        for fragment, records in self.responses.items():
+            if fragment in query:
+                return records
+        return []
+
+    def verify_connectivity(self):
+        return None
+
+    def close(self):
+        self.closed = True
+
+    def written_rows(self, fragment):
+        """Every row sent in an UNWIND batch whose query contains `fragment`"""
+        return [row for call in self.calls if fragment in call["query"] for row in call["params"].get("rows", [])]
+
+
+@pytest.fixture
+def stub_driver():
+    return StubDriver()
+
+
+@pytest.fixture
+def graph_builder(tmp_path, monkeypatch, stub_driver):
+    """GraphBuilder over a stub driver, with its data directories under tmp_path"""
+    import graph_builder as module
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("NEO4J_URI", "neo4j://localhost:7687")
+    monkeypatch.setenv("NEO4J_PASSWORD", "test")
+    for name in ("NEO4J_BATCH_SIZE", "NEO4J_INGEST_WORKERS"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(module.GraphDatabase, "driver", lambda *args, **kwargs: stub_driver)
+    return module.GraphBuilder()
+
+
+@pytest.fixture
+def make_license():
+    """Write a license record the way LicenseDownloader saves it"""
+    import json
+
+    def write(licenses_dir, spdx_id, content, name=None, category="Popular", **metadata):
+        licenses_dir.mkdir(parents=True, exist_ok=True)
+        record = {
+            "basic_info": {
+                "name": name or f"{spdx_id} License",
+                "spdx_id": spdx_id,
+                "category": category,
+                "url": f"https://opensource.org/license/{spdx_id.lower()}"
+            },
+            "metadata": {"version": "N/A", "submitter": "N/A", "steward": "N/A", "steward_url": "N/A", **metadata},
+            "content": content
+        }
+        path = licenses_dir / f"{spdx_id}.json"
+        path.write_text(json.dumps(record), encoding="utf-8")
+        return record
+
+    return write
@@ -0,0 +1,61 @@
+import json
+
+from collection_journal import CollectionJournal
+
+
+def test_entries_are_buffered_until_batch_is_full(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = CollectionJournal(path, batch_size=2)
+    journal.record("requests", 100, "success")
+    assert not path.exists()
+    journal.record("urllib3", 90, "failed")
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["requests", "urllib3"]
+
+
+def test_resume_skips_done_packages_only(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = CollectionJournal(path, batch_size=10)
+    journal.record("requests", 100, "success")
+    journal.record("six", 80, "skipped")
+    journal.record("urllib3", 90, "failed")
+    journal.flush()
+
+    resumed = CollectionJournal(path)
+    assert resumed.is_done("requests")
+    assert resumed.is_done("six")
+    assert not resumed.is_done("urllib3")
+    assert not resumed.is_done("numpy")
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text(
+        json.dumps({"name": "requests", "download_count": 1, "status": "success"}) + "\n{\"name\": \"six\", \"sta",
+        encoding="utf-8"
+    )
+    journal = CollectionJournal(path)
+    assert journal.is_done("requests")
+    assert list(journal.entries) == ["requests"]
+
+
+def test_build_summary_counts_statuses(tmp_path):
+    journal = CollectionJournal(tmp_path / "journal.jsonl")
+    journal.record("requests", 100, "success")
+    journal.record("six", 80, "skipped")
+    journal.record("urllib3", 90, "failed")
+    summary = journal.build_summary(total_packages=5)
+    assert summary["total_packages"] == 5
+    assert (summary["processed_packages"], summary["skipped_packages"], summary["failed_packages"]) == (1, 1, 1)
+    assert [package["name"] for package in summary["packages"]] == ["requests", "six", "urllib3"]
+
+
+def test_finish_archives_the_journal(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = CollectionJournal(path)
+    journal.record("requests", 100, "success")
+    journal.finish()
+    assert not path.exists()
+    archived = list(tmp_path.glob("journal.*.jsonl"))
+    assert len(archived) == 1
+    assert CollectionJournal(path).entries == {}
@@ -0,0 +1,112 @@
+import pytest
+
+import license_compatibility_checker as checker_module
+from compatibility_matrix import CompatibilityMatrix
+from conftest import StubDriver
+
+EDGES = [("MIT", "GPL-3.0", True), ("GPL-3.0", "MIT", False), ("MIT", "Apache-2.0", True)]
+
+
+class FlakyDriver(StubDriver):
+    """Fails its first `failures` sessions, then answers like StubDriver"""
+
+    def __init__(self, failures, responses=None):
+        super().__init__(responses)
+        self.failures = failures
+
+    def session(self, database=None):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("graph unavailable")
+        return super().session(database)
+
+
+@pytest.fixture
+def make_checker(tmp_path, monkeypatch):
+    def build(driver):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("NEO4J_URI", "neo4j://localhost:7687")
+        monkeypatch.setenv("NEO4J_PASSWORD", "test")
+        monkeypatch.delenv("COMPATIBILITY_MATRIX_CSV", raising=False)
+        monkeypatch.setattr(checker_module, "load_dotenv", lambda **kwargs: None)
+        monkeypatch.setattr(checker_module.GraphDatabase, "driver", lambda *args, **kwargs: driver)
+        return checker_module.LicenseCompatibilityChecker()
+
+    return build
+
+
+def graph_edges():
+    return [{"source": s, "target": t, "is_compatible": c} for s, t, c in EDGES]
+
+
+def test_verdicts_from_edges():
+    matrix = CompatibilityMatrix.from_edges(EDGES)
+
+    assert len(matrix) == 3
+    assert "Apache-2.0" in matrix
+    assert matrix.verdict("MIT", "GPL-3.0") is True
+    assert matrix.verdict("GPL-3.0", "MIT") is False
+    assert matrix.verdict("Apache-2.0", "MIT") is None
+    assert matrix.verdict("MIT", "BSD-3-Clause") is None
+
+
+def test_is_compatible_treats_unknown_as_incompatible():
+    matrix = CompatibilityMatrix.from_edges(EDGES)
+
+    assert matrix.is_compatible("MIT", "Apache-2.0")
+    assert not matrix.is_compatible("Apache-2.0", "MIT")
+    assert not matrix.is_compatible("MIT", "BSD-3-Clause")
+
+
+def test_known_license_is_compatible_with_itself():
+    matrix = CompatibilityMatrix.from_edges(EDGES)
+
+    assert matrix.is_compatible("MIT", "MIT")
+    assert not matrix.is_compatible("BSD-3-Clause", "BSD-3-Clause")
+
+
+def test_from_csv_skips_diagonal_and_reads_columns_by_position(tmp_path):
+    path = tmp_path / "matrix.csv"
+    path.write_text(
+        "License,MIT License,GPL-3.0 License\n"
+        "MIT,Same,Yes\n"
+        "GPL-3.0,No,\n",
+        encoding="utf-8"
+    )
+
+    matrix = CompatibilityMatrix.from_csv(path)
+
+    assert matrix.verdict("MIT", "GPL-3.0") is True
+    assert matrix.verdict("GPL-3.0", "MIT") is False
+    assert matrix.verdict("MIT", "MIT") is None
+    assert matrix.is_compatible("GPL-3.0", "GPL-3.0")
+
+
+def test_from_graph_reads_every_edge_in_one_query():
+    driver = StubDriver({"IS_COMPATIBLE_WITH": graph_edges()})
+
+    matrix = CompatibilityMatrix.from_graph(driver)
+
+    assert len(driver.calls) == 1
+    assert matrix.is_compatible("MIT", "GPL-3.0")
+
+
+def test_failed_first_load_is_retried(make_checker):
+    driver = FlakyDriver(failures=1, responses={"IS_COMPATIBLE_WITH": graph_edges()})
+    checker = make_checker(driver)
+
+    assert not checker.check_license_compatibility("MIT", "GPL-3.0")
+    assert checker._matrix is None
+
+    assert checker.check_license_compatibility("MIT", "GPL-3.0")
+    assert len(checker.matrix) == 3
+
+
+def test_failed_refresh_keeps_previous_matrix(make_checker):
+    driver = FlakyDriver(failures=0, responses={"IS_COMPATIBLE_WITH": graph_edges()})
+    checker = make_checker(driver)
+    loaded = checker.matrix
+
+    driver.failures = 1
+    assert checker.refresh_compatibility_matrix() is loaded
+    assert checker.matrix is loaded
@@ -0,0 +1,180 @@
+from dependency_audit import DependencyAuditor
+from license_normalizer import LicenseNormalizer
+from package_store import PackageStore
+from spdx_expression import compile_expression
+
+# Permissive licenses may go into anything; copyleft only into itself
+PERMISSIVE = {"MIT", "BSD-3-Clause", "Apache-2.0"}
+
+
+def compatible(source, target):
+    return source in PERMISSIVE or source == target
+
+
+def make_auditor(dependencies, licenses, calls=None, is_known=None, expressions=None):
+    def is_compatible(source, target):
+        if calls is not None:
+            calls.append((source, target))
+        return compatible(source, target)
+
+    licenses = {package: tuple(ids) for package, ids in licenses.items()}
+    return DependencyAuditor(dependencies, licenses, is_compatible, is_known, expressions)
+
+
+def test_clean_tree_is_compatible():
+    auditor = make_auditor(
+        {"app": ["requests"], "requests": ["urllib3", "idna"]},
+        {"app": ["MIT"], "requests": ["Apache-2.0"], "urllib3": ["MIT"], "idna": ["BSD-3-Clause"]}
+    )
+
+    report = auditor.audit("app")
+
+    assert report["compatible"]
+    assert report["conflicts"] == []
+    assert report["unlicensed"] == []
+    assert report["license_sets"] == [["Apache-2.0"], ["BSD-3-Clause"], ["MIT"]]
+
+
+def test_conflict_is_reported_with_its_path():
+    auditor = make_auditor(
+        {"app": ["web", "cli"], "web": ["parser"], "cli": []},
+        {"app": ["MIT"], "web": ["MIT"], "cli": ["MIT"], "parser": ["GPL-3.0"]}
+    )
+
+    report = auditor.audit("app")
+
+    assert not report["compatible"]
+    assert report["conflicts"] == [{"package": "parser", "licenses": ["GPL-3.0"], "path": ["app", "web", "parser"]}]
+    # The clean "cli" subtree is pruned from the walk
+    assert report["visited_packages"] == 3
+
+
+def test_dual_licensed_package_needs_one_compatible_option():
+    auditor = make_auditor(
+        {"app": ["lib"]},
+        {"app": ["MIT"], "lib": ["GPL-3.0", "MIT"]}
+    )
+
+    assert auditor.audit("app")["compatible"]
+
+
+def test_and_expression_needs_every_license_compatible():
+    dependencies = {"app": ["lib"]}
+    licenses = {"app": ["MIT"], "lib": ["GPL-3.0", "MIT"]}
+
+    assert make_auditor(dependencies, licenses, expressions={"lib": "GPL-3.0 OR MIT"}).audit("app")["compatible"]
+    report = make_auditor(dependencies, licenses, expressions={"lib": "GPL-3.0 AND MIT"}).audit("app")
+    assert report["conflicts"] == [{"package": "lib", "licenses": ["GPL-3.0", "MIT"], "path": ["app", "lib"]}]
+
+
+def test_unlicensed_packages_are_listed():
+    auditor = make_auditor(
+        {"app": ["lib"], "lib": ["mystery"]},
+        {"app": ["MIT"], "lib": ["MIT"]}
+    )
+
+    report = auditor.audit("app")
+
+    assert report["unlicensed"] == ["mystery"]
+    assert report["compatible"]
+
+
+def test_root_without_license_needs_outbound_licenses():
+    auditor = make_auditor({"app": ["lib"]}, {"lib": ["GPL-3.0"]})
+
+    assert "error" in auditor.audit("app")
+    report = auditor.audit("app", outbound_licenses=["GPL-3.0"])
+    assert report["outbound_licenses"] == ["GPL-3.0"]
+    assert report["compatible"]
+
+
+def test_cycle_members_share_one_closure():
+    auditor = make_auditor(
+        {"app": ["a"], "a": ["b"], "b": ["c", "a"], "c": []},
+        {"app": ["MIT"], "a": ["MIT"], "b": ["BSD-3-Clause"], "c": ["GPL-3.0"]}
+    )
+
+    report = auditor.audit("app")
+
+    assert auditor.subtree_licenses("a") is auditor.subtree_licenses("b")
+    assert compile_expression("GPL-3.0") in auditor.subtree_licenses("a")
+    assert report["conflicts"] == [{"package": "c", "licenses": ["GPL-3.0"], "path": ["app", "a", "b", "c"]}]
+
+
+def test_shared_subtrees_are_memoized_across_roots():
+    auditor = make_auditor(
+        {"one": ["shared"], "two": ["shared"], "shared": ["leaf"]},
+        {"one": ["MIT"], "two": ["Apache-2.0"], "shared": ["MIT"], "leaf": ["BSD-3-Clause"]}
+    )
+
+    auditor.audit("one")
+    shared = auditor.closures["shared"]
+    auditor.audit("two")
+
+    assert auditor.closures["shared"] is shared
+    assert set(auditor.closures) == {"one", "two", "shared", "leaf"}
+
+
+def test_verdicts_are_memoized_per_expression():
+    calls = []
+    auditor = make_auditor(
+        {"app": ["a", "b", "c"]},
+        {"app": ["MIT"], "a": ["GPL-3.0"], "b": ["GPL-3.0"], "c": ["GPL-3.0"]},
+        calls
+    )
+
+    report = auditor.audit("app")
+
+    assert [conflict["package"] for conflict in report["conflicts"]] == ["a", "b", "c"]
+    assert calls.count(("GPL-3.0", "MIT")) == 1
+
+
+def test_root_name_is_canonicalized():
+    auditor = make_auditor({"py-yaml": []}, {"py-yaml": ["MIT"]})
+
+    assert auditor.audit("Py_YAML")["root"] == "py-yaml"
+
+
+def test_deep_chain_does_not_recurse():
+    chain = [f"pkg{i}" for i in range(5000)]
+    auditor = make_auditor(
+        {package: [child] for package, child in zip(chain, chain[1:])},
+        {package: ["MIT"] for package in chain}
+    )
+
+    assert auditor.audit("pkg0")["compatible"]
+
+
+def test_licenses_missing_from_the_matrix_are_unknown():
+    auditor = make_auditor(
+        {"app": ["odd", "dual", "bad"]},
+        {"app": ["MIT"], "odd": ["WTFPL"], "dual": ["WTFPL", "BSD-3-Clause"], "bad": ["WTFPL", "GPL-3.0"]},
+        is_known=lambda spdx_id: spdx_id != "WTFPL"
+    )
+
+    report = auditor.audit("app")
+
+    # "dual" is allowed through BSD-3-Clause; "bad" might still be allowed through WTFPL
+    assert [entry["package"] for entry in report["unknown"]] == ["odd", "bad"]
+    assert report["unknown"][0] == {"package": "odd", "licenses": ["WTFPL"], "path": ["app", "odd"]}
+    assert report["conflicts"] == []
+    assert report["compatible"]
+
+
+def test_store_licenses_are_resolved_like_the_graph(tmp_path, make_license):
+    licenses_dir = tmp_path / "licenses"
+    make_license(licenses_dir, "MIT", "Permission is hereby granted.", name="MIT License")
+    make_license(licenses_dir, "GPL-3.0-only", "GNU General Public License.", name="GNU General Public License v3.0 only")
+    store = PackageStore(tmp_path / "packages.jsonl")
+    dependencies = [["lib", "", "runtime", False], ["odd", "", "runtime", False]]
+    store.put("app", {"name": "app", "normalized_licenses": ["MIT"], "dependencies": dependencies})
+    store.put("lib", {"name": "lib", "licenses": "GPLv3", "normalized_licenses": ["Other"], "dependencies": []})
+    # An id without a license file is no license id at all
+    store.put("odd", {"name": "odd", "licenses": "", "normalized_licenses": ["Nonsense-1.0"], "dependencies": []})
+
+    auditor = DependencyAuditor.from_package_store(store, compatible, normalizer=LicenseNormalizer(licenses_dir))
+    report = auditor.audit("app")
+
+    assert auditor.licenses["lib"] == ("GPL-3.0-only",)
+    assert report["conflicts"] == [{"package": "lib", "licenses": ["GPL-3.0-only"], "path": ["app", "lib"]}]
+    assert report["unlicensed"] == ["odd"]
@@ -0,0 +1,147 @@
+import json
+
+import pytest
+
+from dependency_collector import DependencyCollector
+
+
+def snapshot(name, version, licenses=("MIT",)):
+    return {"name": name, "latest_release_number": version, "normalized_licenses": list(licenses), "dependencies": []}
+
+
+@pytest.fixture
+def collector(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return DependencyCollector(api_key="test", store_path=tmp_path / "data" / "packages.jsonl")
+
+
+@pytest.fixture
+def packages_csv(tmp_path):
+    def write(*names):
+        path = tmp_path / "packages.csv"
+        path.write_text("project,download_count\n" + "".join(f"{name},{100}\n" for name in names), encoding="utf-8")
+        return path
+
+    return write
+
+
+def stub_network(collector, monkeypatch, probe, releases, fail=()):
+    """Replace the PyPI probe with fixed results and libraries.io with `releases`"""
+
+    async def find_candidates(packages, concurrency):
+        added = [p for p in packages if p[0] not in collector.package_store]
+        candidates = [p for p in packages if p[0] in probe.get("changed", ())]
+        return added, candidates, list(probe.get("removed", ()))
+
+    async def get_dependency_info_async(session, package_name, rate_limiter, max_retries=3):
+        if package_name in fail:
+            raise RuntimeError(f"interrupted while fetching {package_name}")
+        return releases[package_name]
+
+    monkeypatch.setattr(collector, "find_candidates", find_candidates)
+    monkeypatch.setattr(collector, "get_dependency_info_async", get_dependency_info_async)
+
+
+def read_changeset(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_refresh_reports_added_updated_and_unchanged(collector, packages_csv, monkeypatch):
+    collector.package_store.put("a", snapshot("a", "1.0"))
+    collector.package_store.put("b", snapshot("b", "1.0"))
+    stub_network(collector, monkeypatch, {"changed": ["a", "b"]}, {
+        "a": snapshot("a", "2.0"),
+        # A newer release whose record is identical is not an update
+        "b": snapshot("b", "1.0"),
+        "new": snapshot("new", "0.1")
+    })
+
+    changeset = read_changeset(collector.refresh(packages_csv("a", "b", "new"), concurrency=2, requests_per_minute=6000))
+
+    assert changeset["added"] == ["new"]
+    assert changeset["updated"] == ["a"]
+    assert changeset["removed"] == []
+    assert changeset["unchanged"] == 1
+    assert not collector.pending_changeset_path.exists()
+
+
+def test_interrupted_refresh_keeps_packages_fetched_before_the_crash(collector, packages_csv, monkeypatch):
+    collector.package_store.put("a", snapshot("a", "1.0"))
+    collector.package_store.put("b", snapshot("b", "1.0"))
+    releases = {"a": snapshot("a", "2.0"), "b": snapshot("b", "2.0")}
+    csv_path = packages_csv("a", "b")
+
+    stub_network(collector, monkeypatch, {"changed": ["a", "b"]}, releases, fail={"b"})
+    assert collector.refresh(csv_path, concurrency=1, requests_per_minute=6000) is None
+    assert collector.package_store.get("a")["latest_release_number"] == "2.0"
+
+    # The rerun's probe no longer sees a change for "a": its new snapshot is already stored
+    stub_network(collector, monkeypatch, {"changed": ["b"]}, releases)
+    changeset = read_changeset(collector.refresh(csv_path, concurrency=1, requests_per_minute=6000))
+
+    assert sorted(changeset["updated"]) == ["a", "b"]
+    assert not collector.pending_changeset_path.exists()
+
+
+def test_refresh_deletes_packages_gone_from_pypi(collector, packages_csv, monkeypatch):
+    collector.package_store.put("a", snapshot("a", "1.0"))
+    collector.package_store.put("gone", snapshot("gone", "1.0"))
+    stub_network(collector, monkeypatch, {"removed": ["gone"]}, {})
+
+    changeset = read_changeset(collector.refresh(packages_csv("a", "gone"), requests_per_minute=6000))
+
+    assert changeset["removed"] == ["gone"]
+    assert "gone" not in collector.package_store
+    assert [record["name"] for record in collector.package_store.iter_records()] == ["a"]
+
+
+def libraries_io_dependency(project_name, requirements, kind="runtime", optional=False, **fields):
+    """One entry of a libraries.io /latest/dependencies response"""
+    return {
+        "project_name": project_name, "name": project_name, "platform": "Pypi", "requirements": requirements,
+        "latest_stable": "2.2.3", "latest": "2.2.3", "deprecated": False, "outdated": False, "filepath": None,
+        "kind": kind, "optional": optional, "normalized_licenses": ["MIT"], **fields
+    }
+
+
+def test_extract_dependencies_keeps_name_requirement_kind_and_optional(collector):
+    response = {"name": "requests", "dependencies": [
+        libraries_io_dependency("urllib3", "<3,>=1.21.1"),
+        libraries_io_dependency("PySocks", "!=1.5.7,>=1.5.6", kind="extra", optional=True),
+        libraries_io_dependency("pytest", ">=3", kind="test")
+    ]}
+
+    assert collector.extract_dependencies(response) == [
+        ["urllib3", "<3,>=1.21.1", "runtime", False],
+        ["PySocks", "!=1.5.7,>=1.5.6", "extra", True],
+        ["pytest", ">=3", "test", False]
+    ]
+
+
+def test_extract_dependencies_fills_in_missing_fields(collector):
+    response = {"dependencies": [
+        # Older responses only carry project_name, and leave unpinned requirements empty
+        {"project_name": "idna", "requirements": "", "kind": None},
+        {"name": "certifi", "requirements": None, "optional": None},
+        # Entries without a name cannot become edges
+        {"requirements": ">=1", "kind": "runtime"}
+    ]}
+
+    assert collector.extract_dependencies(response) == [
+        ["idna", "*", "runtime", False],
+        ["certifi", "*", "runtime", False]
+    ]
+    assert collector.extract_dependencies({"dependencies": None}) == []
+    assert collector.extract_dependencies({}) == []
+
+
+def test_extract_fields_stores_compact_edges(collector):
+    record = collector.extract_fields({
+        "name": "requests", "licenses": "Apache 2.0", "normalized_licenses": ["Apache-2.0"],
+        "rank": 30, "dependencies": [libraries_io_dependency("idna", "<4,>=2.5")]
+    })
+
+    assert record["dependencies"] == [["idna", "<4,>=2.5", "runtime", False]]
+    assert "rank" not in record
+    assert record["normalized_licenses"] == ["Apache-2.0"]
@@ -0,0 +1,223 @@
+import csv
+import json
+import zlib
+
+import pytest
+
+from graph_builder import GraphBuilder
+from package_store import PackageStore
+from license_text import iter_license_files
+
+
+def test_ingest_workers_comes_from_environment(graph_builder, monkeypatch):
+    assert graph_builder.ingest_workers == 4
+    monkeypatch.setenv("NEO4J_INGEST_WORKERS", "2")
+    assert GraphBuilder().ingest_workers == 2
+
+
+def test_bulk_write_of_nothing_writes_nothing(graph_builder, stub_driver):
+    assert graph_builder.create_license_nodes([]) == 0
+    assert stub_driver.calls == []
+
+
+def test_write_rows_partitions_by_key(graph_builder, stub_driver):
+    rows = [{"source": f"pkg{i}", "target": f"dep{i % 3}"} for i in range(100)]
+    written = graph_builder.write_rows("UNWIND $rows AS row RETURN row", rows,
+                                       lambda row: row["source"], batch_size=10)
+    assert written == 100
+    assert sorted(row["source"] for row in stub_driver.written_rows("UNWIND")) == sorted(row["source"] for row in rows)
+    sessions = {}
+    for call in stub_driver.calls:
+        for row in call["params"]["rows"]:
+            sessions.setdefault(zlib.crc32(row["source"].encode("utf-8")) % 4, set()).add(call["session"])
+    # Every partition went through exactly one session, and rows were spread over several
+    assert all(len(ids) == 1 for ids in sessions.values())
+    assert len(sessions) > 1
+
+
+def test_partitions_are_sorted_by_order(graph_builder):
+    rows = [{"source": f"pkg{i}", "target": f"dep{9 - i}"} for i in range(10)]
+    for partition in GraphBuilder.partition(rows, lambda row: row["source"], 3, lambda row: row["target"]):
+        assert [row["target"] for row in partition] == sorted(row["target"] for row in partition)
+
+
+def test_single_worker_uses_one_session(graph_builder, stub_driver):
+    graph_builder.ingest_workers = 1
+    graph_builder.write_rows("UNWIND $rows AS row RETURN row", [{"name": str(i)} for i in range(25)],
+                             lambda row: row["name"], batch_size=10)
+    assert len(stub_driver.calls) == 3
+    assert len({call["session"] for call in stub_driver.calls}) == 1
+
+
+def test_export_needs_no_neo4j_credentials(tmp_path, monkeypatch, make_license):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("NEO4J_URI", raising=False)
+    monkeypatch.delenv("NEO4J_PASSWORD", raising=False)
+    make_license(tmp_path / "data" / "licenses", "MIT", "Permission is hereby granted.")
+    dependencies_dir = tmp_path / "data" / "dependencies"
+    dependencies_dir.mkdir(parents=True)
+    (dependencies_dir / "requests.json").write_text(json.dumps({
+        "name": "requests",
+        "licenses": "MIT",
+        "normalized_licenses": ["MIT"],
+        "dependencies": [["urllib3", ">=1.21", "runtime", False]]
+    }), encoding="utf-8")
+
+    builder = GraphBuilder()
+    builder.export_admin_import(tmp_path / "out")
+    builder.close()
+
+    with open(tmp_path / "out" / "uses_license.csv", encoding="utf-8") as f:
+        assert list(csv.reader(f))[1:] == [["requests", "MIT", "USES_LICENSE"]]
+    with open(tmp_path / "out" / "stub_packages.csv", encoding="utf-8") as f:
+        assert list(csv.reader(f))[1:] == [["urllib3", "Package"]]
+    with pytest.raises(ValueError):
+        builder.driver
+    # Writing CSVs leaves the blob store alone
+    assert not (tmp_path / "data" / "license_blobs").exists()
+
+
+def test_export_writes_each_edge_once(tmp_path, monkeypatch, make_license):
+    monkeypatch.chdir(tmp_path)
+    make_license(tmp_path / "data" / "licenses", "MIT", "Permission is hereby granted.")
+    store = PackageStore(tmp_path / "data" / "packages.jsonl")
+    store.put("requests", {
+        "name": "requests",
+        "normalized_licenses": ["MIT", "MIT"],
+        # Listed once as a runtime and once as a test dependency
+        "dependencies": [["urllib3", ">=1.21", "runtime", False], ["urllib3", "", "test", True],
+                         ["idna", ">=2.5", "runtime", False]]
+    })
+
+    GraphBuilder().export_admin_import(tmp_path / "out")
+
+    with open(tmp_path / "out" / "uses_license.csv", encoding="utf-8") as f:
+        assert list(csv.reader(f))[1:] == [["requests", "MIT", "USES_LICENSE"]]
+    with open(tmp_path / "out" / "depends_on.csv", encoding="utf-8") as f:
+        assert [row[:3] for row in list(csv.reader(f))[1:]] == [["requests", "urllib3", ">=1.21"],
+                                                               ["requests", "idna", ">=2.5"]]
+
+
+def test_build_graph_rewrites_licenses_whose_metadata_changed(graph_builder, stub_driver, make_license, tmp_path):
+    licenses_dir = tmp_path / "data" / "licenses"
+    make_license(licenses_dir, "MIT", "Permission is hereby granted.")
+    make_license(licenses_dir, "ISC", "Permission to use, copy, modify.")
+    in_graph = {row["spdx_id"]: row["fingerprint"]
+                for row in (graph_builder.license_row(data) for _, data in iter_license_files(licenses_dir))}
+    # Same text, new steward: only the metadata differs from what the graph holds
+    make_license(licenses_dir, "MIT", "Permission is hereby granted.", steward="Expat")
+    stub_driver.responses = {
+        "RETURN 1 as test": [{"test": 1}],
+        "l.fingerprint AS fingerprint": [{"spdx_id": spdx_id, "fingerprint": fp} for spdx_id, fp in in_graph.items()]
+    }
+
+    graph_builder.build_graph()
+
+    written = stub_driver.written_rows("MERGE (l:License")
+    assert [(row["spdx_id"], row["steward"]) for row in written] == [("MIT", "Expat")]
+
+
+def test_apply_changeset_rewrites_changed_packages_and_deletes_removed(graph_builder, stub_driver, tmp_path):
+    store = PackageStore(tmp_path / "data" / "packages.jsonl")
+    store.put("new", {"name": "new", "normalized_licenses": ["MIT"], "dependencies": [["idna", ">=2", "runtime", False]]})
+    store.put("changed", {"name": "changed", "normalized_licenses": ["Apache-2.0"], "dependencies": []})
+    changeset_path = tmp_path / "changeset.json"
+    changeset_path.write_text(json.dumps({
+        "added": ["new"], "updated": ["changed", "missing"], "removed": ["gone"], "unchanged": 7
+    }), encoding="utf-8")
+
+    graph_builder.apply_changeset(changeset_path)
+
+    def names(fragment, key):
+        return [call["params"][key] for call in stub_driver.calls if fragment in call["query"]]
+
+    assert names("MERGE (p:Package {name: $name})", "name") == ["new", "changed"]
+    assert names("[r:USES_LICENSE|DEPENDS_ON]", "package_name") == ["new", "changed"]
+    # Old edges go before the new ones are written, so a dropped dependency does not linger
+    queries = [call["query"] for call in stub_driver.calls]
+    first_edge = next(i for i, query in enumerate(queries) if "MERGE (p)-[" in query)
+    assert any("DELETE r" in query for query in queries[:first_edge])
+    assert names("MERGE (p)-[:USES_LICENSE]->(l)", "license_spdx") == ["MIT", "Apache-2.0"]
+    assert [(row["source"], row["target"]) for row in stub_driver.written_rows("DEPENDS_ON")] == [("new", "idna")]
+    assert names("DETACH DELETE", "package_name") == ["gone"]
+
+
+def test_license_texts_are_stored_when_nodes_are_written(graph_builder, stub_driver, make_license, tmp_path):
+    make_license(tmp_path / "data" / "licenses", "MIT", "Permission is hereby granted.")
+    _, license_data = next(iter_license_files(tmp_path / "data" / "licenses"))
+
+    row = graph_builder.license_row(license_data)
+    assert row["content_sha256"] not in graph_builder.license_blobs
+
+    graph_builder.create_license_nodes(graph_builder.license_rows())
+    assert graph_builder.license_blobs.get(row["content_sha256"]) == "Permission is hereby granted."
+
+
+@pytest.fixture
+def synced(graph_builder, stub_driver, make_license, tmp_path):
+    """Local data synced once into an empty graph; the stub then answers with that graph's fingerprints"""
+    licenses_dir = tmp_path / "data" / "licenses"
+    make_license(licenses_dir, "MIT", "Permission is hereby granted.")
+    make_license(licenses_dir, "Apache-2.0", "Licensed under the Apache License.")
+    make_license(licenses_dir, "ISC", "Permission to use, copy, modify.")
+    store = PackageStore(tmp_path / "data" / "packages.jsonl")
+    store.put("requests", {"name": "requests", "normalized_licenses": ["Apache-2.0"],
+                           "dependencies": [["urllib3", ">=1.21", "runtime", False], ["idna", ">=2.5", "runtime", False]]})
+    store.put("urllib3", {"name": "urllib3", "normalized_licenses": ["MIT"], "dependencies": []})
+    store.put("idna", {"name": "idna", "normalized_licenses": ["ISC"], "dependencies": []})
+    store.flush()
+    graph_builder.sync_graph()
+
+    licenses = {row["spdx_id"]: row["fingerprint"] for row in stub_driver.written_rows("MERGE (l:License")}
+    packages = {row["name"]: [row["fingerprint"], None]
+                for row in stub_driver.written_rows("MERGE (p:Package {name: row.name})")}
+    for row in stub_driver.written_rows("SET p.edges_fingerprint"):
+        packages[row["name"]][1] = row["edges_fingerprint"]
+    stub_driver.responses = {
+        "l.fingerprint AS fingerprint": [{"spdx_id": spdx_id, "fingerprint": fp} for spdx_id, fp in licenses.items()],
+        "p.edges_fingerprint AS edges_fingerprint": [
+            {"name": name, "fingerprint": fp, "edges_fingerprint": edges_fp} for name, (fp, edges_fp) in packages.items()
+        ]
+    }
+    stub_driver.calls = []
+    return store
+
+
+def test_unchanged_resync_writes_nothing(graph_builder, stub_driver, synced):
+    stats = graph_builder.sync_graph()
+
+    # Only the two fingerprint reads reach the graph
+    assert len(stub_driver.calls) == 2
+    assert stats["packages"] == {"created": 0, "changed": 0, "deleted": 0, "unchanged": 3}
+    assert stats["licenses"]["unchanged"] == 3
+    assert stats["edges"]["packages_resynced"] == 0
+
+
+def test_changed_package_is_resynced_alone(graph_builder, stub_driver, synced):
+    synced.put("requests", {"name": "requests", "description": "HTTP for Humans.", "normalized_licenses": ["Apache-2.0"],
+                            "dependencies": [["urllib3", ">=1.26", "runtime", False]]})
+    synced.flush()
+
+    stats = graph_builder.sync_graph()
+
+    assert [row["name"] for row in stub_driver.written_rows("MERGE (p:Package {name: row.name})")] == ["requests"]
+    assert [row["name"] for row in stub_driver.written_rows("SET p.edges_fingerprint")] == ["requests"]
+    assert [(row["target"], row["requirements"]) for row in stub_driver.written_rows("MERGE (p)-[r:DEPENDS_ON]")] == [
+        ("urllib3", ">=1.26")
+    ]
+    assert stats["packages"]["changed"] == 1
+    assert stub_driver.written_rows("MERGE (l:License") == []
+
+
+def test_removed_package_and_license_are_deleted(graph_builder, stub_driver, synced, tmp_path):
+    synced.delete("idna")
+    synced.flush()
+    (tmp_path / "data" / "licenses" / "ISC.json").unlink()
+
+    stats = graph_builder.sync_graph()
+
+    assert stub_driver.written_rows("MATCH (n:Package") == ["idna"]
+    assert stub_driver.written_rows("MATCH (n:License") == ["ISC"]
+    assert stats["packages"]["deleted"] == 1 and stats["licenses"]["deleted"] == 1
+    # requests pointed at idna, so its edges are rebuilt
+    assert [row["name"] for row in stub_driver.written_rows("SET p.edges_fingerprint")] == ["requests"]
@@ -0,0 +1,79 @@
+from http_cache import HTTPCache
+
+
+class StubResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+class StubSession:
+    """Serves queued responses and records the headers of every request"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append({"url": url, "params": params, "headers": headers})
+        return self.responses.pop(0)
+
+
+def test_revalidated_response_is_served_from_disk(tmp_path):
+    cache = HTTPCache(tmp_path)
+    session = StubSession(
+        StubResponse(200, b"body", {"ETag": '"v1"'}),
+        StubResponse(304)
+    )
+    first = cache.get(session, "https://example.org/a")
+    second = cache.get(session, "https://example.org/a")
+    assert not first.from_cache
+    assert second.from_cache and second.content == b"body"
+    assert session.requests[1]["headers"]["If-None-Match"] == '"v1"'
+    assert cache.stats()["hits"] == 1
+
+
+def test_responses_without_validators_are_not_stored(tmp_path):
+    cache = HTTPCache(tmp_path)
+    cache.get(StubSession(StubResponse(200, b"body")), "https://example.org/a")
+    assert cache.stats()["entries"] == 0
+
+
+def test_api_key_is_left_out_of_the_key(tmp_path):
+    cache = HTTPCache(tmp_path)
+    assert (cache.cache_key("https://example.org/a", {"api_key": "one", "page": 1})
+            == cache.cache_key("https://example.org/a", {"api_key": "two", "page": 1}))
+    assert cache.cache_key("https://example.org/a", {"page": 1}) != cache.cache_key("https://example.org/a", {"page": 2})
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    HTTPCache(tmp_path).get(StubSession(StubResponse(200, b"body", {"Last-Modified": "yesterday"})),
+                            "https://example.org/a")
+    reopened = HTTPCache(tmp_path)
+    key = reopened.cache_key("https://example.org/a")
+    assert reopened.conditional_headers(key) == {"If-Modified-Since": "yesterday"}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = HTTPCache(tmp_path, max_bytes=10)
+    for name in ("a", "b"):
+        cache.get(StubSession(StubResponse(200, b"12345", {"ETag": name})), f"https://example.org/{name}")
+    cache.get(StubSession(StubResponse(304)), "https://example.org/a")
+    cache.get(StubSession(StubResponse(200, b"12345", {"ETag": "c"})), "https://example.org/c")
+    assert cache.conditional_headers(cache.cache_key("https://example.org/a"))
+    assert not cache.conditional_headers(cache.cache_key("https://example.org/b"))
+    assert cache.stats()["evictions"] == 1
+
+
+def test_caches_sharing_a_directory_see_whole_files(tmp_path):
+    writer = HTTPCache(tmp_path)
+    reader = HTTPCache(tmp_path)
+    writer.get(StubSession(StubResponse(200, b"old body", {"ETag": "v1"})), "https://example.org/a")
+    reader.load_index()
+    writer.get(StubSession(StubResponse(200, b"new body", {"ETag": "v2"})), "https://example.org/a")
+
+    revalidated = reader.get(StubSession(StubResponse(304)), "https://example.org/a")
+
+    assert revalidated.content == b"new body"
+    assert not list(tmp_path.glob("*.tmp"))
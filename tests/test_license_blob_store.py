@@ -0,0 +1,36 @@
+from license_blob_store import LicenseBlobStore
+
+MIT = "Permission is hereby granted, free of charge,\r\nto any person obtaining a copy.\n"
+
+
+def test_put_then_get_round_trips_the_exact_text(tmp_path):
+    store = LicenseBlobStore(tmp_path / "blobs")
+
+    sha256 = store.put(MIT)
+
+    assert sha256 == LicenseBlobStore.key(MIT)
+    assert sha256 in store
+    # Line endings are kept byte for byte, or the hash would no longer match the text
+    assert store.get(sha256) == MIT
+
+
+def test_same_text_is_stored_once(tmp_path):
+    store = LicenseBlobStore(tmp_path / "blobs")
+
+    first = store.put(MIT)
+    mtime = store.path(first).stat().st_mtime_ns
+    second = store.put(MIT)
+
+    assert first == second
+    assert [path.name for path in (tmp_path / "blobs").rglob("*") if path.is_file()] == [f"{first}.txt"]
+    assert store.path(first).stat().st_mtime_ns == mtime
+    assert store.put(MIT + " ") != first
+
+
+def test_missing_blob_reads_as_none(tmp_path):
+    store = LicenseBlobStore(tmp_path / "blobs")
+
+    assert store.get(LicenseBlobStore.key("never stored")) is None
+    assert LicenseBlobStore.key("never stored") not in store
+    assert store.get(None) is None
+    assert store.get("") is None
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from license_compatibility import LicenseCompatibilityBuilder
+
+
+def edges_of(df):
+    edges = LicenseCompatibilityBuilder.matrix_edges(df)
+    return sorted(edges.itertuples(index=False, name=None))
+
+
+def test_matrix_edges_flatten_every_pair_but_self_pairs():
+    # The header row carries display names; columns are read by position
+    df = pd.DataFrame({
+        "License": ["MIT", "GPL-3.0", "Apache-2.0"],
+        "MIT License": ["Yes", "No", "Yes"],
+        "GNU GPL v3": ["Yes", "Yes", "Yes"],
+        "Apache 2": ["Yes", "No", "Yes"]
+    })
+
+    assert edges_of(df) == [
+        ("Apache-2.0", "GPL-3.0", "Apache-2.0_GPL-3.0", True),
+        ("Apache-2.0", "MIT", "Apache-2.0_MIT", True),
+        ("GPL-3.0", "Apache-2.0", "GPL-3.0_Apache-2.0", False),
+        ("GPL-3.0", "MIT", "GPL-3.0_MIT", False),
+        ("MIT", "Apache-2.0", "MIT_Apache-2.0", True),
+        ("MIT", "GPL-3.0", "MIT_GPL-3.0", True)
+    ]
+
+
+def test_empty_and_unknown_cells_are_incompatible_edges():
+    df = pd.DataFrame({
+        "License": ["MIT", "WTFPL"],
+        "MIT": [None, "Unknown"],
+        "WTFPL": [None, "Yes"]
+    })
+
+    assert edges_of(df) == [
+        ("MIT", "WTFPL", "MIT_WTFPL", False),
+        ("WTFPL", "MIT", "WTFPL_MIT", False)
+    ]
@@ -0,0 +1,160 @@
+import json
+
+import pytest
+
+import license_compatibility_checker as checker_module
+from conftest import StubDriver
+
+# Which license may be used in a project under which: permissive into anything, copyleft only into itself
+MATRIX = [
+    ("MIT", "Apache-2.0", True), ("MIT", "GPL-3.0", True),
+    ("Apache-2.0", "GPL-3.0", True), ("Apache-2.0", "MIT", False),
+    ("GPL-3.0", "MIT", False), ("GPL-3.0", "Apache-2.0", False)
+]
+
+
+def license_node(spdx_id):
+    return {"spdx_id": spdx_id, "name": f"{spdx_id} License", "category": "Popular"}
+
+
+def package(name, licenses, expression=None):
+    node = {"name": name, "description": f"The {name} package"}
+    if expression:
+        node["license_expression"] = expression
+    return node, [license_node(spdx_id) for spdx_id in licenses]
+
+
+PACKAGES = {
+    "requests": package("requests", ["Apache-2.0"]),
+    "urllib3": package("urllib3", ["MIT"]),
+    "gpl-lib": package("gpl-lib", ["GPL-3.0"]),
+    "dual": package("dual", ["GPL-3.0", "MIT"], "GPL-3.0 OR MIT"),
+    "both": package("both", ["GPL-3.0", "MIT"], "GPL-3.0 AND MIT"),
+    "weird": package("weird", ["WTFPL"]),
+    "nolicense": package("nolicense", [])
+}
+
+class GraphStub(StubDriver):
+    """Answers the checker's package query for the requested names and its matrix query from MATRIX"""
+
+    def respond(self, query, params):
+        if "IS_COMPATIBLE_WITH" in query:
+            return [{"source": s, "target": t, "is_compatible": c} for s, t, c in MATRIX]
+        if "package_names" in params:
+            return [{"package_name": name, "p": PACKAGES[name][0], "licenses": PACKAGES[name][1]}
+                    for name in params["package_names"] if name in PACKAGES]
+        return []
+
+    def package_queries(self):
+        return [call for call in self.calls if "package_names" in call["params"]]
+
+
+@pytest.fixture
+def graph():
+    return GraphStub()
+
+
+@pytest.fixture
+def checker(tmp_path, monkeypatch, graph):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("NEO4J_URI", "neo4j://localhost:7687")
+    monkeypatch.setenv("NEO4J_PASSWORD", "test")
+    monkeypatch.delenv("COMPATIBILITY_MATRIX_CSV", raising=False)
+    monkeypatch.setattr(checker_module, "load_dotenv", lambda **kwargs: None)
+    monkeypatch.setattr(checker_module.GraphDatabase, "driver", lambda *args, **kwargs: graph)
+    return checker_module.LicenseCompatibilityChecker()
+
+
+def test_packages_info_comes_back_in_one_query(checker, graph):
+    info = checker.get_packages_info(["requests", "dual", "requests", "missing"])
+
+    assert len(graph.package_queries()) == 1
+    assert graph.package_queries()[0]["params"]["package_names"] == ["requests", "dual", "missing"]
+    assert set(info) == {"requests", "dual"}
+    assert [l["spdx_id"] for l in info["dual"]["licenses"]] == ["GPL-3.0", "MIT"]
+    assert info["dual"]["license_expression"] == "GPL-3.0 OR MIT"
+    # Nodes loaded before expressions were stored read as a choice between their licenses
+    assert info["requests"]["license_expression"] == "Apache-2.0"
+
+
+def test_pair_check_judges_every_license_pair(checker, graph):
+    result = checker.check_packages_compatibility("urllib3", "requests")
+
+    assert len(graph.package_queries()) == 1
+    assert result["compatibility_results"] == [{"license1": "MIT", "license2": "Apache-2.0", "is_compatible": True}]
+    assert result["overall_compatible"]
+    assert not checker.check_packages_compatibility("requests", "urllib3")["overall_compatible"]
+
+
+def test_pair_check_follows_license_expressions(checker):
+    # OR lets the dual-licensed side pick MIT; AND needs GPL-3.0 to fit as well
+    assert checker.check_packages_compatibility("dual", "urllib3")["overall_compatible"]
+    assert not checker.check_packages_compatibility("both", "urllib3")["overall_compatible"]
+
+
+def test_pair_check_with_missing_or_unmatched_licenses(checker):
+    missing = checker.check_packages_compatibility("urllib3", "missing")
+    assert missing["error"] == "One or both packages not found"
+    assert missing["package2"] is None
+
+    unlicensed = checker.check_packages_compatibility("nolicense", "urllib3")
+    assert unlicensed["compatibility_results"] == []
+    assert not unlicensed["overall_compatible"]
+    # A license the matrix does not cover is never taken as compatible
+    assert not checker.check_packages_compatibility("weird", "urllib3")["overall_compatible"]
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    path = tmp_path / "requirements.txt"
+    path.write_text(
+        "# runtime\n"
+        "requests>=2.31\n"
+        "urllib3==2.2.1\n"
+        "dual\n"
+        "both ; python_version >= '3.8'\n"
+        "gpl-lib\n"
+        "weird\n"
+        "nolicense\n"
+        "not-in-graph\n",
+        encoding="utf-8"
+    )
+    return path
+
+
+def test_scan_reports_conflicts_of_a_manifest(checker, graph, manifest):
+    report = checker.scan_project(manifest, "MIT")
+
+    assert len(graph.package_queries()) == 1
+    assert report["dependencies"] == 8
+    assert report["checked"] == 6
+    assert [conflict["package"] for conflict in report["conflicts"]] == ["requests", "both", "gpl-lib", "weird"]
+    assert report["conflicts"][1] == {"package": "both", "licenses": ["GPL-3.0", "MIT"], "expression": "GPL-3.0 AND MIT"}
+    assert not report["compatible"]
+
+
+def test_scan_lists_unlicensed_and_unknown_packages(checker, manifest):
+    report = checker.scan_project(manifest, "GPL-3.0")
+
+    assert report["unlicensed"] == ["nolicense"]
+    assert report["not_found"] == ["not-in-graph"]
+    # Only the license the matrix does not know is left as a conflict
+    assert report["conflicts"] == [{"package": "weird", "licenses": ["WTFPL"], "expression": "WTFPL"}]
+
+
+def test_scan_of_a_clean_project_passes(checker):
+    report = checker.scan_project(["urllib3", "dual"], "MIT")
+
+    assert report["compatible"]
+    assert report["conflicts"] == [] and report["unlicensed"] == [] and report["not_found"] == []
+
+
+def test_cli_exits_non_zero_on_a_conflict(checker, manifest, monkeypatch, capsys):
+    monkeypatch.setattr(checker_module.sys, "argv", ["license_compatibility_checker.py", str(manifest), "MIT"])
+
+    with pytest.raises(SystemExit) as exit_info:
+        checker_module.main()
+
+    assert exit_info.value.code == 1
+    out = capsys.readouterr().out
+    assert json.loads(out[out.index("{"):])["checked"] == 6
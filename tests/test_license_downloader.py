@@ -0,0 +1,141 @@
+import json
+import time
+
+import pytest
+
+from license_downloader import LicenseDownloader
+
+PAGE = b"""<html><body>
+<span class="pill-taxonomy"><span class="term-item">Popular</span></span>
+<div class="entry-content"><p>Permission is hereby granted.</p></div>
+</body></html>"""
+
+LICENSE = {"name": "MIT License", "spdx": "MIT", "category": "Popular", "url": "https://opensource.org/license/mit"}
+
+
+class StubResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+class StubSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.urls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.urls.append(url)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def downloader(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return LicenseDownloader(requests_per_second=1000)
+
+
+def test_new_license_is_fetched_once(downloader):
+    session = downloader._local.session = StubSession(StubResponse(200, PAGE, {"ETag": '"v1"'}))
+    entry, changed = downloader.process_license(LICENSE)
+    assert changed and entry["spdx_id"] == "MIT"
+    assert session.urls == [LICENSE["url"]]
+
+
+def test_changed_license_is_fetched_once(downloader):
+    downloader._local.session = StubSession(StubResponse(200, PAGE, {"ETag": '"v1"'}))
+    downloader.process_license(LICENSE)
+    session = downloader._local.session = StubSession(
+        StubResponse(200, PAGE.replace(b"granted", b"given"), {"ETag": '"v2"'})
+    )
+    _, changed = downloader.process_license(LICENSE)
+    assert changed
+    assert session.urls == [LICENSE["url"]]
+
+
+def test_not_modified_license_is_skipped(downloader):
+    downloader._local.session = StubSession(StubResponse(200, PAGE, {"ETag": '"v1"'}))
+    downloader.process_license(LICENSE)
+    session = downloader._local.session = StubSession(StubResponse(304))
+    entry, changed = downloader.process_license(LICENSE)
+    assert entry is not None and not changed
+    assert session.urls == [LICENSE["url"]]
+
+
+def test_unchanged_license_is_not_scraped_or_rewritten(downloader, monkeypatch):
+    downloader._local.session = StubSession(StubResponse(200, PAGE, {"ETag": '"v1"'}))
+    downloader.process_license(LICENSE)
+    saved = downloader.licenses_dir / "MIT.json"
+    mtime = saved.stat().st_mtime_ns
+
+    def scrape(url, page=None):
+        raise AssertionError("a page served from the cache must not be scraped")
+
+    monkeypatch.setattr(downloader, "scrape_license_content", scrape)
+    downloader._local.session = StubSession(StubResponse(304))
+    entry, changed = downloader.process_license(LICENSE)
+
+    assert entry["spdx_id"] == "MIT" and not changed
+    assert saved.stat().st_mtime_ns == mtime
+
+
+def test_results_keep_listing_order_under_the_thread_pool(downloader, monkeypatch):
+    listing = [dict(LICENSE, name=f"License {i}", spdx=f"L-{i}") for i in range(6)]
+
+    def process_license(license_info):
+        # Later licenses finish first
+        time.sleep(0.01 * (6 - int(license_info["spdx"][2:])))
+        return {"spdx_id": license_info["spdx"]}, False
+
+    monkeypatch.setattr(downloader, "get_all_licenses", lambda: listing)
+    monkeypatch.setattr(downloader, "process_license", process_license)
+    downloader.download_all_licenses(workers=3)
+
+    with open(downloader.licenses_dir / "summary.json", encoding="utf-8") as f:
+        summary = json.load(f)
+    assert [entry["spdx_id"] for entry in summary["licenses"]] == [f"L-{i}" for i in range(6)]
+
+
+@pytest.fixture
+def selenium_calls(downloader, monkeypatch):
+    """Record Selenium scrapes instead of starting a browser"""
+    calls = []
+
+    def scrape(url):
+        calls.append(url)
+        return {"metadata": {"category": "Popular"}, "content": "Permission is hereby granted."}
+
+    monkeypatch.setattr(downloader, "scrape_license_content_selenium", scrape)
+    monkeypatch.setattr(downloader, "get_all_licenses_selenium", lambda: calls.append("listing") or [LICENSE])
+    return calls
+
+
+def test_http_backend_uses_selenium_only_when_the_parse_is_empty(downloader, selenium_calls):
+    downloader._local.session = StubSession(StubResponse(200, PAGE))
+    assert downloader.scrape_license_content(LICENSE["url"])["content"] == "Permission is hereby granted."
+    assert selenium_calls == []
+
+    downloader._local.session = StubSession(StubResponse(200, b"<html><body>Just a moment...</body></html>"))
+    downloader.scrape_license_content(LICENSE["url"])
+    assert selenium_calls == [LICENSE["url"]]
+
+
+def test_empty_listing_falls_back_to_selenium(downloader, selenium_calls):
+    downloader._local.session = StubSession(StubResponse(200, b"<html><body></body></html>"))
+
+    assert downloader.get_all_licenses() == [LICENSE]
+    assert selenium_calls == ["listing"]
+
+
+def test_selenium_backend_skips_the_http_fetch_for_new_licenses(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    downloader = LicenseDownloader(backend="selenium", requests_per_second=1000)
+    session = downloader._local.session = StubSession()
+    monkeypatch.setattr(downloader, "scrape_license_content_selenium",
+                        lambda url: {"metadata": {}, "content": "Permission is hereby granted."})
+
+    entry, changed = downloader.process_license(LICENSE)
+
+    assert entry["spdx_id"] == "MIT" and changed
+    assert session.urls == []
@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from license_fingerprint import LicenseFingerprintIndex, license_words, section_lengths
+from license_normalizer import LicenseNormalizer
+
+
+def words(seed, count):
+    generator = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(3000)]
+    return [generator.choice(vocabulary) for _ in range(count)]
+
+
+def text(word_list, width=12):
+    return "\n".join(" ".join(word_list[i:i + width]) for i in range(0, len(word_list), width))
+
+
+# Stand-ins for a short permissive license, a long copyleft one and a mid-sized third
+SHORT = words(1, 220)
+LONG = words(2, 4000)
+MIDDLE = words(3, 600)
+
+
+@pytest.fixture
+def licenses_dir(tmp_path, make_license):
+    licenses_dir = tmp_path / "licenses"
+    make_license(licenses_dir, "BSD-3-Clause", text(SHORT))
+    make_license(licenses_dir, "GPL-3.0-only", text(LONG))
+    make_license(licenses_dir, "MPL-2.0", text(MIDDLE))
+    return licenses_dir
+
+
+@pytest.fixture
+def index(licenses_dir):
+    return LicenseFingerprintIndex(licenses_dir)
+
+
+def test_license_words_drop_copyright_lines_only():
+    sample = "Copyright (c) 2024 Someone\nAll rights reserved.\nThe above copyright notice shall be included."
+
+    assert license_words(sample) == [
+        "all", "rights", "reserved", "the", "above", "copyright", "notice", "shall", "be", "included"
+    ]
+
+
+def test_section_lengths_double_up_to_the_whole_text():
+    assert section_lengths(100) == [100]
+    assert section_lengths(600) == [128, 256, 512, 600]
+
+
+def test_identifies_a_reflowed_copy_with_its_own_copyright(index):
+    pasted = "Copyright (c) 2019 Example Project\n\n" + text(MIDDLE, width=7)
+
+    match = index.identify(pasted)
+
+    assert match["spdx_id"] == "MPL-2.0"
+    assert match["score"] == 1.0
+
+
+def test_unrelated_text_is_not_identified(index):
+    assert index.identify(text(words(4, 500))) is None
+    assert index.identify("") is None
+
+
+def test_bundle_is_identified_by_its_leading_license(index):
+    # numpy's LICENSE.txt: its own BSD-3-Clause terms, then the much longer GPL of vendored code
+    bundle = text(SHORT) + "\n\n" + text(words(5, 40)) + "\n\n" + text(LONG)
+
+    assert index.identify(bundle)["spdx_id"] == "BSD-3-Clause"
+
+
+def test_short_preamble_before_a_license(index):
+    assert index.identify(text(words(6, 60)) + "\n\n" + text(LONG))["spdx_id"] == "GPL-3.0-only"
+
+
+def test_license_quoted_late_in_a_text_does_not_match(index):
+    assert index.identify(text(words(7, 400)) + "\n\n" + text(SHORT)) is None
+
+
+def test_near_tie_is_ambiguous(tmp_path, make_license):
+    licenses_dir = tmp_path / "variants"
+    make_license(licenses_dir, "A-1.0", text(MIDDLE + ["alpha", "beta", "gamma"]))
+    make_license(licenses_dir, "B-1.0", text(MIDDLE + ["delta", "epsilon", "zeta"]))
+    make_license(licenses_dir, "C-1.0", text(MIDDLE[:300] + words(8, 300)))
+    index = LicenseFingerprintIndex(licenses_dir)
+
+    # A and B differ in three words, too few to tell them apart; C shares only its first half
+    assert index.identify(text(MIDDLE)) is None
+    assert index.identify(text(MIDDLE + ["alpha", "beta", "gamma"])) is None
+    assert index.identify(text(MIDDLE[:300] + words(8, 300)))["spdx_id"] == "C-1.0"
+
+
+def test_normalizer_reads_a_bundle_without_a_title(licenses_dir):
+    bundle = "Copyright (c) 2005-2024, Example Developers.\nAll rights reserved.\n\n" + text(SHORT) + "\n\n" + text(LONG)
+
+    assert LicenseNormalizer(licenses_dir).resolve(bundle) == ["BSD-3-Clause"]
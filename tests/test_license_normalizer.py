@@ -0,0 +1,100 @@
+import pytest
+
+from license_normalizer import LicenseNormalizer, license_key
+
+
+@pytest.fixture
+def normalizer(tmp_path, make_license):
+    licenses_dir = tmp_path / "licenses"
+    make_license(licenses_dir, "MIT", "Permission is hereby granted, free of charge.", name="The MIT License")
+    make_license(licenses_dir, "Apache-2.0", "Apache terms.", name="Apache License, Version 2.0")
+    make_license(licenses_dir, "Apache-1.1", "Old Apache terms.", name="Apache Software License, version 1.1")
+    make_license(licenses_dir, "BSD-3-Clause", "Redistribution and use.", name="The 3-Clause BSD License")
+    make_license(licenses_dir, "GPL-2.0", "GPL 2 terms.", name="GNU General Public License version 2")
+    make_license(licenses_dir, "GPL-3.0-only", "GPL 3 terms.", name="GNU General Public License version 3")
+    return LicenseNormalizer(licenses_dir)
+
+
+def test_license_key_folds_case_and_punctuation():
+    assert license_key("  GNU GPL v2+ (or later)!") == "gnu gpl v2+ or later"
+
+
+@pytest.mark.parametrize("text, spdx_id", [
+    ("mit", "MIT"),
+    ("The MIT License", "MIT"),
+    ("MIT License", "MIT"),
+    ("apache license, version 2.0", "Apache-2.0"),
+    ("GPL-2.0", "GPL-2.0"),
+])
+def test_spdx_ids_and_osi_names(normalizer, text, spdx_id):
+    assert normalizer.normalize(text) == spdx_id
+
+
+@pytest.mark.parametrize("text, spdx_id", [
+    ("Apache 2.0", "Apache-2.0"),
+    ("new BSD", "BSD-3-Clause"),
+    ("Expat", "MIT"),
+    ("GPLv3", "GPL-3.0-only"),
+])
+def test_aliases(normalizer, text, spdx_id):
+    assert normalizer.normalize(text) == spdx_id
+
+
+@pytest.mark.parametrize("text, spdx_id", [
+    ("License :: OSI Approved :: MIT License", "MIT"),
+    ("License :: OSI Approved :: GNU General Public License v2 or later (GPLv2+)", "GPL-2.0"),
+    ("License :: OSI Approved :: BSD License", "BSD-3-Clause"),
+])
+def test_trove_classifiers(normalizer, text, spdx_id):
+    assert normalizer.normalize(text) == spdx_id
+
+
+def test_fuzzy_match_tolerates_misspellings(normalizer):
+    assert normalizer.normalize("Apache Licence Version 2.0") == "Apache-2.0"
+    assert normalizer.normalize("Apache Licence Version 2.0", fuzzy=False) is None
+
+
+def test_fuzzy_match_keeps_the_major_version(normalizer):
+    assert normalizer.normalize("Apache Software Licence version 1.1") == "Apache-1.1"
+    assert normalizer.normalize("Apache Licence 3.0") is None
+
+
+def test_unknown_strings(normalizer):
+    assert normalizer.normalize("") is None
+    assert normalizer.resolve("   ") == []
+    assert normalizer.resolve("Proprietary, all rights reserved") == []
+
+
+def test_resolve_splits_license_lists(normalizer):
+    assert normalizer.resolve("Apache Software License, BSD License") == ["Apache-2.0", "BSD-3-Clause"]
+    assert normalizer.resolve("MIT or Apache 2.0") == ["MIT", "Apache-2.0"]
+    assert normalizer.resolve("MIT / MIT License") == ["MIT"]
+
+
+def test_or_later_is_not_a_separator(normalizer):
+    assert normalizer.resolve("GPL v2 or later") == ["GPL-2.0"]
+
+
+def test_pasted_text_is_read_by_its_title(normalizer):
+    text = "The MIT License\n\nCopyright (c) 2024 Someone\n\nPermission is hereby granted, free of charge."
+
+    assert normalizer.resolve(text) == ["MIT"]
+
+
+def test_normalize_many_resolves_each_distinct_string_once(normalizer):
+    resolved = normalizer.normalize_many(["MIT", "Apache 2.0", "MIT"])
+
+    assert resolved == {"MIT": ["MIT"], "Apache 2.0": ["Apache-2.0"]}
+
+
+def test_package_licenses_keeps_known_normalized_ids(normalizer):
+    package = {"licenses": "BSD", "normalized_licenses": ["MIT"]}
+
+    assert normalizer.package_licenses(package) == ["MIT"]
+    assert normalizer.package_licenses(package, known={"BSD-3-Clause"}) == ["BSD-3-Clause"]
+
+
+def test_package_licenses_resolves_other_and_empty(normalizer):
+    assert normalizer.package_licenses({"licenses": "Apache 2.0", "normalized_licenses": ["Other"]}) == ["Apache-2.0"]
+    assert normalizer.package_licenses({"licenses": "new BSD", "normalized_licenses": []}) == ["BSD-3-Clause"]
+    assert normalizer.package_licenses({"licenses": None}) == []
@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("langchain_openai")
+pytest.importorskip("langchain_community")
+
+import license_rag
+
+
+class StubVectorStore:
+    """Records the chunks a FAISS index would be asked to drop and embed"""
+
+    def __init__(self):
+        self.deleted = []
+        self.added = []
+
+    def delete(self, ids):
+        self.deleted.extend(ids)
+
+    def add_documents(self, documents, ids=None):
+        self.added.extend(ids)
+
+
+@pytest.fixture
+def rag(tmp_path, monkeypatch, make_license):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(license_rag, "load_dotenv", lambda **kwargs: None)
+    licenses_dir = tmp_path / "licenses"
+    make_license(licenses_dir, "MIT", "Permission is hereby granted.")
+    make_license(licenses_dir, "ISC", "Permission to use, copy, modify.")
+    make_license(licenses_dir, "Zlib", "This software is provided 'as-is'.")
+    rag = license_rag.LicenseRAG()
+    rag.licenses_path = str(licenses_dir)
+    # The state a build over these three licenses leaves behind
+    licenses = rag.load_license_files()
+    documents = rag.create_documents(licenses)
+    rag.embedded = {
+        data["basic_info"]["spdx_id"]: rag.manifest_entry(
+            data, [doc for doc in documents if doc.metadata["spdx_id"] == data["basic_info"]["spdx_id"]]
+        )
+        for data in licenses
+    }
+    rag.vector_db = StubVectorStore()
+    return rag
+
+
+def test_update_re_embeds_only_changed_licenses(rag, tmp_path, make_license):
+    licenses_dir = tmp_path / "licenses"
+    make_license(licenses_dir, "ISC", "Permission to use, copy, modify, and distribute.")
+    (licenses_dir / "Zlib.json").unlink()
+    make_license(licenses_dir, "0BSD", "Permission to use, copy, modify, and/or distribute.")
+
+    stats = rag.update_vector_database()
+
+    assert stats == {"added": 1, "updated": 1, "removed": 1, "unchanged": 1}
+    assert sorted(rag.vector_db.deleted) == ["ISC#0", "Zlib#0"]
+    assert sorted(rag.vector_db.added) == ["0BSD#0", "ISC#0"]
+    assert set(rag.embedded) == {"MIT", "ISC", "0BSD"}
+
+
+def test_update_without_changes_embeds_nothing(rag):
+    stats = rag.update_vector_database()
+
+    assert stats == {"added": 0, "updated": 0, "removed": 0, "unchanged": 3}
+    assert rag.vector_db.deleted == [] and rag.vector_db.added == []
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from license_terms import LicenseTermPipeline, license_terms, normalize_term
+
+
+@pytest.mark.parametrize("term, expected", [
+    ("Sublicense", "sublicense"),
+    ("no_sublicensing", "sublicense"),
+    ("No Sublicensing", "sublicense"),
+    ("no_proprietary_derivatives", "proprietary_derivatives"),
+    ("no_liability", "liability"),
+    ("no_warranty", "warranty"),
+    ("no_trademark_use", "trademark_use"),
+    ("Include copyright", "include_copyright_notice"),
+    ("no", "no"),
+    ("", None),
+    (None, None)
+])
+def test_normalize_term(term, expected):
+    assert normalize_term(term) == expected
+
+
+def test_negated_and_positive_restrictions_share_a_term():
+    terms = license_terms({"restrictions": ["sublicense", "no_sublicensing"], "rights": ["copy", "use"]})
+    assert terms == {"PERMITS": ["reproduce", "use"], "REQUIRES": [], "PROHIBITS": ["sublicense"]}
+
+
+def test_saved_results_are_refolded_on_load(tmp_path):
+    output_path = tmp_path / "license_terms.json"
+    output_path.write_text(json.dumps({
+        "GPL-3.0-only": {
+            "content_hash": "abc",
+            "terms": {"PERMITS": [], "REQUIRES": [], "PROHIBITS": ["no_sublicensing"]},
+            "parsed": {"restrictions": ["no_sublicensing"]}
+        }
+    }), encoding="utf-8")
+    pipeline = LicenseTermPipeline(parser=None, licenses_dir=tmp_path, output_path=output_path)
+    assert pipeline.vocabulary() == ["sublicense"]
+
+
+def test_negated_obligations_are_prohibitions():
+    terms = license_terms({"obligations": ["no_endorsement", "not_use_trademarks", "include copyright"]})
+    assert terms == {
+        "PERMITS": [],
+        "REQUIRES": ["include_copyright_notice"],
+        "PROHIBITS": ["endorsement", "use_trademarks"]
+    }
+
+
+def test_negated_rights_are_never_permitted():
+    terms = license_terms({"rights": ["no_warranty", "without_liability", "use"]})
+    assert terms == {"PERMITS": ["use"], "REQUIRES": [], "PROHIBITS": ["liability", "warranty"]}
+
+
+def test_negated_restrictions_keep_their_meaning():
+    terms = license_terms({"restrictions": ["no_trademark_use", "liability"]})
+    assert terms["PROHIBITS"] == ["liability", "trademark_use"]
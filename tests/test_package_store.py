@@ -0,0 +1,102 @@
+import json
+
+from package_store import PackageStore, canonical_name, open_package_store
+
+
+def record(name, *dependencies, licenses=("MIT",)):
+    return {
+        "name": name,
+        "normalized_licenses": list(licenses),
+        "dependencies": [[target, ">=1", "runtime", optional] for target, optional in dependencies]
+    }
+
+
+def test_canonical_name():
+    assert canonical_name("PyYAML") == canonical_name("pyyaml") == "pyyaml"
+    assert canonical_name("zope.interface") == canonical_name("Zope_Interface") == "zope-interface"
+
+
+def test_put_get_and_supersede(tmp_path):
+    store = PackageStore(tmp_path / "packages.jsonl")
+    store.put("PyYAML", record("PyYAML"))
+    store.put("pyyaml", record("PyYAML", licenses=("MIT", "BSD-3-Clause")))
+    assert len(store) == 1
+    assert "pyyaml" in store
+    assert store.get("PYYAML")["normalized_licenses"] == ["MIT", "BSD-3-Clause"]
+    assert store.get("missing") is None
+
+
+def test_reopen_uses_index_and_catches_up_on_unflushed_tail(tmp_path):
+    path = tmp_path / "packages.jsonl"
+    store = PackageStore(path)
+    store.put("requests", record("requests"))
+    store.flush()
+    store.put("urllib3", record("urllib3"))
+    reopened = PackageStore(path)
+    assert sorted(reopened.names()) == ["requests", "urllib3"]
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    path = tmp_path / "packages.jsonl"
+    store = PackageStore(path)
+    store.put("requests", record("requests"))
+    store.flush()
+    with open(path, "ab") as f:
+        f.write(b'{"name": "six", "norm')
+    reopened = PackageStore(path)
+    assert reopened.names() == ["requests"]
+    reopened.put("six", record("six"))
+    assert PackageStore(path).get("six")["name"] == "six"
+
+
+def test_edges_resolve_to_stored_spelling(tmp_path):
+    store = PackageStore(tmp_path / "packages.jsonl")
+    store.put("requests", record("requests", ("URLLib3", False), ("pysocks", True)))
+    store.put("urllib3", record("urllib3"))
+    assert list(store.iter_edges()) == [
+        ("requests", "urllib3", ">=1", "runtime", False),
+        ("requests", "pysocks", ">=1", "runtime", True)
+    ]
+    assert store.dependency_index() == {"requests": ["urllib3"]}
+    assert store.dependency_index(include_optional=True)["requests"] == ["urllib3", "pysocks"]
+
+
+def test_compact_keeps_latest_records(tmp_path):
+    path = tmp_path / "packages.jsonl"
+    store = PackageStore(path)
+    store.put("requests", record("requests", licenses=("MIT",)))
+    store.put("requests", record("requests", licenses=("Apache-2.0",)))
+    store.compact()
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 1
+    assert PackageStore(path).get("requests")["normalized_licenses"] == ["Apache-2.0"]
+
+
+def test_open_package_store_migrates_loose_files(tmp_path):
+    dependencies_dir = tmp_path / "dependencies"
+    dependencies_dir.mkdir()
+    (dependencies_dir / "six.json").write_text(json.dumps(record("six")), encoding="utf-8")
+    (dependencies_dir / "summary.json").write_text("{}", encoding="utf-8")
+    store = open_package_store(dependencies_dir, tmp_path / "packages.jsonl")
+    assert store.names() == ["six"]
+
+
+def test_delete_survives_reopen_and_compaction(tmp_path):
+    path = tmp_path / "packages.jsonl"
+    store = PackageStore(path)
+    store.put("requests", record("requests"))
+    store.put("six", record("six"))
+    store.flush()
+
+    assert store.delete("Six")
+    assert not store.delete("missing")
+    assert "six" not in store
+    assert [r["name"] for r in store.iter_records()] == ["requests"]
+
+    # Not flushed: the tombstone in the data tail still applies on reopen
+    reopened = PackageStore(path)
+    assert reopened.names() == ["requests"]
+
+    reopened.compact()
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 1
+    reopened.put("six", record("six"))
+    assert PackageStore(path).get("six")["name"] == "six"
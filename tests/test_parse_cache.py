@@ -0,0 +1,148 @@
+import pytest
+
+import parse_cache
+from parse_cache import ParseCache, cache_text, parse_key
+
+MIT = (
+    "Copyright (c) {year} {holder}\n\n"
+    "Permission is hereby granted, free of charge, to any person obtaining a copy\n"
+    "of this software, to deal in the Software without restriction."
+)
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(parse_cache.time, "time", clock.time)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ParseCache(tmp_path / "cache" / "parses.sqlite", ttl=100, max_entries=3)
+    yield cache
+    cache.close()
+
+
+def test_cache_text_drops_copyright_lines_years_and_layout():
+    assert cache_text("Copyright 2020 Acme\nFree  to use\nsince 2019.") == "free to use since"
+
+
+def test_copies_differing_in_copyright_share_a_key():
+    first = parse_key(MIT.format(year=2019, holder="Acme"), "gpt-4.1", "1")
+    second = parse_key(MIT.format(year=2024, holder="Someone Else").upper(), "gpt-4.1", "1")
+
+    assert first == second
+
+
+def test_model_prompt_and_wording_change_the_key():
+    text = MIT.format(year=2024, holder="Acme")
+    key = parse_key(text, "gpt-4.1", "1")
+
+    assert parse_key(text, "gpt-4o", "1") != key
+    assert parse_key(text, "gpt-4.1", "2") != key
+    assert parse_key(text.replace("free of charge", "for a fee"), "gpt-4.1", "1") != key
+
+
+def test_put_then_get_returns_a_fresh_copy(cache):
+    cache.put("k", {"permissions": ["use"]})
+
+    first = cache.get("k")
+    first["permissions"].append("sell")
+
+    assert cache.get("k") == {"permissions": ["use"]}
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_errors_are_not_cached(cache):
+    cache.put("k", {"error": "rate limited"})
+
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.put("k", {"permissions": []})
+    clock.now += 101
+
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(cache, clock):
+    for key in ("a", "b", "c"):
+        cache.put(key, {"key": key})
+        clock.now += 1
+    cache.get("a")
+    clock.now += 1
+
+    cache.put("d", {"key": "d"})
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == [{"key": "a"}, {"key": "c"}, {"key": "d"}]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_hits_write_access_times_in_batches(cache, clock):
+    cache.put("k", {"key": "k"})
+    statements = []
+    cache.connection.set_trace_callback(statements.append)
+    clock.now += 5
+    for _ in range(3):
+        cache.get("k")
+
+    assert statements == []
+    cache.put("other", {"key": "other"})
+    assert sum("UPDATE parses SET last_access" in statement for statement in statements) == 1
+
+
+def test_buffered_access_times_survive_close(tmp_path, clock):
+    path = tmp_path / "parses.sqlite"
+    cache = ParseCache(path)
+    cache.put("k", {"key": "k"})
+    clock.now += 5
+    cache.get("k")
+    cache.close()
+
+    reopened = ParseCache(path)
+    try:
+        assert reopened.connection.execute("SELECT last_access FROM parses").fetchone()[0] == clock.now
+    finally:
+        reopened.close()
+
+
+def test_entries_survive_reopening(tmp_path, clock):
+    path = tmp_path / "parses.sqlite"
+    cache = ParseCache(path)
+    cache.put("k", {"permissions": ["use"]})
+    cache.close()
+
+    reopened = ParseCache(path)
+    try:
+        assert reopened.get("k") == {"permissions": ["use"]}
+    finally:
+        reopened.close()
+
+
+def test_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("LICENSE_PARSE_CACHE", str(tmp_path / "env.sqlite"))
+    monkeypatch.setenv("LICENSE_PARSE_CACHE_TTL_DAYS", "2")
+    monkeypatch.setenv("LICENSE_PARSE_CACHE_MAX_ENTRIES", "5")
+
+    cache = ParseCache.from_env()
+    try:
+        assert cache.path == tmp_path / "env.sqlite"
+        assert cache.ttl == 2 * 24 * 3600
+        assert cache.max_entries == 5
+    finally:
+        cache.close()
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+import license_compatibility_checker as checker_module
+from project_manifest import parse_requirements, read_dependencies
+
+
+def test_requirements_skip_comments_options_and_follow_includes(tmp_path):
+    (tmp_path / "base.txt").write_text("requests>=2.0  # http\nidna\n", encoding="utf-8")
+    (tmp_path / "requirements.txt").write_text(
+        "# pinned\n"
+        "-r base.txt\n"
+        "--index-url https://example.org/simple\n"
+        "-e .\n"
+        "PyYAML[extra]==6.0 ; python_version >= '3.8'\n"
+        "numpy @ https://example.org/numpy.whl\n"
+        "\n"
+        "requests\n",
+        encoding="utf-8"
+    )
+
+    assert read_dependencies(tmp_path / "requirements.txt") == ["requests", "idna", "PyYAML", "numpy"]
+
+
+def test_circular_includes_are_read_once(tmp_path):
+    (tmp_path / "a.txt").write_text("-r b.txt\nflask\n", encoding="utf-8")
+    (tmp_path / "b.txt").write_text("--requirement=a.txt\nclick\n", encoding="utf-8")
+
+    assert parse_requirements(tmp_path / "a.txt") == ["click", "flask"]
+
+
+@pytest.mark.parametrize("encoding", ["utf-16", "utf-16-be", "utf-8-sig"])
+def test_requirements_with_byte_order_mark(tmp_path, encoding):
+    path = tmp_path / "requirements.txt"
+    text = "aiofiles==24.1.0\naiohttp==3.9.5\n"
+    # utf-16 writes a BOM itself; utf-16-be needs one prepended
+    path.write_bytes(("\ufeff" + text if encoding == "utf-16-be" else text).encode(encoding))
+
+    assert read_dependencies(path) == ["aiofiles", "aiohttp"]
+
+
+def test_poetry_lock_leaves_out_dev_packages(tmp_path):
+    path = tmp_path / "poetry.lock"
+    path.write_text(
+        '[[package]]\nname = "requests"\ncategory = "main"\n\n'
+        '[[package]]\nname = "pytest"\ncategory = "dev"\n',
+        encoding="utf-8"
+    )
+
+    assert read_dependencies(path) == ["requests"]
+    assert read_dependencies(path, include_dev=True) == ["requests", "pytest"]
+
+
+def test_pipfile_lock_sections(tmp_path):
+    path = tmp_path / "Pipfile.lock"
+    path.write_text(json.dumps({"default": {"requests": {}, "idna": {}}, "develop": {"pytest": {}, "idna": {}}}))
+
+    assert read_dependencies(path) == ["requests", "idna"]
+    assert read_dependencies(path, include_dev=True) == ["requests", "idna", "pytest"]
+
+
+def test_cli_reports_unreadable_manifest_without_traceback(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "requirements.txt"
+    path.write_bytes(b"requests\n\xff\xfe\xfa\n")
+    monkeypatch.setattr(checker_module.sys, "argv", ["license_compatibility_checker.py", str(path), "MIT"])
+
+    with pytest.raises(SystemExit) as exit_info:
+        checker_module.main()
+
+    assert exit_info.value.code == 2
+    assert f"Error reading {path}" in capsys.readouterr().err
+
+
+def test_name_resolution_does_not_create_package_store(tmp_path, monkeypatch, stub_driver):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("NEO4J_URI", "neo4j://localhost:7687")
+    monkeypatch.setenv("NEO4J_PASSWORD", "test")
+    monkeypatch.setattr(checker_module, "load_dotenv", lambda **kwargs: None)
+    monkeypatch.setattr(checker_module.GraphDatabase, "driver", lambda *args, **kwargs: stub_driver)
+    checker = checker_module.LicenseCompatibilityChecker()
+
+    assert checker.resolve_package_names(["PyYAML"]) == {"PyYAML": "PyYAML"}
+    assert not (tmp_path / "data").exists()
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+import rate_limiter
+from rate_limiter import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_burst_up_to_capacity_then_paced(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_tokens_refill_over_time(clock):
+    bucket = TokenBucket(rate=1, capacity=1)
+    bucket.acquire()
+    clock.now += 1.0
+    bucket.acquire()
+    assert clock.sleeps == []
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=2)
+    clock.now += 60
+    for _ in range(2):
+        bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_per_minute_quota():
+    bucket = TokenBucket.per_minute(60)
+    assert bucket.rate == 1.0
+    assert bucket.capacity == 1.0
+
+
+def test_acquire_async_waits_for_borrowed_token(clock, monkeypatch):
+    waits = []
+
+    async def fake_sleep(seconds):
+        waits.append(seconds)
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    bucket = TokenBucket(rate=4, capacity=1)
+
+    async def run():
+        await bucket.acquire_async()
+        await bucket.acquire_async()
+
+    asyncio.run(run())
+    assert waits == [pytest.approx(0.25)]
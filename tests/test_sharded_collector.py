@@ -0,0 +1,80 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import sharded_collector
+from dependency_collector import DependencyCollector
+from package_store import PackageStore
+from sharded_collector import ShardedCollectionRunner, collect_shard
+
+NAMES = [f"pkg{i}" for i in range(40)]
+
+
+@pytest.fixture
+def fake_libraries_io(monkeypatch):
+    """libraries.io stand-in: every package resolves except those named "broken*" """
+
+    async def get_dependency_info_async(self, session, package_name, rate_limiter, max_retries=3):
+        if package_name.startswith("broken"):
+            return None
+        return {"name": package_name, "latest_release_number": "1.0", "normalized_licenses": ["MIT"],
+                "dependencies": []}
+
+    monkeypatch.setattr(DependencyCollector, "get_dependency_info_async", get_dependency_info_async)
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("LIBRARIES_IO_API_KEYS", raising=False)
+    csv_path = tmp_path / "packages.csv"
+    csv_path.write_text("project,download_count\n" + "".join(f"{name},{i}\n" for i, name in enumerate(NAMES)),
+                        encoding="utf-8")
+    return ShardedCollectionRunner(csv_path, workers=3, api_keys=["k1", "k2"], requests_per_minute=60000)
+
+
+def test_shards_partition_the_packages_stably(runner):
+    packages = [(name, 1) for name in NAMES]
+
+    shards = runner.split(packages)
+
+    assert sorted(package for shard in shards for package in shard) == sorted(packages)
+    assert all(runner.shard_of(name) == index for index, shard in enumerate(shards) for name, _ in shard)
+    assert runner.split(packages) == shards
+
+
+def test_workers_sharing_a_key_split_its_quota(runner):
+    # Three workers over two keys: workers 0 and 2 share k1
+    assert runner.worker_budget(0) == ("k1", 30000)
+    assert runner.worker_budget(1) == ("k2", 60000)
+    assert runner.worker_budget(2) == ("k1", 30000)
+
+
+def test_collect_shard_writes_its_own_store_and_journal(tmp_path, monkeypatch, fake_libraries_io):
+    monkeypatch.chdir(tmp_path)
+    shard_dir = tmp_path / "shards"
+
+    summary = collect_shard(1, [("a", 10), ("broken", 5)], "key", 60000, 2, str(shard_dir))
+
+    assert summary["processed_packages"] == 1
+    assert summary["failed_packages"] == 1
+    assert [record["name"] for record in PackageStore(shard_dir / "shard-1.jsonl").iter_records()] == ["a"]
+    assert (shard_dir / "progress-1.jsonl").exists()
+
+
+def test_run_merges_every_shard_into_the_package_store(runner, tmp_path, monkeypatch, fake_libraries_io):
+    # Threads instead of processes so the stubbed fetch applies to the workers
+    monkeypatch.setattr(sharded_collector, "ProcessPoolExecutor", ThreadPoolExecutor)
+
+    summary = runner.run()
+
+    assert summary["processed_packages"] == len(NAMES)
+    assert sorted(entry["name"] for entry in summary["packages"]) == sorted(NAMES)
+    store = PackageStore(tmp_path / "data" / "packages.jsonl")
+    assert sorted(record["name"] for record in store.iter_records()) == sorted(NAMES)
+    # Shards are cleared once merged and their journals archived
+    assert not list(runner.shard_dir.glob("shard-*"))
+    assert not list(runner.shard_dir.glob("progress-?.jsonl"))
+    with open(tmp_path / "data" / "dependencies" / "summary.json", encoding="utf-8") as f:
+        assert json.load(f)["workers"] == 3
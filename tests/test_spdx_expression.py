@@ -0,0 +1,101 @@
+import pytest
+
+from spdx_expression import (
+    ExpressionError, candidates, compile_expression, evaluate, license_ids, package_expression, tokenize
+)
+
+
+def test_tokenize_upper_cases_operators_only():
+    assert tokenize(" (mit or Apache-2.0) and GPL-2.0+ with Classpath-exception-2.0 ") == [
+        "(", "mit", "OR", "Apache-2.0", ")", "AND", "GPL-2.0+", "WITH", "Classpath-exception-2.0"
+    ]
+
+
+def test_tokenize_rejects_stray_characters():
+    with pytest.raises(ExpressionError):
+        tokenize("MIT / BSD-3-Clause")
+
+
+def test_and_binds_tighter_than_or():
+    assert compile_expression("MIT OR Apache-2.0 AND BSD-3-Clause") == ("or", (
+        ("license", "MIT", False, None),
+        ("and", (("license", "Apache-2.0", False, None), ("license", "BSD-3-Clause", False, None)))
+    ))
+
+
+def test_parentheses_override_precedence():
+    node = compile_expression("(MIT OR Apache-2.0) AND BSD-3-Clause")
+
+    assert node[0] == "and"
+    assert node[1][0][0] == "or"
+
+
+def test_with_and_or_later_on_a_leaf():
+    assert compile_expression("GPL-2.0+ WITH Classpath-exception-2.0") == (
+        "license", "GPL-2.0", True, "Classpath-exception-2.0"
+    )
+
+
+@pytest.mark.parametrize("expression", ["", "MIT OR", "AND MIT", "(MIT", "MIT)", "MIT WITH", "MIT Apache-2.0"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ExpressionError):
+        compile_expression(expression)
+
+
+def test_expression_error_is_a_value_error():
+    assert issubclass(ExpressionError, ValueError)
+
+
+def test_license_ids_in_order():
+    assert license_ids(compile_expression("MIT AND (GPL-3.0+ OR Apache-2.0)")) == ["MIT", "GPL-3.0", "Apache-2.0"]
+
+
+def test_or_later_candidates():
+    assert candidates(compile_expression("GPL-2.0+")) == ("GPL-2.0-or-later", "GPL-2.0")
+    assert candidates(compile_expression("GPL-2.0")) == ("GPL-2.0",)
+
+
+def test_evaluate_or_needs_one_branch_and_needs_all():
+    allowed = {"MIT", "Apache-2.0"}.__contains__
+
+    assert evaluate(compile_expression("GPL-3.0 OR MIT"), allowed)
+    assert not evaluate(compile_expression("GPL-3.0 AND MIT"), allowed)
+    assert evaluate(compile_expression("(GPL-3.0 OR MIT) AND Apache-2.0"), allowed)
+
+
+def test_evaluate_or_later_matches_either_spelling():
+    assert evaluate(compile_expression("GPL-2.0+"), {"GPL-2.0-or-later"}.__contains__)
+    assert evaluate(compile_expression("GPL-2.0+"), {"GPL-2.0"}.__contains__)
+
+
+def test_evaluate_short_circuits():
+    checked = []
+
+    def allowed(license_id):
+        checked.append(license_id)
+        return license_id == "MIT"
+
+    assert evaluate(compile_expression("MIT OR GPL-3.0 OR AGPL-3.0"), allowed)
+    assert checked == ["MIT"]
+
+    checked.clear()
+    assert not evaluate(compile_expression("GPL-3.0 AND MIT AND Apache-2.0"), allowed)
+    assert checked == ["GPL-3.0"]
+
+
+def test_compiled_expressions_are_cached():
+    assert compile_expression("MIT OR Apache-2.0") is compile_expression("MIT OR Apache-2.0")
+
+
+def test_package_expression_keeps_a_valid_raw_expression():
+    package = {"licenses": "MIT AND BSD-3-Clause", "normalized_licenses": ["MIT", "BSD-3-Clause"]}
+
+    assert package_expression(package) == "MIT AND BSD-3-Clause"
+
+
+def test_package_expression_falls_back_to_normalized_ids():
+    # Free-text license strings and expressions over ids the normalizer did not produce
+    assert package_expression({"licenses": "BSD License", "normalized_licenses": ["BSD-3-Clause"]}) == "BSD-3-Clause"
+    assert package_expression({"licenses": "MIT AND GPL-3.0", "normalized_licenses": ["MIT"]}) == "MIT"
+    assert package_expression({"licenses": "", "normalized_licenses": ["MIT", "Apache-2.0"]}) == "MIT OR Apache-2.0"
+    assert package_expression({"licenses": "MIT"}) is None